@@ -0,0 +1,52 @@
+"""Create user_label_stats table and i_answers.stats_applied_at
+
+Revision ID: 2b7e4c9d8a15
+Revises: 9d4c2f6b1a37
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2b7e4c9d8a15"
+down_revision: Union[str, Sequence[str], None] = "9d4c2f6b1a37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 기존 사용자 집계는 약점 카드 첫 조회 시 i_answers.labels_json에서 다시 계산해서 채움
+    from sqlalchemy import inspect
+
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if "user_label_stats" not in inspector.get_table_names():
+        op.create_table(
+            "user_label_stats",
+            sa.Column("stat_id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id"), nullable=False),
+            sa.Column("label", sa.String(length=50), nullable=False),
+            sa.Column("occurrence_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("score_sum", sa.Float(), nullable=False, server_default="0"),
+            sa.Column("score_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("top_sentences", sa.JSON(), nullable=True),
+            sa.Column("last_answer_id", sa.Integer(), nullable=True),
+            sa.Column("last_sentence_id", sa.String(length=100), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+            sa.UniqueConstraint("user_id", "label", name="uq_user_label_stats_user_label"),
+        )
+        op.create_index("ix_user_label_stats_user_id", "user_label_stats", ["user_id"])
+
+    existing_columns = {col['name'] for col in inspector.get_columns('i_answers')}
+    if 'stats_applied_at' not in existing_columns:
+        op.add_column("i_answers", sa.Column("stats_applied_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("i_answers", "stats_applied_at")
+    op.drop_index("ix_user_label_stats_user_id", table_name="user_label_stats")
+    op.drop_table("user_label_stats")
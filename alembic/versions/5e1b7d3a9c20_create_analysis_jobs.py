@@ -0,0 +1,56 @@
+"""Create analysis_jobs table for background analysis jobs
+
+Revision ID: 5e1b7d3a9c20
+Revises: 7c9a4e8f4dcb
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e1b7d3a9c20"
+down_revision: Union[str, Sequence[str], None] = "7c9a4e8f4dcb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # create_tables()로 이미 생성된 환경이면 건너뜀
+    from sqlalchemy import inspect
+
+    conn = op.get_bind()
+    if "analysis_jobs" in inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("job_id", sa.String(length=32), primary_key=True),
+        sa.Column("job_type", sa.String(length=50), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="3"),
+        sa.Column("idempotency_key", sa.String(length=255), nullable=True),
+        sa.Column("next_run_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_by", sa.String(length=100), nullable=True),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("idempotency_key"),
+    )
+    op.create_index("ix_analysis_jobs_job_type", "analysis_jobs", ["job_type"])
+    op.create_index("ix_analysis_jobs_status", "analysis_jobs", ["status"])
+    op.create_index("ix_analysis_jobs_next_run_at", "analysis_jobs", ["next_run_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analysis_jobs_next_run_at", table_name="analysis_jobs")
+    op.drop_index("ix_analysis_jobs_status", table_name="analysis_jobs")
+    op.drop_index("ix_analysis_jobs_job_type", table_name="analysis_jobs")
+    op.drop_table("analysis_jobs")
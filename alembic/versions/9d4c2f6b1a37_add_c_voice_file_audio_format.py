@@ -0,0 +1,41 @@
+"""Add normalized audio format columns to c_voice_files
+
+Revision ID: 9d4c2f6b1a37
+Revises: 5e1b7d3a9c20
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4c2f6b1a37"
+down_revision: Union[str, Sequence[str], None] = "5e1b7d3a9c20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 기존 행은 NULL로 두고 STT 요청 시 wav 헤더를 읽어 채움
+    from sqlalchemy import inspect
+
+    conn = op.get_bind()
+    existing_columns = {col['name'] for col in inspect(conn).get_columns('c_voice_files')}
+
+    if 'stored_format' not in existing_columns:
+        op.add_column("c_voice_files", sa.Column("stored_format", sa.String(length=10), nullable=True))
+    if 'sample_rate' not in existing_columns:
+        op.add_column("c_voice_files", sa.Column("sample_rate", sa.Integer(), nullable=True))
+    if 'channels' not in existing_columns:
+        op.add_column("c_voice_files", sa.Column("channels", sa.Integer(), nullable=True))
+    if 'sample_width' not in existing_columns:
+        op.add_column("c_voice_files", sa.Column("sample_width", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("c_voice_files", "sample_width")
+    op.drop_column("c_voice_files", "channels")
+    op.drop_column("c_voice_files", "sample_rate")
+    op.drop_column("c_voice_files", "stored_format")
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+# 내용 기반(content-addressed) 로컬 디스크 캐시
+# 같은 녹음을 다시 올리거나 작업을 재시도할 때 ffmpeg 변환 / wav2vec 분석 / 유료 STT / BERT 추론을 건너뜀
+#
+# 키 = sha256(파이프라인 버전 + 네임스페이스 + 입력 바이트 + 추가 파라미터)
+# 네임스페이스별 버전을 올리면 해당 결과만 무효화, CONTENT_CACHE_VERSION을 바꾸면 전체 무효화
+# 용량이 CONTENT_CACHE_MAX_MB를 넘으면 가장 오래 사용하지 않은 파일부터 삭제 (mtime 기준 LRU)
+
+PIPELINE_VERSION = os.getenv("CONTENT_CACHE_VERSION", "1")
+
+CACHE_VERSIONS = {
+    "pcm": "ffmpeg-16k-mono-1",     # AudioService ffmpeg 디코딩 결과 (raw PCM)
+    "voice_analysis": "1",          # VoiceAnalyzer.analyze_waveform 결과
+    "stt": "1",                     # Google STT / Whisper 결과 JSON
+    "bert": "1",                    # c_bert / i_bert 라벨
+}
+
+
+def _json_default(value):
+    # numpy 스칼라/배열
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"JSON 직렬화 불가: {type(value).__name__}")
+
+
+class ContentCache:
+    def __init__(self, cache_dir: Path, max_bytes: int, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.approx_size: Optional[int] = None  # 프로세스 내 추정치 (정리할 때 실제 크기로 다시 계산)
+
+    # 입력 바이트 + 파라미터로 캐시 키 생성
+    def make_key(self, namespace: str, data, *params: Any) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{PIPELINE_VERSION}:{namespace}:{CACHE_VERSIONS.get(namespace, '0')}".encode())
+        for param in params:
+            digest.update(b"\x00")
+            digest.update(repr(param).encode())
+        digest.update(b"\x01")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.cache_dir / namespace / key[:2] / key
+
+    def get_bytes(self, namespace: str, key: str) -> Optional[bytearray]:
+        if not self.enabled:
+            return None
+
+        path = self._path(namespace, key)
+        try:
+            size = path.stat().st_size
+            buffer = bytearray(size)
+            with open(path, "rb") as f:
+                f.readinto(buffer)
+            os.utime(path)  # LRU 갱신
+            return buffer
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"[ContentCache] 읽기 실패 ({namespace}/{key[:12]}): {e}")
+            return None
+
+    def put_bytes(self, namespace: str, key: str, data) -> None:
+        if not self.enabled:
+            return
+
+        path = self._path(namespace, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 다른 프로세스가 쓰는 중인 파일을 읽지 않도록 임시 파일에 쓰고 rename
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"[ContentCache] 저장 실패 ({namespace}/{key[:12]}): {e}")
+            return
+
+        self._account(len(data))
+
+    def get_json(self, namespace: str, key: str) -> Optional[Any]:
+        data = self.get_bytes(namespace, key)
+        if data is None:
+            return None
+        try:
+            return json.loads(data.decode("utf-8"))
+        except ValueError:
+            return None
+
+    def put_json(self, namespace: str, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        try:
+            data = json.dumps(value, ensure_ascii=False, default=_json_default).encode("utf-8")
+        except TypeError as e:
+            print(f"[ContentCache] 직렬화 실패 ({namespace}): {e}")
+            return
+        self.put_bytes(namespace, key, data)
+
+    def _account(self, added: int) -> None:
+        with self.lock:
+            if self.approx_size is None:
+                self.approx_size = self._scan_size()
+            self.approx_size += added
+            over_limit = self.approx_size > self.max_bytes
+
+        if over_limit:
+            self.evict()
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self.cache_dir.rglob("*"):
+            try:
+                if path.is_file():
+                    total += path.stat().st_size
+            except OSError:
+                continue
+        return total
+
+    # 용량의 90%가 될 때까지 오래 사용하지 않은 파일부터 삭제
+    def evict(self) -> None:
+        with self.lock:
+            entries = []
+            for path in self.cache_dir.rglob("*"):
+                try:
+                    if path.is_file():
+                        stat = path.stat()
+                        entries.append((stat.st_mtime, stat.st_size, path))
+                except OSError:
+                    continue
+
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            removed = 0
+
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                    removed += 1
+                except OSError:
+                    continue
+
+            self.approx_size = total
+
+        if removed:
+            print(f"[ContentCache] {removed}개 파일 정리 (현재 {total / (1024 * 1024):.1f} MB)")
+
+
+_cache: Optional[ContentCache] = None
+
+
+def get_content_cache() -> ContentCache:
+    global _cache
+    if _cache is None:
+        _cache = ContentCache(
+            cache_dir=Path(os.getenv("CONTENT_CACHE_DIR", "/tmp/steach_cache")),
+            max_bytes=int(float(os.getenv("CONTENT_CACHE_MAX_MB", "2048")) * 1024 * 1024),
+            enabled=os.getenv("CONTENT_CACHE_ENABLED", "1") == "1",
+        )
+    return _cache
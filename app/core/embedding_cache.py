@@ -0,0 +1,142 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# 문장 임베딩 캐시
+# 면접 답변에는 같은 추임새/상투적인 문장이 세션마다 반복되므로 같은 문장은 SentenceTransformer를 다시 돌리지 않음
+#
+# 키 = sha256(모델 이름 + 정규화 여부 + 정규화한 텍스트)
+# 1) 프로세스 내 LRU (EMBEDDING_CACHE_LRU_SIZE개)
+# 2) 로컬 SQLite 파일 (여러 워커 프로세스가 같이 사용, WAL 모드)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+# 유니코드 정규화(NFC) + 공백 정리 - 같은 문장이 다른 키가 되지 않도록
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    def __init__(self, path: Path, lru_size: int = 10000, enabled: bool = True):
+        self.path = Path(path)
+        self.lru_size = lru_size
+        self.enabled = enabled
+        self.lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL)")
+                self.conn = conn
+            except sqlite3.Error as e:
+                print(f"[EmbeddingCache] SQLite 열기 실패 ({self.path}): {e}")
+                self.enabled = False
+        return self.conn
+
+    @staticmethod
+    def make_key(model_name: str, text: str, normalize: bool) -> str:
+        return hashlib.sha256(f"{model_name}\x00{int(normalize)}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        self.lru[key] = vec
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+
+    # keys 순서대로 벡터 반환 (없으면 None)
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+        if not self.enabled:
+            return results
+
+        missing = {}
+        with self.lock:
+            for i, key in enumerate(keys):
+                vec = self.lru.get(key)
+                if vec is not None:
+                    self.lru.move_to_end(key)
+                    results[i] = vec
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            conn = self._connect() if missing else None
+            if conn is not None:
+                try:
+                    unique = list(missing)
+                    # SQLite 변수 개수 제한 대비 나눠서 조회
+                    for start in range(0, len(unique), 500):
+                        chunk = unique[start:start + 500]
+                        placeholders = ",".join("?" * len(chunk))
+                        for key, dim, blob in conn.execute(f"SELECT key, dim, vec FROM embeddings WHERE key IN ({placeholders})", chunk):
+                            vec = np.frombuffer(blob, dtype=np.float32, count=dim)
+                            self._remember(key, vec)
+                            for i in missing[key]:
+                                results[i] = vec
+                except sqlite3.Error as e:
+                    print(f"[EmbeddingCache] 조회 실패: {e}")
+
+            found = sum(1 for vec in results if vec is not None)
+            self.hits += found
+            self.misses += len(keys) - found
+        return results
+
+    def put_many(self, model_name: str, keys: Sequence[str], vecs: Sequence[np.ndarray]) -> None:
+        if not self.enabled or not keys:
+            return
+
+        rows = []
+        with self.lock:
+            for key, vec in zip(keys, vecs):
+                vec = np.asarray(vec, dtype=np.float32)
+                self._remember(key, vec)
+                rows.append((key, model_name, int(vec.shape[0]), vec.tobytes()))
+
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO embeddings (key, model, dim, vec) VALUES (?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                print(f"[EmbeddingCache] 저장 실패: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "lru_entries": len(self.lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(
+            path=Path(os.getenv("EMBEDDING_CACHE_PATH", "/tmp/steach_cache/embeddings.sqlite3")),
+            lru_size=int(os.getenv("EMBEDDING_CACHE_LRU_SIZE", "10000")),
+            enabled=os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1",
+        )
+    return _cache
@@ -0,0 +1,64 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+# Space-Saving heavy hitters (Metwally et al.)
+# 라벨별 "자주 나온 문장"을 최대 capacity개 카운터로만 추적 - 사용자 기록이 길어져도 메모리/조회 시간 일정
+#
+# 카운터: text -> [count, error, latest, answer_id, session_id]
+# - count: 추정 빈도 (실제 빈도 이상, count - error 이하로는 내려가지 않음)
+# - error: 자리를 물려받을 때 쫓겨난 카운터의 count (과대 추정 상한)
+# - 실제 빈도가 (전체 개수 / capacity)보다 큰 문장은 항상 남아 있음
+# JSON 컬럼에 그대로 저장 (카운터 capacity개의 작은 dict)
+
+Counter = List[Any]
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int, counters: Optional[Dict[str, Counter]] = None):
+        self.capacity = max(1, capacity)
+        self.counters: Dict[str, Counter] = {}
+        for text, entry in (counters or {}).items():
+            self.counters[text] = list(entry)
+        self._shrink()
+
+    def _min_text(self) -> str:
+        # 가장 적게, 같으면 가장 오래전에 나온 카운터
+        return min(self.counters, key=lambda t: (self.counters[t][0], self.counters[t][2]))
+
+    def _shrink(self) -> None:
+        while len(self.counters) > self.capacity:
+            del self.counters[self._min_text()]
+
+    def add(self, text: str, latest: float, answer_id: int, session_id: int) -> None:
+        entry = self.counters.get(text)
+        if entry is not None:
+            entry[0] += 1
+            entry[2] = max(entry[2], latest)
+            return
+
+        if len(self.counters) < self.capacity:
+            self.counters[text] = [1, 0, latest, answer_id, session_id]
+            return
+
+        # 가장 작은 카운터를 새 문장이 물려받음 (count + 1, error = 물려받은 count)
+        victim = self._min_text()
+        min_count = self.counters.pop(victim)[0]
+        self.counters[text] = [min_count + 1, min_count, latest, answer_id, session_id]
+
+    # 답변 재분석 시 이전 기여분 빼기 - 추적 중이 아니면 (이미 밀려난 문장) 무시
+    def remove(self, text: str) -> None:
+        entry = self.counters.get(text)
+        if entry is None:
+            return
+        entry[0] -= 1
+        entry[1] = min(entry[1], entry[0])
+        if entry[0] <= 0:
+            del self.counters[text]
+
+    # (text, 보장 빈도, answer_id, session_id) - 보장 빈도(count - error) 우선, 최신순
+    # 화면의 "총 N회"는 실제보다 크게 나오지 않도록 보장 빈도를 사용 (error=0이면 정확한 빈도)
+    def top(self, k: int) -> List[Tuple[str, int, int, int]]:
+        ranked = sorted(self.counters.items(), key=lambda x: (-(x[1][0] - x[1][1]), -x[1][0], -x[1][2]))[:k]
+        return [(text, entry[0] - entry[1], entry[3], entry[4]) for text, entry in ranked]
+
+    def to_json(self) -> Dict[str, Counter]:
+        return {text: list(entry) for text, entry in self.counters.items()}
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import time
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+
+# CPU를 오래 쓰는 모델 추론/오디오 변환을 이벤트 루프 밖(스레드 풀)에서 실행
+# 모델별 동시 실행 수를 제한하고 대기열 길이/대기 시간을 집계
+#
+# 동시 실행 수는 INFERENCE_LIMIT_<KEY> 환경변수로 조정 (예: INFERENCE_LIMIT_WAV2VEC=2)
+# 대기열 상한은 INFERENCE_MAX_QUEUE_<KEY> (0이면 무제한) - 초과 시 InferenceQueueFullError
+
+DEFAULT_LIMITS: Dict[str, int] = {
+    "audio": 4,        # ffmpeg 디코딩/변환
+    "wav2vec": 1,      # VoiceAnalyzer (XLSR-300M)
+    "c_bert": 2,       # 대화 분석 BERT
+    "i_bert": 2,       # 면접 답변 BERT
+    "whisper": 1,      # 영어 면접 STT
+    "embedding": 2,    # SentenceTransformer + 벡터 저장소 저장
+    "vector_store": 4, # 벡터 저장소 조회 (이벤트 루프를 막지 않도록)
+}
+
+
+# RuntimeError를 상속하지 않음 - 라우터의 `except RuntimeError`(변환 실패 400 등)에 잡히지 않고 503 핸들러로 가도록
+class InferenceQueueFullError(Exception):
+    pass
+
+
+class _SlotStats:
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_waiting = 0
+        self.total_wait_sec = 0.0
+        self.total_run_sec = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "max_waiting": self.max_waiting,
+            "avg_wait_sec": round(self.total_wait_sec / finished, 3) if finished else 0.0,
+            "avg_run_sec": round(self.total_run_sec / finished, 3) if finished else 0.0,
+        }
+
+
+# 스레드 풀의 완료 콜백을 이벤트 루프 스레드에서 실행 (세마포어/집계는 루프 안에서만 건드림)
+def _call_in_loop(loop: asyncio.AbstractEventLoop, callback: Callable, *args) -> None:
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass  # 루프가 이미 닫힘 (종료 중)
+
+
+class InferenceExecutor:
+    def __init__(self):
+        self.limits = {
+            key: int(os.getenv(f"INFERENCE_LIMIT_{key.upper()}", str(default)))
+            for key, default in DEFAULT_LIMITS.items()
+        }
+        max_workers = int(os.getenv("INFERENCE_MAX_WORKERS", str(sum(self.limits.values()))))
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+
+        self.stats: Dict[str, _SlotStats] = {}
+        self.lock = threading.Lock()
+        # 이벤트 루프별 세마포어 (job worker처럼 루프를 따로 쓰는 프로세스 대비)
+        self.semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+    def _get_stats(self, key: str) -> _SlotStats:
+        with self.lock:
+            if key not in self.stats:
+                limit = self.limits.get(key) or int(os.getenv(f"INFERENCE_LIMIT_{key.upper()}", "1"))
+                max_queue = int(os.getenv(f"INFERENCE_MAX_QUEUE_{key.upper()}", "0"))
+                self.stats[key] = _SlotStats(limit, max_queue)
+            return self.stats[key]
+
+    def _get_semaphore(self, key: str, limit: int) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        per_loop = self.semaphores.setdefault(loop, {})
+        if key not in per_loop:
+            per_loop[key] = asyncio.Semaphore(limit)
+        return per_loop[key]
+
+    async def run(self, key: str, fn: Callable, *args, **kwargs):
+        stats = self._get_stats(key)
+
+        if stats.max_queue and stats.waiting >= stats.max_queue:
+            stats.rejected += 1
+            raise InferenceQueueFullError(f"{key} 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+
+        semaphore = self._get_semaphore(key, stats.limit)
+
+        stats.waiting += 1
+        stats.max_waiting = max(stats.max_waiting, stats.waiting)
+        queued_at = time.perf_counter()
+
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+
+        started_at = time.perf_counter()
+        stats.total_wait_sec += started_at - queued_at
+        stats.running += 1
+        loop = asyncio.get_running_loop()
+
+        # 슬롯은 스레드 작업이 실제로 끝날 때 반납 (기다리던 요청이 취소돼도 작업이 도는 동안은 동시 실행 수에 포함)
+        def finish(future):
+            stats.running -= 1
+            stats.total_run_sec += time.perf_counter() - started_at
+            if future.cancelled() or future.exception() is not None:
+                stats.failed += 1
+            else:
+                stats.completed += 1
+            semaphore.release()
+
+        try:
+            future = self.pool.submit(partial(fn, *args, **kwargs))
+        except Exception:
+            stats.running -= 1
+            stats.failed += 1
+            semaphore.release()
+            raise
+        future.add_done_callback(lambda f: _call_in_loop(loop, finish, f))
+
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            keys = list(self.stats.keys())
+        return {key: self.stats[key].to_dict() for key in keys}
+
+
+_executor: InferenceExecutor = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    global _executor
+    if _executor is None:
+        _executor = InferenceExecutor()
+    return _executor
+
+
+# 블로킹 함수를 모델별 제한을 걸어 스레드 풀에서 실행
+async def run_inference(key: str, fn: Callable, *args, **kwargs):
+    return await get_inference_executor().run(key, fn, *args, **kwargs)
+
+
+def get_inference_stats() -> Dict[str, Dict[str, Any]]:
+    return get_inference_executor().snapshot()
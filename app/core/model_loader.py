@@ -24,6 +24,14 @@ MODEL_FILES = [
     "label_mapping.pkl" # 라벨 매핑 데이터
 ]
 
+# 빌드된 BERT 분류기 디렉터리 (선택) - python -m app.service.bert_backend build 로 생성
+# 버전별로 따로 보관하고 S3에는 <디렉터리>/<파일> 키로 업로드 (manifest.json에 파일 목록)
+BERT_ARTIFACT_VERSION = os.getenv("BERT_ARTIFACT_VERSION", "v1")
+BERT_ARTIFACTS = {
+    "c_bert": f"c_bert_{BERT_ARTIFACT_VERSION}",
+    "i_bert": f"i_bert_{BERT_ARTIFACT_VERSION}",
+}
+
 
 def is_s3_enabled() -> bool:
     return bool(S3_BUCKET)
@@ -56,7 +64,7 @@ def download_model_from_s3(model_name: str, force: bool = False) -> bool:
         s3 = get_s3_client()
         print(f"  {model_name} S3에서 다운로드 중...")
 
-        MODEL_DIR.mkdir(parents=True, exist_ok=True)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
         s3.download_file(S3_BUCKET, s3_key, str(local_path))
 
         size_mb = local_path.stat().st_size / (1024 * 1024)
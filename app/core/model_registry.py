@@ -0,0 +1,297 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 모델 레지스트리
+# 모든 모델 싱글턴(get_analyzer / get_inference_service / embedder / whisper)을 (이름, 변형, 디바이스) 키로 관리
+# - 같은 키는 한 번만 로드 (동시 요청이 와도 로드는 1회)
+# - MODEL_PRELOAD에 지정한 모델은 서버 시작 시 미리 로드 + warmup 추론 (첫 요청 지연 제거)
+# - 모델별 로드 시간 / 메모리 사용량 / 마지막 사용 시각 집계 (GET /health/models)
+# - MODEL_IDLE_EVICT_SEC 동안 쓰이지 않은 모델은 메모리에서 내림 (MODEL_PIN에 지정한 모델 제외)
+
+ModelKey = Tuple[str, Optional[str], str]
+
+
+def _resolve_device(device: Optional[str]) -> str:
+    device = device or os.getenv("MODEL_DEVICE", "auto")
+    if device != "auto":
+        return device
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+# torch 모듈 파라미터/버퍼 크기 합계 (서비스 객체는 속성 한 단계까지 확인)
+def _torch_bytes(obj: Any) -> int:
+    try:
+        import torch
+    except ImportError:
+        return 0
+
+    modules = []
+    candidates = [obj] + list(getattr(obj, "__dict__", {}).values())
+    for candidate in candidates:
+        if isinstance(candidate, torch.nn.Module):
+            modules.append(candidate)
+        elif hasattr(candidate, "__dict__"):
+            modules.extend(v for v in vars(candidate).values() if isinstance(v, torch.nn.Module))
+
+    seen = set()
+    total = 0
+    for module in modules:
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            if id(tensor) in seen:
+                continue
+            seen.add(id(tensor))
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class _Entry:
+    def __init__(self, model: Any, load_sec: float, memory_bytes: int):
+        self.model = model
+        self.load_sec = load_sec
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.hits = 0
+        self.warmed_up = False
+
+
+class ModelRegistry:
+    def __init__(self):
+        self.loaders: Dict[str, Callable[[str, Optional[str]], Any]] = {}
+        self.warmups: Dict[str, Callable[[Any], None]] = {}
+        self.entries: Dict[ModelKey, _Entry] = {}
+        self.lock = threading.Lock()
+        self.key_locks: Dict[ModelKey, threading.Lock] = {}
+        self.evictor: Optional[threading.Thread] = None
+
+    # loader(device, variant) -> model
+    def register(self, name: str, loader: Callable[[str, Optional[str]], Any], warmup: Optional[Callable[[Any], None]] = None):
+        self.loaders[name] = loader
+        if warmup:
+            self.warmups[name] = warmup
+
+    def _key_lock(self, key: ModelKey) -> threading.Lock:
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def get(self, name: str, variant: Optional[str] = None, device: Optional[str] = None, warmup: bool = False, local: bool = False) -> Any:
+        # 모델 서버 사용 시 워커에서는 모델을 올리지 않고 원격 프록시 사용 (local=True: 모델 서버 자신이 실제 모델을 로드)
+        from app.service.model_server import is_model_server_enabled, get_remote_model
+        if not local and is_model_server_enabled():
+            return get_remote_model(f"{name}:{variant}" if variant else name)
+
+        if name not in self.loaders:
+            raise KeyError(f"등록되지 않은 모델: {name}")
+
+        key = (name, variant, _resolve_device(device))
+        entry = self.entries.get(key)
+
+        if entry is None:
+            with self._key_lock(key):
+                entry = self.entries.get(key)
+                if entry is None:
+                    entry = self._load(key)
+
+        if warmup and not entry.warmed_up:
+            self._warmup(key, entry)
+
+        entry.last_used = time.time()
+        entry.hits += 1
+        return entry.model
+
+    def _load(self, key: ModelKey) -> _Entry:
+        name, variant, device = key
+        label = f"{name}:{variant}" if variant else name
+        print(f"[ModelRegistry] '{label}' ({device}) 로드 중...")
+
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        model = self.loaders[name](device, variant)
+        load_sec = time.perf_counter() - started
+
+        # torch 파라미터로 계산할 수 없으면 프로세스 RSS 증가량으로 추정
+        memory_bytes = _torch_bytes(model) or max(0, _rss_bytes() - rss_before)
+
+        entry = _Entry(model, load_sec, memory_bytes)
+        self.entries[key] = entry
+        print(f"[ModelRegistry] '{label}' 로드 완료 ({load_sec:.1f}초, 약 {memory_bytes / (1024 * 1024):.0f} MB)")
+        return entry
+
+    def _warmup(self, key: ModelKey, entry: _Entry):
+        warmup = self.warmups.get(key[0])
+        entry.warmed_up = True
+        if not warmup:
+            return
+        started = time.perf_counter()
+        try:
+            warmup(entry.model)
+            print(f"[ModelRegistry] '{key[0]}' warmup 완료 ({time.perf_counter() - started:.2f}초)")
+        except Exception as e:
+            print(f"[ModelRegistry] '{key[0]}' warmup 실패: {e}")
+
+    # "analyzer,c_bert,whisper:base" 형식
+    def preload(self, names: List[str], warmup: bool = True):
+        for spec in names:
+            name, _, variant = spec.partition(":")
+            try:
+                self.get(name, variant or None, warmup=warmup)
+            except Exception as e:
+                print(f"[ModelRegistry] '{spec}' 사전 로드 실패: {e}")
+
+    def evict(self, name: str, variant: Optional[str] = None, device: Optional[str] = None) -> bool:
+        key = (name, variant, _resolve_device(device))
+        with self._key_lock(key):
+            entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+
+        del entry
+        try:
+            import gc
+            import torch
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        print(f"[ModelRegistry] '{name}' 메모리에서 해제")
+        return True
+
+    def evict_idle(self, max_idle_sec: float, pinned: List[str]) -> int:
+        now = time.time()
+        idle = [key for key, entry in list(self.entries.items()) if key[0] not in pinned and now - entry.last_used > max_idle_sec]
+        return sum(1 for name, variant, device in idle if self.evict(name, variant, device))
+
+    # MODEL_IDLE_EVICT_SEC > 0이면 주기적으로 오래 안 쓴 모델 해제
+    def start_idle_evictor(self):
+        max_idle_sec = float(os.getenv("MODEL_IDLE_EVICT_SEC", "0"))
+        if max_idle_sec <= 0 or self.evictor is not None:
+            return
+
+        pinned = [name.strip() for name in os.getenv("MODEL_PIN", "analyzer").split(",") if name.strip()]
+
+        def loop():
+            while True:
+                time.sleep(min(60.0, max_idle_sec))
+                try:
+                    self.evict_idle(max_idle_sec, pinned)
+                except Exception as e:
+                    print(f"[ModelRegistry] 유휴 모델 정리 실패: {e}")
+
+        self.evictor = threading.Thread(target=loop, daemon=True, name="model-evictor")
+        self.evictor.start()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        result = {}
+        for (name, variant, device), entry in list(self.entries.items()):
+            label = f"{name}:{variant}" if variant else name
+            result[f"{label}@{device}"] = {
+                "load_sec": round(entry.load_sec, 2),
+                "memory_mb": round(entry.memory_bytes / (1024 * 1024), 1),
+                "hits": entry.hits,
+                "idle_sec": round(now - entry.last_used, 1),
+                "warmed_up": entry.warmed_up,
+            }
+        return result
+
+
+# ---------- 모델 등록 ----------
+
+def _load_analyzer(device: str, variant: Optional[str]):
+    from app.core.model_loader import MODEL_DIR
+    from app.service.voice_analyzer import VoiceAnalyzer
+    return VoiceAnalyzer(model_dir=str(MODEL_DIR))
+
+
+def _warmup_analyzer(analyzer):
+    import numpy as np
+    analyzer._wav2vec_features(np.zeros(analyzer.sample_rate, dtype=np.float32), analyzer.sample_rate)
+
+
+def _load_c_bert(device: str, variant: Optional[str]):
+    from app.service.c_bert_service import InferenceService
+    # 변형 = BERT_BACKEND 값 ("c_bert:onnx" 등)
+    return InferenceService(device_mode="auto" if device == "cuda" else "cpu", backend=variant)
+
+
+def _load_i_bert(device: str, variant: Optional[str]):
+    from app.service.i_bert_service import InferenceService
+    # 변형 = BERT_BACKEND 값 ("i_bert:onnx" 등)
+    return InferenceService(device_mode="auto" if device == "cuda" else "cpu", backend=variant)
+
+
+def _warmup_bert(service):
+    service.predict_labels("안녕하세요. 반갑습니다.")
+
+
+# c_bert / i_bert가 같이 쓰는 base BERT + 두 LoRA 어댑터 (BERT_BACKEND=shared)
+def _load_bert_shared(device: str, variant: Optional[str]):
+    import torch
+    from app.service.bert_backend import SharedBertBackbone
+    return SharedBertBackbone(torch.device(device))
+
+
+def _warmup_bert_shared(backbone):
+    backbone.predict_both(["안녕하세요. 반갑습니다."])
+
+
+def _load_embedder(device: str, variant: Optional[str]):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(variant or "jhgan/ko-sroberta-multitask", device=device)
+
+
+def _warmup_embedder(model):
+    model.encode(["warmup"])
+
+
+def _load_whisper(device: str, variant: Optional[str]):
+    from app.service.whisper_backend import load_whisper_engine
+    return load_whisper_engine(model_name=variant)
+
+
+def _warmup_whisper(engine):
+    import numpy as np
+    engine.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+
+
+_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+        _registry.register("analyzer", _load_analyzer, _warmup_analyzer)
+        _registry.register("c_bert", _load_c_bert, _warmup_bert)
+        _registry.register("i_bert", _load_i_bert, _warmup_bert)
+        _registry.register("bert_shared", _load_bert_shared, _warmup_bert_shared)
+        _registry.register("embedder", _load_embedder, _warmup_embedder)
+        _registry.register("whisper", _load_whisper, _warmup_whisper)
+    return _registry
+
+
+def get_model(name: str, variant: Optional[str] = None, device: Optional[str] = None) -> Any:
+    return get_model_registry().get(name, variant, device)
+
+
+# 서버 시작 시 MODEL_PRELOAD 모델 로드 + warmup
+def preload_models(default: str = "analyzer"):
+    names = [name.strip() for name in os.getenv("MODEL_PRELOAD", default).split(",") if name.strip()]
+    registry = get_model_registry()
+    registry.preload(names, warmup=os.getenv("MODEL_WARMUP", "1") == "1")
+    registry.start_idle_evictor()
@@ -0,0 +1,148 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+from typing import Optional
+import uuid
+from ..models.analysis_job import AnalysisJob, JobStatus
+
+# 백그라운드 작업 CRUD
+
+
+async def get_job(db: AsyncSession, job_id: str) -> Optional[AnalysisJob]:
+    result = await db.execute(select(AnalysisJob).where(AnalysisJob.job_id == job_id))
+    return result.scalar_one_or_none()
+
+
+async def get_job_by_idempotency_key(db: AsyncSession, idempotency_key: str) -> Optional[AnalysisJob]:
+    result = await db.execute(select(AnalysisJob).where(AnalysisJob.idempotency_key == idempotency_key))
+    return result.scalar_one_or_none()
+
+
+# 작업 등록 (같은 idempotency_key가 있으면 새로 만들지 않고 기존 작업 반환)
+async def create_job(db: AsyncSession, job_type: str, payload: dict, idempotency_key: Optional[str] = None, max_attempts: int = 3) -> AnalysisJob:
+    if idempotency_key:
+        existing = await get_job_by_idempotency_key(db, idempotency_key)
+        if existing:
+            return existing
+
+    job = AnalysisJob(
+        job_id=uuid.uuid4().hex,
+        job_type=job_type,
+        status=JobStatus.QUEUED,
+        payload=payload,
+        attempts=0,
+        max_attempts=max_attempts,
+        idempotency_key=idempotency_key,
+        next_run_at=datetime.now(),
+    )
+    db.add(job)
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        # 동시에 같은 키로 등록된 경우
+        await db.rollback()
+        existing = await get_job_by_idempotency_key(db, idempotency_key)
+        if existing:
+            return existing
+        raise
+
+    await db.refresh(job)
+    return job
+
+
+# 실행할 작업 하나를 잠그고 running으로 변경 (여러 워커가 동시에 가져가지 않도록 SKIP LOCKED)
+# 워커가 죽어서 lock_timeout 이상 running으로 남은 작업도 다시 가져감
+async def claim_next_job(db: AsyncSession, worker_id: str, lock_timeout_sec: int) -> Optional[AnalysisJob]:
+    now = datetime.now()
+    stale_before = now - timedelta(seconds=lock_timeout_sec)
+
+    result = await db.execute(
+        select(AnalysisJob)
+        .where(
+            or_(
+                and_(AnalysisJob.status == JobStatus.QUEUED, AnalysisJob.next_run_at <= now),
+                and_(AnalysisJob.status == JobStatus.RUNNING, AnalysisJob.locked_at < stale_before),
+            )
+        )
+        .order_by(AnalysisJob.next_run_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        await db.rollback()
+        return None
+
+    job.status = JobStatus.RUNNING
+    job.locked_by = worker_id
+    job.locked_at = now
+    job.attempts += 1
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+# 실행 중인 작업의 잠금 시각 갱신 (heartbeat) - 잠금을 다른 워커가 가져갔으면 False
+async def touch_job(db: AsyncSession, job_id: str, worker_id: str) -> bool:
+    result = await db.execute(
+        update(AnalysisJob)
+        .where(
+            AnalysisJob.job_id == job_id,
+            AnalysisJob.status == JobStatus.RUNNING,
+            AnalysisJob.locked_by == worker_id,
+        )
+        .values(locked_at=datetime.now())
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+# 이 워커가 아직 잠금을 가진 작업만 (잠금 시간 초과로 다른 워커가 다시 가져간 뒤 늦게 끝난 결과가 덮어쓰지 않도록)
+async def _get_locked_job(db: AsyncSession, job_id: str, worker_id: str) -> Optional[AnalysisJob]:
+    result = await db.execute(
+        select(AnalysisJob)
+        .where(
+            AnalysisJob.job_id == job_id,
+            AnalysisJob.status == JobStatus.RUNNING,
+            AnalysisJob.locked_by == worker_id,
+        )
+        .with_for_update()
+    )
+    return result.scalar_one_or_none()
+
+
+async def mark_job_succeeded(db: AsyncSession, job_id: str, worker_id: str, result: Optional[dict]) -> bool:
+    job = await _get_locked_job(db, job_id, worker_id)
+    if not job:
+        await db.rollback()
+        return False
+    job.status = JobStatus.SUCCEEDED
+    job.result = result
+    job.error = None
+    job.locked_by = None
+    job.locked_at = None
+    job.finished_at = datetime.now()
+    await db.commit()
+    return True
+
+
+# 실패 처리: retry_delay_sec가 있으면 다시 대기열로, 없으면 최종 실패
+async def mark_job_failed(db: AsyncSession, job_id: str, worker_id: str, error: str, retry_delay_sec: Optional[float] = None) -> bool:
+    job = await _get_locked_job(db, job_id, worker_id)
+    if not job:
+        await db.rollback()
+        return False
+    job.error = error
+    job.locked_by = None
+    job.locked_at = None
+
+    if retry_delay_sec is not None:
+        job.status = JobStatus.QUEUED
+        job.next_run_at = datetime.now() + timedelta(seconds=retry_delay_sec)
+    else:
+        job.status = JobStatus.FAILED
+        job.finished_at = datetime.now()
+    await db.commit()
+    return True
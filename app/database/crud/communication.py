@@ -59,13 +59,14 @@ async def get_all_communications(db: AsyncSession) -> List[Communication]:
     return list(result.scalars().all())
 
 
-async def create_voice_file(db: AsyncSession, c_id: int, filename: str, original_format: str, data: bytes, duration: Optional[float]) -> CVoiceFile:
+async def create_voice_file(db: AsyncSession, c_id: int, filename: str, original_format: str, data: bytes, duration: Optional[float], audio_format: Optional[dict] = None) -> CVoiceFile:
     voice_file = CVoiceFile(
         c_id=c_id,
         filename=filename,
         original_format=original_format,
         data=data,
-        duration=duration
+        duration=duration,
+        **(audio_format or {})
     )
     db.add(voice_file)
     await db.commit()
@@ -73,6 +74,14 @@ async def create_voice_file(db: AsyncSession, c_id: int, filename: str, original
     return voice_file
 
 
+# 기존 음성 파일의 저장 포맷 정보 채우기
+async def update_voice_file_format(db: AsyncSession, voice_file: CVoiceFile, audio_format: dict) -> CVoiceFile:
+    for key, value in audio_format.items():
+        setattr(voice_file, key, value)
+    await db.commit()
+    return voice_file
+
+
 async def create_stt_result(db: AsyncSession, c_id: int, c_vf_id: int, json_data: dict) -> CSTTResult:
     stt_result = CSTTResult(
         c_id=c_id,
@@ -0,0 +1,33 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, insert, select
+from typing import Dict, List
+from ..models.user_label_stat import UserLabelStat
+
+# 사용자별 라벨 집계 CRUD
+
+
+async def list_user_label_stats(db: AsyncSession, user_id: int) -> List[UserLabelStat]:
+    result = await db.execute(select(UserLabelStat).where(UserLabelStat.user_id == user_id))
+    return list(result.scalars().all())
+
+
+# 라벨별 집계 행을 잠그고 가져옴 (없는 라벨은 INSERT IGNORE로 먼저 만듦)
+# 같은 사용자의 답변이 동시에 처리돼도 증분 갱신이 섞이지 않도록 SELECT ... FOR UPDATE
+async def lock_user_label_stats(db: AsyncSession, user_id: int, labels: List[str]) -> Dict[str, UserLabelStat]:
+    if labels:
+        await db.execute(
+            insert(UserLabelStat).prefix_with("IGNORE"),
+            [
+                {"user_id": user_id, "label": label, "occurrence_count": 0, "score_sum": 0.0, "score_count": 0, "top_sentences": {}}
+                for label in labels
+            ],
+        )
+
+    result = await db.execute(
+        select(UserLabelStat).where(UserLabelStat.user_id == user_id).with_for_update().execution_options(populate_existing=True)
+    )
+    return {stat.label: stat for stat in result.scalars().all()}
+
+
+async def delete_user_label_stats(db: AsyncSession, user_id: int) -> None:
+    await db.execute(delete(UserLabelStat).where(UserLabelStat.user_id == user_id))
@@ -68,6 +68,7 @@ def create_tables():
         from .models import minigame
         from .models import roles
         from .models import user_roles
+        from .models import analysis_job
 
         Base.metadata.create_all(bind=sync_engine)
 
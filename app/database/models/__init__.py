@@ -6,3 +6,5 @@ from .category import MainCategory, JobCategory
 from .interview import Interview, InterviewQuestion, InterviewAnswer, InterviewResult
 from .audio import VoiceFile
 from .community import CommunityCategory, CommunityPost, CommunityComment, CommunityPostLike
+from .analysis_job import AnalysisJob
+from .user_label_stat import UserLabelStat
@@ -0,0 +1,34 @@
+from sqlalchemy import DateTime, Integer, String, Text, JSON, func
+from app.database.database import Base
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+
+
+# 작업 상태
+class JobStatus:
+    QUEUED = "queued"        # 대기 (재시도 대기 포함)
+    RUNNING = "running"      # 워커가 처리 중
+    SUCCEEDED = "succeeded"  # 완료
+    FAILED = "failed"        # 재시도까지 모두 실패
+
+
+# 백그라운드 분석 작업 테이블 (발표 분석 / 대화 STT+분석 / 면접 종합 분석)
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    job_id: Mapped[str] = mapped_column(String(32), primary_key=True) # uuid hex
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False, index=True) # 핸들러 이름
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default=JobStatus.QUEUED, index=True)
+    payload: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True) # 핸들러 입력
+    result: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True) # 핸들러 반환값
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True) # 마지막 실패 메시지
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, unique=True) # 같은 키로 재요청 시 기존 작업 반환
+    next_run_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True) # 재시도 backoff 반영
+    locked_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True) # 처리 중인 워커 id
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -41,6 +41,11 @@ class CVoiceFile(Base):
     original_format: Mapped[str] = mapped_column(String(10), nullable=False)
     data: Mapped[bytes] = mapped_column(LargeBinary(length=4294967295), nullable=False)
     duration: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # data에 저장된 정규화 오디오 정보 (기존 데이터는 NULL -> STT 시 헤더를 읽어 채움)
+    stored_format: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)  # 'wav' (16bit PCM)
+    sample_rate: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    channels: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    sample_width: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # 바이트 단위 (16bit = 2)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
     
     communication: Mapped["Communication"] = relationship("Communication", back_populates="voice_files")
@@ -70,6 +70,7 @@ class InterviewAnswer(Base):
   stt_metrics_json: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
   created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
   deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+  stats_applied_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # user_label_stats에 반영된 시각 (재분석 시 이전 값 차감)
 
   results: Mapped[List["InterviewResult"]] = relationship("InterviewResult", cascade="all, delete-orphan")  # 세부 평가/결과
   interview: Mapped["Interview"] = relationship("Interview", back_populates="answers")  # 인터뷰 역참조
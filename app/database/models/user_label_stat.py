@@ -0,0 +1,23 @@
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, JSON, UniqueConstraint, func
+from app.database.database import Base
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+
+
+# 사용자별 면접 라벨 집계 (약점 카드용)
+# 답변 분석(i_process_answer) 때마다 증분 갱신 -> 약점 카드는 Chroma 전체 조회 없이 이 테이블만 읽음
+class UserLabelStat(Base):
+  __tablename__ = "user_label_stats"
+  __table_args__ = (UniqueConstraint("user_id", "label", name="uq_user_label_stats_user_label"),)
+
+  stat_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+  user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id"), nullable=False, index=True)
+  label: Mapped[str] = mapped_column(String(50), nullable=False)
+  occurrence_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # 라벨이 붙은 문장 수
+  score_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)  # 답변 전체 점수 합 (평균 = score_sum / score_count)
+  score_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  top_sentences: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # 자주 나온 문장 Space-Saving 카운터 {text: [count, error, latest, answer_id, session_id]}
+  last_answer_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # 가장 최근에 라벨이 붙은 답변
+  last_sentence_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # 그 문장의 Chroma id (유사 답변 검색 기준)
+  updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
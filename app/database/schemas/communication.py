@@ -15,6 +15,10 @@ class VoiceFileResponse(BaseModel):
     filename: str
     original_format: str
     duration: Optional[float]
+    stored_format: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    sample_width: Optional[int] = None
     created_at: datetime
     
     class Config:
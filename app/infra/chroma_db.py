@@ -1,22 +1,268 @@
-import chromadb
-from sentence_transformers import SentenceTransformer
+import json
+import os
+import sys
+import threading
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+from app.infra.vector_store import VectorStore
+
+# 면접 답변 벡터 저장소 (ChromaDB)
+# 임포트만으로는 PersistentClient를 열지 않음 - 처음 조회/저장할 때 (또는 warmup 시) 연결
 
 # client
 persist_dir = Path(__file__).resolve().parents[2] / "chroma_db"
-persist_dir.mkdir(parents=True, exist_ok=True)
-client = chromadb.PersistentClient(path=str(persist_dir))
-
-# Collection 생성/가져오기
-collection = client.get_or_create_collection(
-  name="interview_answers",
-  metadata={"hnsw:space": "cosine"}  # 거리 측정 방식
-)
-
-# 임베딩 모델 한 번만 로드
-embed_model = SentenceTransformer("jhgan/ko-sroberta-multitask")
-
-# 임베딩 함수
-def get_embedding(text: str):
-  vec = embed_model.encode([text])[0]
-  return vec.tolist()
\ No newline at end of file
+
+# 컬렉션 분할
+# - 전체 답변(user_answer_full)과 문장(user_answer_sentence)을 다른 컬렉션에 저장 (type 필터 없음)
+# - user_id % CHROMA_USER_BUCKETS 로 버킷을 나눔 → 검색/조회가 전체 사용자가 아니라 그 버킷의 벡터만 봄
+# 버킷 수는 문서가 쌓인 뒤에는 바꾸지 않음 (사용자 문서가 다른 버킷에서 조회됨)
+CHROMA_USER_BUCKETS = int(os.getenv("CHROMA_USER_BUCKETS", "16"))
+LEGACY_COLLECTION = "interview_answers"  # 분할 전 단일 컬렉션
+
+FULL_TYPE = "user_answer_full"
+SENTENCE_TYPE = "user_answer_sentence"
+_COLLECTION_PREFIX = {FULL_TYPE: "interview_full", SENTENCE_TYPE: "interview_sent"}
+
+
+def full_doc_id(user_id: int, answer_id: int) -> str:
+  return f"user_{user_id}_answer_{answer_id}_full"
+
+
+def sentence_doc_id(user_id: int, answer_id: int, sentence_index: int) -> str:
+  return f"user_{user_id}_answer_{answer_id}_sent_{sentence_index}"
+
+
+# 버킷에 여러 사용자가 같이 있으므로 user_id 조건은 항상 붙임 (+ 같음 조건들)
+def _user_where(user_id: int, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+  conditions = [{"user_id": user_id}] + [{key: value} for key, value in (filters or {}).items()]
+  return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def _include(include: Optional[List[str]]) -> List[str]:
+  return include if include is not None else ["metadatas"]
+
+
+class ChromaVectorStore(VectorStore):
+  backend = "chroma"
+
+  def __init__(self, path: Path = persist_dir, buckets: int = CHROMA_USER_BUCKETS):
+    self.path = Path(path)
+    self.buckets = buckets
+    self._client = None
+    self._collections: Dict[str, Any] = {}
+    self._lock = threading.Lock()
+
+  @property
+  def client(self):
+    if self._client is None:
+      with self._lock:
+        if self._client is None:
+          import chromadb
+          self.path.mkdir(parents=True, exist_ok=True)
+          self._client = chromadb.PersistentClient(path=str(self.path))
+          print(f"[VectorStore] ChromaDB 연결 ({self.path})")
+    return self._client
+
+  @property
+  def initialized(self) -> bool:
+    return self._client is not None
+
+  def _collection(self, doc_type: str, user_id: int):
+    name = f"{_COLLECTION_PREFIX[doc_type]}_b{int(user_id) % self.buckets}"
+    if name not in self._collections:
+      self._collections[name] = self.client.get_or_create_collection(
+        name=name,
+        metadata={"hnsw:space": "cosine"}  # 거리 측정 방식
+      )
+    return self._collections[name]
+
+  def full_collection(self, user_id: int):
+    return self._collection(FULL_TYPE, user_id)
+
+  def sentence_collection(self, user_id: int):
+    return self._collection(SENTENCE_TYPE, user_id)
+
+  # 클라이언트만 미리 열어 둠 (첫 요청 지연 제거)
+  def warmup(self) -> None:
+    self.client.heartbeat()
+
+  # 답변 1건의 전체/문장 문서를 각 컬렉션에 upsert하고, 재분석으로 사라진 문장 문서 삭제
+  def upsert_answer(self, user_id: int, answer_id: int, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+    for doc_type in (FULL_TYPE, SENTENCE_TYPE):
+      picked = [i for i, meta in enumerate(metadatas) if meta.get("type") == doc_type]
+      target = self._collection(doc_type, user_id)
+      if picked:
+        target.upsert(
+          ids=[ids[i] for i in picked],
+          documents=[documents[i] for i in picked],
+          metadatas=[metadatas[i] for i in picked],
+          embeddings=[embeddings[i] for i in picked],
+        )
+
+      try:
+        current_ids = {ids[i] for i in picked}
+        existing = target.get(where=_user_where(user_id, {"answer_id": answer_id}), include=[])
+        stale = [doc_id for doc_id in existing["ids"] if doc_id not in current_ids]
+        if stale:
+          target.delete(ids=stale)
+      except Exception as e:
+        # 저장은 끝났으므로 실패로 돌리지 않음 - 남은 문장은 다음 재분석이나 vector_rebuild --reset으로 정리
+        print(f"[VectorStore] 답변 {answer_id}의 이전 문장 문서 정리 실패 ({doc_type}): {e}")
+
+  def get_full_answers(self, user_id: int, ids: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None, limit: Optional[int] = None) -> dict:
+    if ids is not None:
+      return self.full_collection(user_id).get(ids=ids, include=_include(include))
+    return self.full_collection(user_id).get(where=_user_where(user_id, filters), include=_include(include), limit=limit)
+
+  def get_sentences(self, user_id: int, ids: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None, limit: Optional[int] = None) -> dict:
+    if ids is not None:
+      return self.sentence_collection(user_id).get(ids=ids, include=_include(include))
+    return self.sentence_collection(user_id).get(where=_user_where(user_id, filters), include=_include(include), limit=limit)
+
+  # 사용자의 전체 답변 중 query_embedding과 가까운 것 (cosine distance)
+  def query_full_answers(self, user_id: int, query_embedding, n_results: int, filters: Optional[Dict[str, Any]] = None) -> dict:
+    return self.full_collection(user_id).query(
+      query_embeddings=[query_embedding],
+      n_results=n_results,
+      where=_user_where(user_id, filters),
+    )
+
+  # 디버그용 - 사용자의 전체/문장 문서를 합쳐서 조회
+  def get_user_documents(self, user_id: int, filters: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> dict:
+    merged: Dict[str, list] = {"ids": [], "metadatas": [], "documents": []}
+    for doc_type in (FULL_TYPE, SENTENCE_TYPE):
+      result = self._collection(doc_type, user_id).get(where=_user_where(user_id, filters), include=_include(include))
+      for key in merged:
+        merged[key].extend(result.get(key) or [])
+    return merged
+
+  # 사용자의 문서 모두 삭제 (삭제한 개수 반환)
+  def delete_user_documents(self, user_id: int) -> int:
+    deleted = 0
+    for doc_type in (FULL_TYPE, SENTENCE_TYPE):
+      target = self._collection(doc_type, user_id)
+      before = len(target.get(where=_user_where(user_id), include=[])["ids"])
+      target.delete(where=_user_where(user_id))
+      deleted += before - len(target.get(where=_user_where(user_id), include=[])["ids"])
+    return deleted
+
+  # 버킷 컬렉션 삭제 (분할 전 컬렉션은 migrate가 관리)
+  def reset(self) -> None:
+    for name in _bucket_collection_names(self):
+      self.client.delete_collection(name)
+    self._collections.clear()
+
+  def stats(self) -> Dict[str, Any]:
+    return {"backend": self.backend, "initialized": self.initialized, "buckets": self.buckets, "open_collections": len(self._collections)}
+
+
+# ===== 마이그레이션 =====
+
+# 분할 전 interview_answers 컬렉션의 문서를 전체/문장 x 사용자 버킷 컬렉션으로 복사
+# 저장된 임베딩을 그대로 옮기므로 다시 encode 하지 않음
+# - 버킷에 이미 있는 id는 건너뜀 (재분석/삭제된 문서를 옛 데이터로 덮어쓰거나 되살리지 않도록)
+# - 끝까지 복사하면 완료 표시 파일을 남기고 이후 실행은 바로 끝남 (force=True면 다시 확인)
+def _migration_marker(store: ChromaVectorStore, source_name: str) -> Path:
+  return store.path / f".migrated_{source_name}.json"
+
+
+def read_migration_marker(store: ChromaVectorStore, source_name: str = LEGACY_COLLECTION) -> Optional[Dict[str, int]]:
+  marker = _migration_marker(store, source_name)
+  if not marker.exists():
+    return None
+  return json.loads(marker.read_text())
+
+
+def migrate_collection(store: ChromaVectorStore, source_name: str = LEGACY_COLLECTION, page_size: int = 1000, force: bool = False) -> Dict[str, int]:
+  done = read_migration_marker(store, source_name)
+  if done is not None and not force:
+    print(f"[Chroma] {source_name} 이미 마이그레이션됨 - 건너뜀")
+    return done
+
+  try:
+    source = store.client.get_collection(source_name)
+  except Exception:
+    print(f"[Chroma] {source_name} 컬렉션 없음 - 건너뜀")
+    return {"copied": 0, "existing": 0, "skipped": 0}
+
+  copied = 0
+  existing = 0
+  skipped = 0
+  offset = 0
+  while True:
+    page = source.get(include=["metadatas", "documents", "embeddings"], limit=page_size, offset=offset)
+    page_ids = page.get("ids") or []
+    if not page_ids:
+      break
+    offset += len(page_ids)
+
+    groups: Dict[str, Dict[str, list]] = {}
+    for doc_id, meta, doc, emb in zip(page_ids, page["metadatas"], page["documents"], page["embeddings"]):
+      meta = meta or {}
+      doc_type = meta.get("type")
+      # user_id 추가 전에 저장된 문서는 어떤 조회에도 걸리지 않으므로 옮기지 않음
+      if meta.get("user_id") is None or doc_type not in _COLLECTION_PREFIX:
+        skipped += 1
+        continue
+      target = store._collection(doc_type, meta["user_id"])
+      group = groups.setdefault(target.name, {"collection": target, "ids": [], "metadatas": [], "documents": [], "embeddings": []})
+      group["ids"].append(doc_id)
+      group["metadatas"].append(meta)
+      group["documents"].append(doc)
+      group["embeddings"].append(emb)
+
+    for group in groups.values():
+      target = group.pop("collection")
+      present = set(target.get(ids=group["ids"], include=[])["ids"])
+      picked = [i for i, doc_id in enumerate(group["ids"]) if doc_id not in present]
+      existing += len(group["ids"]) - len(picked)
+      if picked:
+        target.add(**{key: [values[i] for i in picked] for key, values in group.items()})
+      copied += len(picked)
+    print(f"[Chroma] {source_name}: {offset}개 처리 (복사 {copied}, 이미 있음 {existing}, 건너뜀 {skipped})")
+
+  result = {"copied": copied, "existing": existing, "skipped": skipped}
+  _migration_marker(store, source_name).write_text(json.dumps(result))
+  return result
+
+
+def _bucket_collection_names(store: ChromaVectorStore) -> List[str]:
+  names = [c if isinstance(c, str) else c.name for c in store.client.list_collections()]
+  prefixes = tuple(f"{prefix}_b" for prefix in _COLLECTION_PREFIX.values())
+  return [name for name in names if name.startswith(prefixes)]
+
+
+# CLI 실행
+if __name__ == "__main__":
+  if len(sys.argv) < 2 or sys.argv[1] not in ("migrate", "stats"):
+    print("사용법: python -m app.infra.chroma_db [migrate|stats] [--force] [--drop-legacy]")
+    print("")
+    print(f"  migrate                  - 단일 컬렉션({LEGACY_COLLECTION})을 전체/문장 x 사용자 버킷 컬렉션으로 복사 (한 번만, 버킷에 있는 id는 건너뜀)")
+    print("    --force                - 완료 표시가 있어도 다시 확인해서 버킷에 없는 문서 복사 (삭제한 문서도 다시 들어옴)")
+    print("    --drop-legacy          - 복사 개수 확인 후 원본 컬렉션 삭제 (건너뛴 문서도 삭제됨 - 운영자가 직접 실행)")
+    print("  stats                    - 컬렉션별 문서 수")
+    sys.exit(1)
+
+  store = ChromaVectorStore()
+  if sys.argv[1] == "stats":
+    for name in sorted([LEGACY_COLLECTION] + _bucket_collection_names(store)):
+      try:
+        print(f"{name}: {store.client.get_collection(name).count()}")
+      except Exception:
+        pass
+    sys.exit(0)
+
+  result = migrate_collection(store, force="--force" in sys.argv)
+  processed = result["copied"] + result["existing"] + result["skipped"]
+  print(f"[Chroma] 마이그레이션 완료 - 복사 {result['copied']}개, 이미 있음 {result['existing']}개, 건너뜀 {result['skipped']}개")
+  if "--drop-legacy" in sys.argv and processed > 0:
+    try:
+      legacy_count = store.client.get_collection(LEGACY_COLLECTION).count()
+    except Exception:
+      print(f"[Chroma] {LEGACY_COLLECTION} 컬렉션 없음 - 이미 삭제됨")
+      sys.exit(0)
+    if processed == legacy_count:
+      store.client.delete_collection(LEGACY_COLLECTION)
+      print(f"[Chroma] {LEGACY_COLLECTION} 삭제 (옮기지 않은 문서 {result['skipped']}개 포함)")
+    else:
+      print(f"[Chroma] {LEGACY_COLLECTION} 문서 수가 달라 삭제하지 않음 - --force로 다시 실행하세요.")
@@ -0,0 +1,45 @@
+import os
+from typing import List
+from app.core.embedding_cache import get_embedding_cache, normalize_text
+
+# 면접 답변 문장 임베딩 (SentenceTransformer)
+# 벡터 DB와 분리 - 임포트만으로는 모델/DB를 열지 않고 처음 encode할 때 레지스트리에서 로드
+
+# 임베딩 모델은 모델 레지스트리에서 한 번만 로드 (모델 서버 사용 시 원격 프록시)
+def get_embed_model():
+  from app.core.model_registry import get_model
+  return get_model("embedder")
+
+# 한 번의 encode에 넣을 문장 수 / 단위 벡터 정규화 여부 (cosine 공간이라 검색 순위는 같음)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_NORMALIZE = os.getenv("EMBEDDING_NORMALIZE", "1") == "1"
+
+# 캐시 키에 들어가는 모델 이름 (model_registry의 embedder 기본 모델)
+EMBEDDING_MODEL_NAME = "jhgan/ko-sroberta-multitask"
+
+# 여러 텍스트를 한 번에 임베딩 (정규화한 문장 기준 캐시에 없는 것만 encode)
+def get_embeddings(texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE, normalize: bool = EMBEDDING_NORMALIZE) -> List[List[float]]:
+  if not texts:
+    return []
+
+  cache = get_embedding_cache()
+  normalized = [normalize_text(text) for text in texts]
+  keys = [cache.make_key(EMBEDDING_MODEL_NAME, text, normalize) for text in normalized]
+  vecs = cache.get_many(keys)
+
+  # 같은 문장이 여러 번 나와도 한 번만 encode
+  first_index = {}
+  for i, (key, vec) in enumerate(zip(keys, vecs)):
+    if vec is None:
+      first_index.setdefault(key, i)
+
+  missing = list(first_index)
+  if missing:
+    missing_texts = [normalized[first_index[key]] for key in missing]
+    encoded = get_embed_model().encode(missing_texts, batch_size=batch_size, normalize_embeddings=normalize)
+    cache.put_many(EMBEDDING_MODEL_NAME, missing, encoded)
+    by_key = dict(zip(missing, encoded))
+    vecs = [vec if vec is not None else by_key[key] for key, vec in zip(keys, vecs)]
+
+  return [vec.tolist() for vec in vecs]
+
@@ -0,0 +1,382 @@
+import atexit
+import fcntl
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.infra.vector_store import VectorStore
+from app.infra.chroma_db import FULL_TYPE, SENTENCE_TYPE
+
+# 프로세스 내 hnswlib 벡터 저장소 (VECTOR_STORE_BACKEND=hnsw)
+# - 문서/메타데이터/벡터: VECTOR_INDEX_DIR/docs.sqlite3 (WAL, 같은 컨테이너의 워커 프로세스들이 공유하는 기준 데이터)
+# - 검색 인덱스: 문서 종류별 hnswlib 인덱스 - 프로세스마다 메모리에 올림
+# - 저장/삭제는 SQLite 행에 seq(쓰기 순서)를 붙여 기록하고, 각 프로세스는 조회 전에 자기 인덱스보다 새로운 seq만 반영 (증분 추가/삭제)
+# - 인덱스는 VECTOR_SNAPSHOT_INTERVAL_SEC마다 반영한 seq와 함께 파일로 저장 → 다음 시작 때 스냅샷 + 이후 변경만 반영
+# - 한 사용자의 답변 수가 HNSW_EXACT_MAX 이하면 그래프 탐색 대신 정확한 cosine 계산 (작고 결과가 항상 같음)
+# - 인덱스 seed/파라미터 고정 → 같은 순서로 다시 만들면 같은 그래프 (python -m app.service.vector_rebuild)
+
+VECTOR_INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", str(Path(__file__).resolve().parents[2] / "vector_index")))
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "100"))
+HNSW_EXACT_MAX = int(os.getenv("HNSW_EXACT_MAX", "2000"))
+VECTOR_SNAPSHOT_INTERVAL_SEC = int(os.getenv("VECTOR_SNAPSHOT_INTERVAL_SEC", "60"))
+
+_SEED = 100
+_INITIAL_CAPACITY = 1024
+_INDEX_FILES = {FULL_TYPE: "full.bin", SENTENCE_TYPE: "sent.bin"}
+_SNAPSHOT_META = "snapshot.json"
+_DOC_COLUMNS = "label, doc_id, doc_type, user_id, answer_id, document, metadata, dim, vec"
+
+
+def _include(include: Optional[List[str]]) -> List[str]:
+  return include if include is not None else ["metadatas"]
+
+
+def _matches(meta: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+  return all(meta.get(key) == value for key, value in (filters or {}).items())
+
+
+def _vector(dim: int, blob: bytes) -> np.ndarray:
+  return np.frombuffer(blob, dtype=np.float32, count=dim)
+
+
+class HnswVectorStore(VectorStore):
+  backend = "hnsw"
+
+  def __init__(self, path: Path = VECTOR_INDEX_DIR):
+    self.path = Path(path)
+    self.conn: Optional[sqlite3.Connection] = None
+    self.indexes: Dict[str, Any] = {}
+    self.generation: Optional[int] = None
+    self.synced_seq = 0
+    self.snapshot_seq = 0
+    self.last_snapshot = time.monotonic()
+    self._lock = threading.RLock()
+
+  # ===== SQLite (기준 데이터) =====
+
+  def _connect(self) -> sqlite3.Connection:
+    if self.conn is None:
+      self.path.mkdir(parents=True, exist_ok=True)
+      conn = sqlite3.connect(str(self.path / "docs.sqlite3"), timeout=30.0, check_same_thread=False, isolation_level=None)
+      conn.execute("PRAGMA journal_mode=WAL")
+      conn.execute("PRAGMA synchronous=NORMAL")
+      conn.execute(
+        "CREATE TABLE IF NOT EXISTS docs ("
+        " label INTEGER PRIMARY KEY AUTOINCREMENT, doc_id TEXT NOT NULL UNIQUE, doc_type TEXT NOT NULL,"
+        " user_id INTEGER NOT NULL, answer_id INTEGER NOT NULL, document TEXT, metadata TEXT,"
+        " dim INTEGER, vec BLOB, deleted INTEGER NOT NULL DEFAULT 0, seq INTEGER NOT NULL)"
+      )
+      conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_user ON docs (doc_type, user_id, deleted)")
+      conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_answer ON docs (user_id, answer_id)")
+      conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_seq ON docs (seq)")
+      conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+      # rebuilt_at: MySQL에서 전체를 끝까지 다시 만든 시각 (0 = 아직 없음/중간에 실패)
+      conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('seq', 0), ('generation', 0), ('rebuilt_at', 0)")
+      self.conn = conn
+      atexit.register(self.flush)
+      print(f"[VectorStore] hnsw 저장소 열기 ({self.path})")
+    return self.conn
+
+  def _meta(self, key: str) -> int:
+    return self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+  # 쓰기 트랜잭션 - BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡으므로 seq 순서 = 커밋 순서
+  @contextmanager
+  def _write(self):
+    conn = self._connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+      conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'seq'")
+      seq = conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()[0]
+      yield conn, seq
+      conn.execute("COMMIT")
+    except Exception:
+      conn.execute("ROLLBACK")
+      raise
+
+  def _rows(self, where: str, params: tuple) -> List[sqlite3.Row]:
+    return self._connect().execute(f"SELECT {_DOC_COLUMNS} FROM docs WHERE deleted = 0 AND {where} ORDER BY label", params).fetchall()
+
+  # ===== hnswlib 인덱스 (프로세스별) =====
+
+  def _new_index(self, dim: int, capacity: int = _INITIAL_CAPACITY):
+    import hnswlib
+    index = hnswlib.Index(space="cosine", dim=dim)
+    index.init_index(max_elements=capacity, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M, random_seed=_SEED)
+    index.set_ef(HNSW_EF_SEARCH)
+    return index
+
+  @contextmanager
+  def _snapshot_lock(self, exclusive: bool):
+    self.path.mkdir(parents=True, exist_ok=True)
+    with open(self.path / "snapshot.lock", "a") as lock_file:
+      fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+      try:
+        yield
+      finally:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+  # 스냅샷이 현재 generation이면 불러오고, 아니면 빈 인덱스에서 SQLite 전체를 반영
+  def _load(self, generation: int) -> None:
+    import hnswlib
+    self.indexes = {}
+    self.synced_seq = 0
+    self.snapshot_seq = -1  # 스냅샷 없이 새로 만든 인덱스 → 다음 주기에 저장
+    self.generation = generation
+
+    with self._snapshot_lock(exclusive=False):
+      meta_path = self.path / _SNAPSHOT_META
+      if not meta_path.exists():
+        return
+      try:
+        snapshot = json.loads(meta_path.read_text())
+        if snapshot.get("generation") != generation:
+          return
+        indexes = {}
+        for doc_type, dim in snapshot["dims"].items():
+          index = hnswlib.Index(space="cosine", dim=dim)
+          index.load_index(str(self.path / _INDEX_FILES[doc_type]))
+          index.set_ef(HNSW_EF_SEARCH)
+          indexes[doc_type] = index
+        self.indexes = indexes
+        self.synced_seq = self.snapshot_seq = snapshot["seq"]
+        print(f"[VectorStore] 스냅샷 로드 (seq {self.synced_seq})")
+      except Exception as e:
+        print(f"[VectorStore] 스냅샷 로드 실패 - SQLite에서 다시 만듦: {e}")
+
+  def _snapshot(self, force: bool = False) -> None:
+    if not self.indexes or self.synced_seq == self.snapshot_seq:
+      return
+    if not force and time.monotonic() - self.last_snapshot < VECTOR_SNAPSHOT_INTERVAL_SEC:
+      return
+
+    with self._snapshot_lock(exclusive=True):
+      # 다른 프로세스가 더 최신 스냅샷을 이미 썼으면 덮어쓰지 않음
+      meta_path = self.path / _SNAPSHOT_META
+      if meta_path.exists():
+        current = json.loads(meta_path.read_text())
+        if current.get("generation") == self.generation and current.get("seq", 0) >= self.synced_seq:
+          self.snapshot_seq = self.synced_seq
+          self.last_snapshot = time.monotonic()
+          return
+
+      for doc_type, index in self.indexes.items():
+        tmp_path = self.path / f"{_INDEX_FILES[doc_type]}.{os.getpid()}.tmp"
+        index.save_index(str(tmp_path))
+        os.replace(tmp_path, self.path / _INDEX_FILES[doc_type])
+      tmp_meta = self.path / f"{_SNAPSHOT_META}.{os.getpid()}.tmp"
+      tmp_meta.write_text(json.dumps({
+        "generation": self.generation,
+        "seq": self.synced_seq,
+        "dims": {doc_type: index.dim for doc_type, index in self.indexes.items()},
+      }))
+      os.replace(tmp_meta, meta_path)
+
+    self.snapshot_seq = self.synced_seq
+    self.last_snapshot = time.monotonic()
+    print(f"[VectorStore] 스냅샷 저장 (seq {self.synced_seq})")
+
+  # 다른 프로세스가 저장/삭제한 변경까지 이 프로세스의 인덱스에 반영 (seq 순서로 각 행의 최종 상태만)
+  def _sync(self) -> None:
+    conn = self._connect()
+    generation = self._meta("generation")
+    if generation != self.generation:
+      self._load(generation)
+
+    rows = conn.execute(
+      "SELECT label, doc_type, deleted, dim, vec, seq FROM docs WHERE seq > ? ORDER BY seq",
+      (self.synced_seq,)
+    ).fetchall()
+    if not rows:
+      return
+
+    additions: Dict[str, Dict[str, list]] = {}
+    for label, doc_type, deleted, dim, vec, seq in rows:
+      index = self.indexes.get(doc_type)
+      if deleted or vec is None:
+        if index is not None:
+          try:
+            index.mark_deleted(label)
+          except RuntimeError:
+            pass  # 인덱스에 들어간 적 없는 문서
+        continue
+      group = additions.setdefault(doc_type, {"labels": [], "vecs": []})
+      group["labels"].append(label)
+      group["vecs"].append(_vector(dim, vec))
+
+    for doc_type, group in additions.items():
+      vecs = np.stack(group["vecs"])
+      index = self.indexes.get(doc_type)
+      if index is None:
+        index = self.indexes[doc_type] = self._new_index(vecs.shape[1], max(_INITIAL_CAPACITY, len(vecs)))
+      needed = index.element_count + len(vecs)
+      if needed > index.max_elements:
+        index.resize_index(max(needed, index.max_elements * 2))
+      # 같은 label이면 벡터 교체 (삭제 표시도 풀림), 순서 고정을 위해 단일 스레드로 추가
+      index.add_items(vecs, group["labels"], num_threads=1)
+
+    self.synced_seq = rows[-1][5]
+    self._snapshot()
+
+  # ===== 저장소 API =====
+
+  def warmup(self) -> None:
+    with self._lock:
+      self._sync()
+
+  def upsert_answer(self, user_id: int, answer_id: int, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+    with self._lock:
+      with self._write() as (conn, seq):
+        for doc_id, document, meta, embedding in zip(ids, documents, metadatas, embeddings):
+          vec = np.asarray(embedding, dtype=np.float32)
+          conn.execute(
+            "INSERT INTO docs (doc_id, doc_type, user_id, answer_id, document, metadata, dim, vec, deleted, seq)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?)"
+            " ON CONFLICT(doc_id) DO UPDATE SET doc_type = excluded.doc_type, user_id = excluded.user_id,"
+            " answer_id = excluded.answer_id, document = excluded.document, metadata = excluded.metadata,"
+            " dim = excluded.dim, vec = excluded.vec, deleted = 0, seq = excluded.seq",
+            (doc_id, meta.get("type"), user_id, answer_id, document, json.dumps(meta, ensure_ascii=False), int(vec.shape[0]), vec.tobytes(), seq)
+          )
+        # 재분석으로 문장 수가 줄었으면 남은 문서 삭제 표시
+        placeholders = ",".join("?" * len(ids))
+        conn.execute(
+          f"UPDATE docs SET deleted = 1, vec = NULL, seq = ? WHERE user_id = ? AND answer_id = ? AND deleted = 0 AND doc_id NOT IN ({placeholders})",
+          (seq, user_id, answer_id, *ids)
+        )
+      self._sync()
+
+  def _result(self, rows: List[sqlite3.Row], include: List[str]) -> dict:
+    result: Dict[str, Any] = {"ids": [row[1] for row in rows]}
+    if "metadatas" in include:
+      result["metadatas"] = [json.loads(row[6]) for row in rows]
+    if "documents" in include:
+      result["documents"] = [row[5] for row in rows]
+    if "embeddings" in include:
+      result["embeddings"] = [_vector(row[7], row[8]) for row in rows]
+    return result
+
+  def _get(self, doc_type: str, user_id: int, ids: Optional[List[str]], filters: Optional[Dict[str, Any]], include: Optional[List[str]], limit: Optional[int]) -> dict:
+    with self._lock:
+      if ids is not None:
+        if not ids:
+          return self._result([], _include(include))
+        placeholders = ",".join("?" * len(ids))
+        found = {row[1]: row for row in self._rows(f"doc_type = ? AND user_id = ? AND doc_id IN ({placeholders})", (doc_type, user_id, *ids))}
+        rows = [found[doc_id] for doc_id in ids if doc_id in found]
+      else:
+        rows = [row for row in self._rows("doc_type = ? AND user_id = ?", (doc_type, user_id)) if _matches(json.loads(row[6]), filters)]
+        if limit is not None:
+          rows = rows[:limit]
+      return self._result(rows, _include(include))
+
+  def get_full_answers(self, user_id: int, ids: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None, limit: Optional[int] = None) -> dict:
+    return self._get(FULL_TYPE, user_id, ids, filters, include, limit)
+
+  def get_sentences(self, user_id: int, ids: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None, limit: Optional[int] = None) -> dict:
+    return self._get(SENTENCE_TYPE, user_id, ids, filters, include, limit)
+
+  def query_full_answers(self, user_id: int, query_embedding, n_results: int, filters: Optional[Dict[str, Any]] = None) -> dict:
+    query = np.asarray(query_embedding, dtype=np.float32)
+    with self._lock:
+      candidates = [row for row in self._rows("doc_type = ? AND user_id = ?", (FULL_TYPE, user_id)) if _matches(json.loads(row[6]), filters)]
+      k = min(n_results, len(candidates))
+      if k == 0:
+        return {"ids": [[]], "metadatas": [[]], "documents": [[]], "distances": [[]]}
+
+      by_label = {row[0]: row for row in candidates}
+      if len(candidates) <= HNSW_EXACT_MAX:
+        # 정확한 cosine distance (label 순으로 안정 정렬 → 항상 같은 순위)
+        vecs = np.stack([_vector(row[7], row[8]) for row in candidates])
+        sims = vecs @ query / (np.linalg.norm(vecs, axis=1) * np.linalg.norm(query) + 1e-12)
+        order = np.argsort(-sims, kind="stable")[:k]
+        labels = [candidates[i][0] for i in order]
+        distances = [float(1.0 - sims[i]) for i in order]
+      else:
+        self._sync()
+        index = self.indexes[FULL_TYPE]
+        index.set_ef(max(HNSW_EF_SEARCH, k))
+        found, dists = index.knn_query(query.reshape(1, -1), k=k, num_threads=1, filter=lambda label: label in by_label)
+        labels = [int(label) for label in found[0]]
+        distances = [float(d) for d in dists[0]]
+
+      rows = [by_label[label] for label in labels]
+      return {
+        "ids": [[row[1] for row in rows]],
+        "metadatas": [[json.loads(row[6]) for row in rows]],
+        "documents": [[row[5] for row in rows]],
+        "distances": [distances],
+      }
+
+  def get_user_documents(self, user_id: int, filters: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> dict:
+    merged: Dict[str, list] = {"ids": [], "metadatas": [], "documents": []}
+    for doc_type in (FULL_TYPE, SENTENCE_TYPE):
+      result = self._get(doc_type, user_id, None, filters, include, None)
+      for key in merged:
+        merged[key].extend(result.get(key) or [])
+    return merged
+
+  def delete_user_documents(self, user_id: int) -> int:
+    with self._lock:
+      with self._write() as (conn, seq):
+        deleted = conn.execute("UPDATE docs SET deleted = 1, vec = NULL, seq = ? WHERE user_id = ? AND deleted = 0", (seq, user_id)).rowcount
+      self._sync()
+      return deleted
+
+  # 전체 삭제 - generation을 올려서 다른 프로세스도 기존 인덱스/스냅샷을 버리게 함
+  def reset(self) -> None:
+    with self._lock:
+      with self._write() as (conn, _):
+        conn.execute("DELETE FROM docs")
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+        conn.execute("UPDATE meta SET value = 0 WHERE key = 'rebuilt_at'")
+      self._sync()
+
+  def rebuilt_at(self) -> int:
+    return self._meta("rebuilt_at")
+
+  def set_rebuilt_at(self, value: int) -> None:
+    self._connect().execute("UPDATE meta SET value = ? WHERE key = 'rebuilt_at'", (value,))
+
+  def flush(self) -> None:
+    with self._lock:
+      if self.conn is None:
+        return
+      self._sync()
+      self._snapshot(force=True)
+
+  def stats(self) -> Dict[str, Any]:
+    return {
+      "backend": self.backend,
+      "initialized": self.conn is not None,
+      "synced_seq": self.synced_seq,
+      "snapshot_seq": self.snapshot_seq,
+      "rebuilt_at": self.rebuilt_at() if self.conn is not None else None,
+      "indexed": {doc_type: index.get_current_count() for doc_type, index in self.indexes.items()},
+    }
+
+
+# CLI 실행
+if __name__ == "__main__":
+  if len(sys.argv) < 2 or sys.argv[1] not in ("snapshot", "stats"):
+    print("사용법: python -m app.infra.hnsw_store [snapshot|stats]")
+    print("")
+    print(f"  snapshot - SQLite 변경을 모두 반영한 인덱스를 {VECTOR_INDEX_DIR}에 저장")
+    print("  stats    - 반영한 seq / 인덱스 문서 수")
+    sys.exit(1)
+
+  store = HnswVectorStore()
+  if sys.argv[1] == "snapshot":
+    store.flush()
+  else:
+    store.warmup()
+  print(json.dumps(store.stats(), ensure_ascii=False))
@@ -0,0 +1,94 @@
+import os
+from typing import Any, Dict, List, Optional
+
+# 면접 답변 벡터 저장소 진입점
+# VECTOR_STORE_BACKEND=chroma (기본, ChromaDB 컬렉션) | hnsw (프로세스 내 hnswlib 인덱스 + 로컬 SQLite)
+# 두 구현 모두 get/query 결과를 Chroma 결과와 같은 dict 형식으로 돌려줌 (evidence_builder 등 그대로 사용)
+#
+# 임포트 비용 없음 - get_vector_store()를 처음 쓸 때 저장소 객체를 만들고, 실제 DB/인덱스는 첫 조회/저장 때 연다
+# 이벤트 루프에서는 run_inference("vector_store", get_vector_store().<메서드>, ...)로 호출
+# 어느 구현이든 `python -m app.service.vector_rebuild`로 MySQL(i_answers.labels_json)에서 다시 만들 수 있음
+
+
+class VectorStore:
+  backend = ""
+
+  # 클라이언트/인덱스를 미리 열어 둠 (첫 요청 지연 제거)
+  def warmup(self) -> None:
+    raise NotImplementedError
+
+  # 답변 1건의 전체/문장 문서를 저장하고, 재분석으로 사라진 문장 문서 삭제
+  def upsert_answer(self, user_id: int, answer_id: int, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+    raise NotImplementedError
+
+  # ids 또는 같음 조건(filters)으로 조회 - {"ids": [...], "metadatas": [...], "documents": [...], "embeddings": [...]}
+  def get_full_answers(self, user_id: int, ids: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None, limit: Optional[int] = None) -> dict:
+    raise NotImplementedError
+
+  def get_sentences(self, user_id: int, ids: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None, limit: Optional[int] = None) -> dict:
+    raise NotImplementedError
+
+  # 사용자의 전체 답변 중 가까운 것 - {"ids": [[...]], "metadatas": [[...]], "documents": [[...]], "distances": [[...]]} (cosine distance)
+  def query_full_answers(self, user_id: int, query_embedding, n_results: int, filters: Optional[Dict[str, Any]] = None) -> dict:
+    raise NotImplementedError
+
+  # 디버그용 - 사용자의 전체/문장 문서를 합쳐서 조회
+  def get_user_documents(self, user_id: int, filters: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> dict:
+    raise NotImplementedError
+
+  # 사용자의 문서 모두 삭제 (삭제한 개수 반환)
+  def delete_user_documents(self, user_id: int) -> int:
+    raise NotImplementedError
+
+  # 전체 문서 삭제 (MySQL에서 다시 만들기 전)
+  def reset(self) -> None:
+    raise NotImplementedError
+
+  # vector_rebuild로 전체를 끝까지 다시 만든 시각 (unix time, 0 = 기록 없음) - 기록을 남기지 않는 구현은 항상 0
+  def rebuilt_at(self) -> int:
+    return 0
+
+  def set_rebuilt_at(self, value: int) -> None:
+    pass
+
+  # 메모리에만 있는 변경을 디스크에 저장 (스냅샷이 없는 구현은 할 일 없음)
+  def flush(self) -> None:
+    pass
+
+  def stats(self) -> Dict[str, Any]:
+    return {"backend": self.backend}
+
+
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma").lower()
+
+_store: Optional[VectorStore] = None
+
+
+def create_vector_store(backend: str = VECTOR_STORE_BACKEND) -> VectorStore:
+  if backend == "hnsw":
+    from app.infra.hnsw_store import HnswVectorStore
+    return HnswVectorStore()
+  if backend == "chroma":
+    from app.infra.chroma_db import ChromaVectorStore
+    return ChromaVectorStore()
+  raise ValueError(f"알 수 없는 VECTOR_STORE_BACKEND: {backend}")
+
+
+def get_vector_store() -> VectorStore:
+  global _store
+  if _store is None:
+    _store = create_vector_store()
+  return _store
+
+
+# 서버 시작 시 호출 (VECTOR_STORE_WARMUP=1) - DB 연결 + 임베딩 모델 로드/warmup을 첫 요청 전에
+def warmup_vector_store(embedder: bool = True) -> None:
+  get_vector_store().warmup()
+  if embedder:
+    # 모델 서버 사용 시에는 원격 프록시만 만들고 로드하지 않음
+    from app.core.model_registry import get_model_registry
+    get_model_registry().get("embedder", warmup=True)
+
+
+def should_warmup_vector_store() -> bool:
+  return os.getenv("VECTOR_STORE_WARMUP", "0") == "1"
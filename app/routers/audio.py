@@ -1,6 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import Response
 from app.service.audio_service import AudioService
+from app.core.inference_executor import run_inference, InferenceQueueFullError
 
 router = APIRouter(prefix="/audio", tags=["audio"])
 
@@ -25,7 +26,7 @@ async def convert_audio_to_wav(
         if not audio_data:
             raise HTTPException(status_code=400, detail="빈 파일입니다.")
 
-        wav_data, duration = AudioService.convert_to_wav(audio_data, file_extension)
+        wav_data, duration = await run_inference("audio", AudioService.convert_to_wav, audio_data, file_extension)
 
         return Response(
             content=wav_data,
@@ -36,7 +37,7 @@ async def convert_audio_to_wav(
             }
         )
 
-    except HTTPException:
+    except (HTTPException, InferenceQueueFullError):
         raise
     except Exception as e:
         raise HTTPException(
@@ -58,7 +59,7 @@ async def get_audio_info(
         if not audio_data:
             raise HTTPException(status_code=400, detail="빈 파일입니다.")
 
-        wav_data, duration = AudioService.convert_to_wav(audio_data, file_extension)
+        wav_data, duration = await run_inference("audio", AudioService.convert_to_wav, audio_data, file_extension)
 
         return {
             "success": True,
@@ -74,7 +75,7 @@ async def get_audio_info(
             }
         }
 
-    except HTTPException:
+    except (HTTPException, InferenceQueueFullError):
         raise
     except Exception as e:
         raise HTTPException(
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Header
 from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.database import get_db
 from app.database.crud import communication as crud
 from app.database.schemas.communication import CommunicationResponse, VoiceFileResponse, STTResultResponse, AnalysisResultResponse, CommunicationDetailResponse
-from app.service.audio_service import AudioService
+from app.service.audio_service import AudioService, NORMALIZED_WAV_FORMAT, describe_wav
 from app.service.stt_service import STTService
 from app.service.c_analysis_service import get_c_analysis_service
 from app.core.settings import settings
+from app.core.inference_executor import run_inference, InferenceQueueFullError
+from app.service.job_queue import enqueue_job, job_accepted_response
+from typing import Optional
 
 router = APIRouter(prefix="/communication", tags=["Communication"])
 
@@ -27,7 +30,9 @@ async def upload_wav(
     original_format = file.filename.split('.')[-1]
     
     try:
-        wav_data, duration = audio_service.convert_to_wav(audio_data, original_format)
+        wav_data, duration = await run_inference("audio", audio_service.convert_to_wav, audio_data, original_format)
+    except InferenceQueueFullError:
+        raise
     except RuntimeError as e:
         raise HTTPException(status_code=400, detail=f"오디오 변환 실패: {str(e)}")
     except Exception as e:
@@ -39,12 +44,42 @@ async def upload_wav(
         filename=file.filename,
         original_format=original_format,
         data=wav_data,
-        duration=duration
+        duration=duration,
+        audio_format=NORMALIZED_WAV_FORMAT
     )
     
     return communication
 
 
+# 저장된 음성이 이미 16kHz mono 16bit wav면 변환 없이 그대로 STT에 전달
+def _is_normalized(audio_format: Optional[dict]) -> bool:
+    return bool(audio_format) and all(audio_format.get(k) == v for k, v in NORMALIZED_WAV_FORMAT.items())
+
+
+async def _stt_ready_wav(db: AsyncSession, voice_file) -> bytes:
+    audio_format = {
+        "stored_format": voice_file.stored_format,
+        "sample_rate": voice_file.sample_rate,
+        "channels": voice_file.channels,
+        "sample_width": voice_file.sample_width,
+    }
+    if _is_normalized(audio_format):
+        return voice_file.data
+
+    # 포맷 정보가 없는 기존 데이터: wav 헤더만 읽어서 확인 후 DB에 채워둠
+    if voice_file.stored_format is None:
+        probed = describe_wav(voice_file.data)
+        if probed:
+            await crud.update_voice_file_format(db, voice_file, probed)
+            if _is_normalized(probed):
+                return voice_file.data
+
+    # 정규화되지 않은 데이터만 변환 (저장된 바이트가 wav면 원본 확장자 대신 wav로 디코딩)
+    source_format = voice_file.stored_format or ("wav" if describe_wav(voice_file.data) else voice_file.original_format)
+    wav_data, _ = await run_inference("audio", audio_service.convert_to_wav, voice_file.data, source_format)
+    return wav_data
+
+
 @router.post("/{c_id}/stt", response_model=STTResultResponse)
 async def process_stt(
     c_id: int,
@@ -58,7 +93,7 @@ async def process_stt(
     if not voice_file:
         raise HTTPException(status_code=404, detail="Voice file not found")
 
-    wav_data, _ = audio_service.convert_to_wav(voice_file.data, voice_file.original_format)
+    wav_data = await _stt_ready_wav(db, voice_file)
 
     chirp_result = await stt_service.transcribe_chirp(wav_data)
 
@@ -111,6 +146,8 @@ async def analyze_communication(
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except InferenceQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"분석 중 오류 발생: {str(e)}")
 
@@ -199,6 +236,27 @@ async def analyze_communication(
     return final_result
 
 
+# STT + 분석을 백그라운드 작업으로 등록 (바로 job_id 반환, 결과는 GET /jobs/{job_id})
+@router.post("/{c_id}/jobs", status_code=202)
+async def enqueue_communication_analysis(
+    c_id: int,
+    target_speaker: str = "1",
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_db)
+):
+    communication = await crud.get_communication_by_id(db, c_id)
+    if not communication:
+        raise HTTPException(status_code=404, detail="Communication not found")
+
+    job = await enqueue_job(
+        db,
+        "communication_analyze",
+        {"c_id": c_id, "target_speaker": target_speaker},
+        idempotency_key=idempotency_key,
+    )
+    return job_accepted_response(job)
+
+
 @router.get("/{c_id}", response_model=CommunicationDetailResponse)
 async def get_communication_detail(c_id: int, db: AsyncSession = Depends(get_db)):
     communication = await crud.get_communication_with_details(db, c_id)
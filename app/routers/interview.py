@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.database import get_db
 from app.service.analysis_service import get_analysis_service
@@ -12,6 +12,9 @@ from app.service.audio_service import AudioService
 from app.service.stt_service import STTService
 from app.service.i_stt_metrics import compute_stt_metrics
 from app.core.settings import settings
+from app.core.inference_executor import run_inference, InferenceQueueFullError
+from app.service.job_queue import enqueue_job, job_accepted_response
+from typing import Optional
 
 
 
@@ -191,10 +194,23 @@ async def analyze_interview_full(i_id:int, db: AsyncSession = Depends(get_db)):
         return report
     except ValueError as e:
         raise HTTPException(status_code=422, detail=f"{e}")
+    except InferenceQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"분석 중 오류 : {e}")
 
 
+# 인터뷰 종합 분석을 백그라운드 작업으로 등록 (바로 job_id 반환, 결과는 GET /jobs/{job_id})
+@router.post("/{i_id}/analyze_full/jobs", status_code=202)
+async def enqueue_interview_analysis(i_id: int, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"), db: AsyncSession = Depends(get_db)):
+    interview=await crud.get_i(db, i_id)
+    if not interview:
+        raise HTTPException(status_code=404, detail="모의면접을 찾을 수 없습니다.")
+
+    job=await enqueue_job(db, "interview_analyze_full", {"i_id": i_id}, idempotency_key=idempotency_key)
+    return job_accepted_response(job)
+
+
 # 인터뷰 직후 결과
 @router.get("/{i_id}/immediate_result", response_model=ImmediateResultResponse)
 async def get_interview_immediate_result(i_id: int, db: AsyncSession = Depends(get_db)):
@@ -203,6 +219,8 @@ async def get_interview_immediate_result(i_id: int, db: AsyncSession = Depends(g
         return await get_immediate_result(i_id, db)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except InferenceQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"결과 조회 중 오류: {e}")
 
@@ -243,14 +261,14 @@ async def upload_answer_audio(answer_id: int, file: UploadFile = File(...), db:
     data = await file.read()
     ext = (file.filename.split(".")[-1] if "." in file.filename else "wav") or "wav"
 
-    wav_data, duration = AudioService.convert_to_wav(data, ext)
+    wav_data, duration = await run_inference("audio", AudioService.convert_to_wav, data, ext)
 
 
     if language=="en":
         from app.service.whisper_stt_service import WhisperSTTService
         from app.service.en_stt_metrics import compute_en_stt_metrics
 
-        stt_service=WhisperSTTService(model_name="base")
+        stt_service=WhisperSTTService()
         stt_result=await stt_service.transcribe_english(wav_data)
         transcript=extract_transcript(stt_result)
         stt_metrics=compute_en_stt_metrics(stt_result)
@@ -289,13 +307,13 @@ async def upload_process_answer_audio(answer_id:int, file:UploadFile=File(...),
     ext=(file.filename.split(".")[-1] if "." in file.filename else "wav") or "wav"
 
     # STT 처리
-    wav_data, duration=AudioService.convert_to_wav(data, ext)
+    wav_data, duration=await run_inference("audio", AudioService.convert_to_wav, data, ext)
 
     if language=="en":
         from app.service.whisper_stt_service import WhisperSTTService
         from app.service.en_stt_metrics import compute_en_stt_metrics
 
-        stt_service=WhisperSTTService(model_name="base")
+        stt_service=WhisperSTTService()
         stt_result=await stt_service.transcribe_english(wav_data)
         transcript=extract_transcript(stt_result)
         stt_metrics=compute_en_stt_metrics(stt_result)
@@ -472,6 +490,8 @@ async def get_user_weaknesses(
     from app.service.weakness_analyzer import get_weakness_analysis
     try:
         return await get_weakness_analysis(db, user_id)
+    except InferenceQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"약점 분석 중 오류: {e}")
 
@@ -509,13 +529,11 @@ async def get_interview_status(i_id:int, db:AsyncSession=Depends(get_db)):
 # ChromaDB 데이터 확인
 @router.get("/debug/chroma/{user_id}")
 async def debug_chroma_data(user_id: int):
-    from app.infra.chroma_db import collection
+    from app.infra.vector_store import get_vector_store
+    store = get_vector_store()
 
-    # 사용자의 모든 데이터 조회
-    all_results = collection.get(
-        where={"user_id": user_id},
-        include=["metadatas", "documents"]
-    )
+    # 사용자의 모든 데이터 조회 (전체 답변 + 문장 컬렉션)
+    all_results = await run_inference("vector_store", store.get_user_documents, user_id, include=["metadatas", "documents"])
 
     # 언어별로 분류
     ko_count = 0
@@ -532,15 +550,7 @@ async def debug_chroma_data(user_id: int):
             no_lang_count += 1
 
     # 한국어만 조회
-    ko_results = collection.get(
-        where={
-            "$and": [
-                {"user_id": user_id},
-                {"language": "ko"}
-            ]
-        },
-        include=["metadatas"]
-    )
+    ko_results = await run_inference("vector_store", store.get_user_documents, user_id, filters={"language": "ko"})
 
     return {
         "user_id": user_id,
@@ -556,19 +566,18 @@ async def debug_chroma_data(user_id: int):
 # ChromaDB 데이터 삭제
 @router.delete("/debug/chroma/{user_id}")
 async def delete_chroma_data(user_id: int):
-    from app.infra.chroma_db import collection
+    from app.infra.vector_store import get_vector_store
+    store = get_vector_store()
 
     try:
         # 삭제 전 개수 확인
-        before = collection.get(where={"user_id": user_id}, include=["metadatas"])
-        before_count = len(before.get("ids", []))
+        before_count = len((await run_inference("vector_store", store.get_user_documents, user_id, include=[]))["ids"])
 
         # 삭제
-        collection.delete(where={"user_id": user_id})
+        await run_inference("vector_store", store.delete_user_documents, user_id)
 
         # 삭제 후 확인
-        after = collection.get(where={"user_id": user_id}, include=["metadatas"])
-        after_count = len(after.get("ids", []))
+        after_count = len((await run_inference("vector_store", store.get_user_documents, user_id, include=[]))["ids"])
 
         return {
             "success": True,
@@ -577,5 +586,7 @@ async def delete_chroma_data(user_id: int):
             "before_count": before_count,
             "after_count": after_count
         }
+    except InferenceQueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ChromaDB 삭제 실패: {e}")
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.crud.category import list_job_categories, list_main_categories
+from app.database.crud.analysis_job import get_job
 from app.database.database import get_db
 from app.database.schemas.category import JobCategoryResponse, MainCategoryResponse
+from app.service.job_queue import job_to_dict
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
@@ -18,4 +20,13 @@ async def get_job_categories(
     m_category_id: int | None = Query(default=None, description="선택적으로 상위 카테고리로 필터링"),
     db: AsyncSession = Depends(get_db),
 ):
-    return await list_job_categories(db, m_category_id)
\ No newline at end of file
+    return await list_job_categories(db, m_category_id)
+
+
+# 백그라운드 분석 작업 상태 조회 (queued / running / succeeded / failed)
+@router.get("/{job_id}")
+async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)):
+    job = await get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job_to_dict(job)
@@ -8,9 +8,9 @@ from ..service.scoring_service import ScoringService
 from ..service.audio_service import AudioService
 from ..service.stt_service import STTService
 from ..core.settings import settings
+from ..core.inference_executor import run_inference
 from typing import Optional
 import random
-import asyncio
 
 router = APIRouter(prefix="/api/minigame", tags=["minigame"])
 
@@ -90,19 +90,17 @@ async def get_next_sentence(session_id: str, db: AsyncSession = Depends(get_db))
     }
 
 
-def process_audio_background(
+# 응답 후 같은 이벤트 루프에서 실행되는 비동기 작업 (세션 점수가 이 프로세스 메모리에 있으므로 워커로 보내지 않음)
+async def process_audio_background(
     session_id: str, 
     audio_bytes: bytes, 
     file_format: str, 
     sentence_text: str
 ):
     try:
-        wav_data, _ = audio_service.convert_to_wav(audio_bytes, file_format)
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        stt_json = loop.run_until_complete(stt_service.transcribe_chirp(wav_data))
-        loop.close()
+        wav_data, _ = await run_inference("audio", audio_service.convert_to_wav, audio_bytes, file_format)
+
+        stt_json = await stt_service.transcribe_chirp(wav_data)
         
         recognized_text = flatten_transcript(stt_json)
         score = scoring_service.calculate_accuracy(sentence_text, recognized_text)
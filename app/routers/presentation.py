@@ -1,10 +1,12 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..database.database import get_db
 from ..database.crud.presentation import PresentationCRUD
 from ..service.presentation_analysis_service import get_presentation_analysis_service
+from ..service.audio_service import AudioService
+from ..core.inference_executor import run_inference, InferenceQueueFullError
+from ..service.job_queue import enqueue_job, find_job_by_idempotency_key, spool_upload, job_accepted_response
 from typing import Optional
-import tempfile
 import os
 
 router = APIRouter(prefix="/presentations", tags=["Presentation"])
@@ -22,25 +24,25 @@ async def create_presentation(user_id: int = Form(...), title: str = Form(...),
 @router.post("/{pr_id}/analyze")
 async def analyze_presentation(pr_id: int, audio_file: UploadFile = File(...), estimated_syllables: Optional[int] = Form(None), db: AsyncSession = Depends(get_db)):
 
-    # 파일 저장
-    temp_file = None
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp:
-            contents = await audio_file.read()
-            tmp.write(contents)
-            temp_file = tmp.name
-
+        contents = await audio_file.read()
         file_size = len(contents)
+        file_extension = os.path.splitext(audio_file.filename or "")[1] or ".wav"
+
+        # 업로드 바이트를 바로 16kHz float32 파형으로 디코딩 (임시 파일 없이 분석기로 전달)
+        decoded = await run_inference("audio", AudioService.decode_audio, contents, file_extension)
 
-        # 음성 파일 DB 등록
-        voice_file = await PresentationCRUD.create_voice_file(db=db, pr_id=pr_id, file_path=temp_file, original_filename=audio_file.filename, file_size=file_size)
+        # 음성 파일 DB 등록 (디스크에 남는 파일이 없으므로 원본 파일명을 경로로 기록)
+        voice_file = await PresentationCRUD.create_voice_file(db=db, pr_id=pr_id, file_path=audio_file.filename, original_filename=audio_file.filename, file_size=file_size)
 
         # 분석 + 피드백 생성 + 저장
         service = get_presentation_analysis_service()
-        result = await service.analyze_and_save(db=db, pr_id=pr_id, v_f_id=voice_file.v_f_id, audio_path=temp_file, estimated_syllables=estimated_syllables)
+        result = await service.analyze_and_save(db=db, pr_id=pr_id, v_f_id=voice_file.v_f_id, audio=decoded, estimated_syllables=estimated_syllables)
 
         return result
 
+    except InferenceQueueFullError:
+        raise
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
@@ -48,9 +50,34 @@ async def analyze_presentation(pr_id: int, audio_file: UploadFile = File(...), e
         print(f"Traceback:\n{error_trace}")
         raise HTTPException(status_code=500, detail=str(e))
 
-    finally:
-        if temp_file and os.path.exists(temp_file):
-            os.unlink(temp_file)
+
+# 발표 분석을 백그라운드 작업으로 등록 (바로 job_id 반환, 결과는 GET /jobs/{job_id})
+@router.post("/{pr_id}/analyze/jobs", status_code=202)
+async def enqueue_presentation_analysis(pr_id: int, audio_file: UploadFile = File(...), estimated_syllables: Optional[int] = Form(None), idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"), db: AsyncSession = Depends(get_db)):
+    existing = await find_job_by_idempotency_key(db, "presentation_analyze", idempotency_key)
+    if existing:
+        return job_accepted_response(existing)
+
+    contents = await audio_file.read()
+    file_extension = os.path.splitext(audio_file.filename or "")[1] or ".wav"
+
+    # 워커가 읽을 수 있도록 원본을 임시 저장 (분석 완료 후 삭제)
+    audio_path = spool_upload(contents, file_extension)
+    voice_file = await PresentationCRUD.create_voice_file(db=db, pr_id=pr_id, file_path=audio_path, original_filename=audio_file.filename, file_size=len(contents))
+
+    job = await enqueue_job(
+        db,
+        "presentation_analyze",
+        {
+            "pr_id": pr_id,
+            "v_f_id": voice_file.v_f_id,
+            "audio_path": audio_path,
+            "file_extension": file_extension,
+            "estimated_syllables": estimated_syllables,
+        },
+        idempotency_key=idempotency_key,
+    )
+    return job_accepted_response(job)
 
 
 # 발표 상세 조회 (분석 결과 + 피드백 포함)
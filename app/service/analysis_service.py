@@ -5,9 +5,13 @@ from app.database.schemas.interview import I_Report
 class AnalysisService:
 
     def __init__(self):
-        self.bert_service=get_inference_service()
         self.llm_service=OpenAIService()
 
+    # i_bert는 매번 레지스트리에서 조회 (유휴 해제 후 재로드 대응)
+    @property
+    def bert_service(self):
+        return get_inference_service()
+
     async def analyze_interview(self, transcript:str):
 
         # BERT 멀티 라벨 분류
@@ -2,7 +2,12 @@ import os
 from typing import Dict, Any, List, Optional
 from collections import defaultdict
 from app.database.models.interview import InterviewAnswer, Interview
-from app.infra.chroma_db import collection, get_embedding
+from app.infra.chroma_db import full_doc_id, sentence_doc_id
+from app.infra.embeddings import get_embeddings
+from app.infra.vector_store import get_vector_store
+from app.core.inference_executor import run_inference
+from app.core.content_cache import get_content_cache
+from app.service.label_stats_service import apply_answer_label_stats
 
 
 # 여러 답변의 BERT labels 집계하여 interview 대표 라벨 산출
@@ -29,8 +34,7 @@ def aggregate_bert_labels(labels_list: List[Dict[str, int]])->Dict[str, Dict[str
     return aggregated
 
 
-# 텍스트를 임베딩하고 ChromaDB에 저장
-# Chroma 메타데이터는 str/int/float/bool만 허용
+# 벡터 저장소 메타데이터는 str/int/float/bool만 허용 (Chroma 기준)
 def _flatten_labels(labels: Dict[str, Any]) -> Dict[str, Any]:
   flat_labels: Dict[str, Any] = {}  # chroma 메타데이터용 단순 키/값
   for key, value in labels.items():
@@ -46,7 +50,8 @@ def _flatten_labels(labels: Dict[str, Any]) -> Dict[str, Any]:
   return flat_labels
 
 
-def save_chroma(
+# 답변 1건의 벡터 저장소 문서 (id, 텍스트, 메타데이터) - save_chroma와 vector_rebuild가 같이 사용
+def build_answer_documents(
     answer_id: int,
     session_id: int,
     question_no: int,
@@ -60,14 +65,7 @@ def save_chroma(
     language: str = "ko",
 ):
 
-  # user_id 추가 전 저장된 기존 문서가 있으면 제거하고 덮어씀
-  try:
-    collection.delete(where={"answer_id": answer_id})
-  except Exception:
-    pass
-
   # 1) 전체 transcript 문서
-  full_embedding = get_embedding(text)
   flat_overall = _flatten_labels(overall_raw_labels)
 
 
@@ -95,10 +93,9 @@ def save_chroma(
   if created_at is not None:
     full_metadata["created_at"]=created_at
 
-  ids: List[str] = [f"user_{user_id}_answer_{answer_id}_full"]
+  ids: List[str] = [full_doc_id(user_id, answer_id)]
   docs: List[str] = [text]
   metas: List[Dict[str, Any]] = [full_metadata]
-  embeds: List[List[float]] = [full_embedding]
 
   # 2) 문장 단위 문서
   for idx, sent in enumerate(sentences):
@@ -106,7 +103,6 @@ def save_chroma(
     if not sent_text:
       continue
     sent_labels = sent.get("labels", {})
-    sent_embedding = get_embedding(sent_text)
     sent_metadata: Dict[str, Any] = {
       "type": "user_answer_sentence",
       "answer_id": answer_id,
@@ -120,19 +116,38 @@ def save_chroma(
 
     if created_at is not None:
       sent_metadata["created_at"]=created_at
-    ids.append(f"user_{user_id}_answer_{answer_id}_sent_{idx}")
+    ids.append(sentence_doc_id(user_id, answer_id, idx))
     docs.append(sent_text)
     metas.append(sent_metadata)
-    embeds.append(sent_embedding)
-
-  # 저장
-  collection.add(
-    ids=ids,
-    documents=docs,
-    metadatas=metas,
-    embeddings=embeds,
+
+  return ids, docs, metas
+
+
+# 답변을 임베딩해서 벡터 저장소(VECTOR_STORE_BACKEND)에 저장
+def save_chroma(
+    answer_id: int,
+    session_id: int,
+    question_no: int,
+    user_id: int,
+    text: str,
+    sentences: List[Dict[str, Any]],
+    label_counts: Dict[str, int],
+    overall_raw_labels: Dict[str, Any],
+    stt_metrics: Optional[Dict[str, Any]] = None,
+    created_at: Optional[float] = None,
+    language: str = "ko",
+):
+  ids, docs, metas = build_answer_documents(
+    answer_id, session_id, question_no, user_id, text, sentences, label_counts,
+    overall_raw_labels, stt_metrics=stt_metrics, created_at=created_at, language=language,
   )
 
+  # 전체 transcript + 문장들을 한 번의 encode로 임베딩
+  embeds = get_embeddings(docs)
+
+  # 벡터 저장소에 upsert (같은 id는 덮어씀) + 재분석으로 문장 수가 줄었으면 남은 문서 정리
+  get_vector_store().upsert_answer(user_id, answer_id, ids, docs, metas, embeds)
+
 
 # STT 결과에서 transcript만 모아 한 문장으로 합침
 def extract_transcript(stt_result: Dict[str, Any]) -> str:
@@ -147,11 +162,12 @@ def extract_transcript(stt_result: Dict[str, Any]) -> str:
   return " ".join(transcripts)
 
 
-def _i_predict_labels(text: str) -> Dict[str, Any]:
+# 전체 transcript와 문장들을 한 번에 추론 (길이별로 묶어서 몇 번의 forward로 처리)
+def _i_predict_labels_batch(texts: List[str]) -> List[Dict[str, Any]]:
   from app.service.i_bert_service import get_inference_service
 
   service = get_inference_service()
-  return service.predict_labels(text)
+  return service.predict_labels_batch(texts)
 
 
 def _labels_only(raw: Dict[str, Any]) -> Dict[str, int]:
@@ -196,13 +212,23 @@ async def i_process_answer(answer_id: int, db):
   if not sentences:
     sentences = [transcript]
 
-  # 전체/문장별 라벨
-  overall_raw = _i_predict_labels(transcript)
+  # 전체/문장별 라벨 (BERT 추론은 이벤트 루프 밖에서 실행, 같은 transcript는 캐시 재사용)
+  from app.service.bert_backend import get_cache_tag
+
+  cache = get_content_cache()
+  cache_key = cache.make_key("bert", transcript.encode("utf-8"), "i_bert", "taeeho/i_bert_lora", get_cache_tag())
+  cached = cache.get_json("bert", cache_key)
+
+  if cached is not None:
+    overall_raw, sentence_raws = cached["overall"], cached["sentences"]
+  else:
+    raws = await run_inference("i_bert", _i_predict_labels_batch, [transcript] + sentences)
+    overall_raw, sentence_raws = raws[0], raws[1:]
+    cache.put_json("bert", cache_key, {"overall": overall_raw, "sentences": sentence_raws})
   overall_labels = _labels_only(overall_raw)
 
   sentence_entries: List[Dict[str, Any]] = []
-  for s in sentences:
-    raw = _i_predict_labels(s)
+  for s, raw in zip(sentences, sentence_raws):
     labels_only=_labels_only(raw)
     sentence_entries.append({
       "text": s,
@@ -216,10 +242,14 @@ async def i_process_answer(answer_id: int, db):
       if v:
         label_counts[k] += 1
 
+  # 이미 약점 집계에 반영된 답변이면 이전 결과를 빼고 다시 더함
+  previous_labels = answer.labels_json if answer.stats_applied_at else None
+
   # mysql에 올리기
   answer.transcript = transcript
   answer.labels_json = {
     "overall_labels": overall_labels,
+    "overall_scores": {k: float(v.get("score", 0.0)) for k, v in overall_raw.items()},
     "sentences": [
       {"text": s["text"], "labels": s["labels"]}
       for s in sentence_entries
@@ -227,11 +257,16 @@ async def i_process_answer(answer_id: int, db):
     "label_counts": label_counts,
   }
   answer.stt_metrics_json=stt_metrics
+
+  # 사용자별 약점 집계 증분 갱신 (답변 저장과 같은 트랜잭션)
+  await apply_answer_label_stats(db, answer, interview.user_id, answer.labels_json, previous_labels)
   await db.commit()
   await db.refresh(answer)
 
 
-  save_chroma(
+  await run_inference(
+    "embedding",
+    save_chroma,
     answer_id=answer.i_answer_id,
     session_id=answer.i_id,
     question_no=answer.q_order or 0,
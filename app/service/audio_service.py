@@ -1,10 +1,14 @@
 from pydub import AudioSegment
-from io import BytesIO
-from typing import Tuple
+from typing import Optional, Tuple
+import numpy as np
 import os
 import platform
+import struct
+import subprocess
 from pathlib import Path
 import tempfile
+import threading
+from app.core.content_cache import get_content_cache
 
 
 # 환경에 따라 ffmpeg 경로 자동 설정
@@ -57,49 +61,206 @@ def setup_ffmpeg():
 setup_ffmpeg()
 
 
+TARGET_SAMPLE_RATE = 16000
+
+# ffmpeg가 stdin(파이프)으로는 읽지 못할 수 있는 컨테이너 (moov atom이 파일 끝에 있으면 seek 필요)
+SEEK_REQUIRED_FORMATS = {'mp4', 'mov', '3gp'}
+
+FFMPEG_READ_CHUNK = 1 << 20
+
+
+# 16bit PCM을 담은 wav 바이트 생성 (44바이트 헤더 + PCM, 추가 인코딩 없음)
+def pcm16_to_wav(pcm, sample_rate: int = TARGET_SAMPLE_RATE, channels: int = 1) -> bytes:
+    byte_rate = sample_rate * channels * 2
+    header = struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + len(pcm), b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, byte_rate, channels * 2, 16,
+        b'data', len(pcm),
+    )
+    # bytearray/memoryview도 한 번의 할당으로 합침
+    return b''.join((header, pcm))
+
+
+# wav 바이트에서 포맷 정보와 PCM 구간(복사 없는 memoryview)을 추출 - PCM wav가 아니면 None
+def parse_pcm_wav(wav_data: bytes) -> Optional[Tuple[int, int, int, memoryview]]:
+    view = memoryview(wav_data)
+    if len(view) < 12 or bytes(view[0:4]) != b'RIFF' or bytes(view[8:12]) != b'WAVE':
+        return None
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        chunk_size = struct.unpack('<I', view[offset + 4:offset + 8])[0]
+        body = offset + 8
+
+        if chunk_id == b'fmt ':
+            audio_format, channels, sample_rate = struct.unpack('<HHI', view[body:body + 8])
+            bits_per_sample = struct.unpack('<H', view[body + 14:body + 16])[0]
+            fmt = (audio_format, channels, sample_rate, bits_per_sample // 8)
+        elif chunk_id == b'data':
+            if fmt is None or fmt[0] != 1:
+                return None
+            # 스트리밍으로 만든 wav는 data 크기가 0 / 0xFFFFFFFF로 기록되는 경우가 있음
+            end = len(view) if chunk_size in (0, 0xFFFFFFFF) else min(len(view), body + chunk_size)
+            _, channels, sample_rate, sample_width = fmt
+            return sample_rate, channels, sample_width, view[body:end]
+
+        offset = body + chunk_size + (chunk_size & 1)
+
+    return None
+
+
+# convert_to_wav 결과의 포맷 정보 (DB 저장용)
+NORMALIZED_WAV_FORMAT = {
+    "stored_format": "wav",
+    "sample_rate": TARGET_SAMPLE_RATE,
+    "channels": 1,
+    "sample_width": 2,
+}
+
+
+# wav 헤더에서 포맷 정보 읽기 (PCM wav가 아니면 None)
+def describe_wav(wav_data: bytes) -> Optional[dict]:
+    parsed = parse_pcm_wav(wav_data)
+    if parsed is None:
+        return None
+    sample_rate, channels, sample_width, _ = parsed
+    return {"stored_format": "wav", "sample_rate": sample_rate, "channels": channels, "sample_width": sample_width}
+
+
+# mp4/m4a가 faststart(moov가 mdat보다 앞)인지 확인 - 그렇다면 파이프로 바로 디코딩 가능
+def _mp4_is_streamable(audio_data: bytes) -> bool:
+    offset = 0
+    while offset + 8 <= len(audio_data):
+        size, box_type = struct.unpack('>I4s', audio_data[offset:offset + 8])
+        if box_type == b'moov':
+            return True
+        if box_type == b'mdat':
+            return False
+        if size == 1:
+            if offset + 16 > len(audio_data):
+                return False
+            size = struct.unpack('>Q', audio_data[offset + 8:offset + 16])[0]
+        if size < 8:
+            return False
+        offset += size
+    return False
+
+
+# 분석용으로 디코딩된 오디오 - 16kHz mono float32 버퍼 하나를 wav2vec/librosa 특징 추출에서 같이 사용
+class DecodedAudio:
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    # DB 저장/STT 전송용 16bit PCM wav 바이트
+    def to_wav_bytes(self) -> bytes:
+        pcm = (np.clip(self.samples, -1.0, 1.0) * 32767.0).astype(np.int16)
+        return pcm16_to_wav(pcm.tobytes(), self.sample_rate)
+
+
+FORMAT_MAPPING = {
+    'mp3': 'mp3',
+    'm4a': 'mp4',
+    'mp4': 'mp4',
+    'webm': 'webm',
+    'ogg': 'ogg',
+    'wav': 'wav',
+    'flac': 'flac',
+    'aac': 'aac'
+}
+
+
 class AudioService:
+    # stdin 쓰기 / stderr 읽기는 별도 스레드, stdout은 청크 단위로 읽어 하나의 bytearray에 누적 (파이프 버퍼 교착 방지)
     @staticmethod
-    def convert_to_wav(audio_data: bytes, original_format: str) -> Tuple[bytes, float]:
-        temp_file_path = None
-        try:
-            if original_format.startswith('.'):
-                original_format = original_format[1:]
-
-            original_format = original_format.lower()
-
-            format_mapping = {
-                'mp3': 'mp3',
-                'm4a': 'mp4',
-                'mp4': 'mp4',
-                'webm': 'webm',
-                'ogg': 'ogg',
-                'wav': 'wav',
-                'flac': 'flac',
-                'aac': 'aac'
-            }
-
-            format_to_use = format_mapping.get(original_format, original_format)
-
-            # 임시 파일 생성 (ffmpeg가 stdin으로 m4a 등을 처리할 때 moov atom 에러가 발생할 수 있음)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{original_format}") as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-
-            # 파일 경로로 로드
-            audio = AudioSegment.from_file(
-                temp_file_path,
-                format=format_to_use
-            )
+    def _run_ffmpeg(command, stdin_data: Optional[bytes]) -> bytearray:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+        def feed():
+            try:
+                process.stdin.write(stdin_data)
+            except BrokenPipeError:
+                pass  # ffmpeg가 먼저 종료된 경우 (에러는 stderr로 확인)
+            finally:
+                process.stdin.close()
+
+        # stderr를 동시에 비우지 않으면 경고가 많을 때 ffmpeg가 stderr 쓰기에서 멈추고 stdout도 끝나지 않음
+        stderr_chunks = []
+
+        def drain_stderr():
+            stderr_chunks.append(process.stderr.read())
 
-            audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
+        threads = [threading.Thread(target=drain_stderr, daemon=True)]
+        if stdin_data is not None:
+            threads.append(threading.Thread(target=feed, daemon=True))
+        for thread in threads:
+            thread.start()
 
-            wav_buffer = BytesIO()
-            audio.export(wav_buffer, format="wav")
-            wav_data = wav_buffer.getvalue()
+        output = bytearray()
+        while True:
+            chunk = process.stdout.read(FFMPEG_READ_CHUNK)
+            if not chunk:
+                break
+            output += chunk
 
-            duration = len(audio) / 1000.0
+        returncode = process.wait()
+        for thread in threads:
+            thread.join()
+
+        if returncode != 0:
+            stderr = b"".join(stderr_chunks)
+            raise RuntimeError(stderr.decode(errors="ignore").strip() or f"ffmpeg 종료 코드 {returncode}")
+        return output
+
+    # 업로드 바이트를 ffmpeg 하나로 16kHz mono raw PCM(s16le 또는 f32le)으로 변환
+    # 기본은 stdin 파이프 -> stdout 파이프, seek가 필요한 mp4 계열만 임시 파일 사용
+    @staticmethod
+    def _ffmpeg_decode(audio_data: bytes, original_format: str, sample_format: str = "s16le") -> bytearray:
+        if original_format.startswith('.'):
+            original_format = original_format[1:]
 
-            return wav_data, duration
+        original_format = original_format.lower()
+        format_to_use = FORMAT_MAPPING.get(original_format, original_format)
+
+        temp_file_path = None
+        try:
+            if format_to_use in SEEK_REQUIRED_FORMATS and not _mp4_is_streamable(audio_data):
+                # moov atom이 뒤에 있는 m4a 등은 stdin으로 읽으면 에러가 나므로 파일 경로로 전달
+                with tempfile.NamedTemporaryFile(delete=False, suffix=f".{original_format}") as temp_file:
+                    temp_file.write(audio_data)
+                    temp_file_path = temp_file.name
+                input_args = ["-i", temp_file_path]
+                stdin_data = None
+            else:
+                # 파이프 입력은 확장자가 없어 포맷 추정이 불안정하므로 알려진 포맷은 demuxer를 지정
+                input_args = ["-i", "pipe:0"]
+                if original_format in FORMAT_MAPPING:
+                    input_args = ["-f", format_to_use] + input_args
+                stdin_data = audio_data
+
+            command = [
+                AudioSegment.converter, "-hide_banner", "-loglevel", "error",
+                *input_args,
+                "-vn", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE),
+                "-f", sample_format, "pipe:1",
+            ]
+            pcm = AudioService._run_ffmpeg(command, stdin_data)
+            if not pcm:
+                raise RuntimeError("디코딩된 오디오가 비어 있습니다.")
+
+            return pcm
 
         except FileNotFoundError as e:
             raise RuntimeError(
@@ -107,7 +268,7 @@ class AudioService:
                 "프로젝트 루트에 ffmpeg/bin/ffmpeg.exe를 배치하거나, "
                 "시스템에 ffmpeg를 설치하세요."
             )
-        except Exception as e:
+        except RuntimeError as e:
             raise RuntimeError(f"오디오 변환 중 오류 발생: {str(e)}")
         finally:
             # 임시 파일 정리
@@ -115,4 +276,43 @@ class AudioService:
                 try:
                     os.remove(temp_file_path)
                 except Exception:
-                    pass
\ No newline at end of file
+                    pass
+
+    # 같은 업로드는 디스크 캐시의 PCM을 재사용 (내용 해시 기준이므로 확장자와 무관)
+    @staticmethod
+    def _decode_cached(audio_data: bytes, original_format: str, sample_format: str) -> bytearray:
+        cache = get_content_cache()
+        key = cache.make_key("pcm", audio_data, sample_format, TARGET_SAMPLE_RATE)
+
+        pcm = cache.get_bytes("pcm", key)
+        if pcm is None:
+            pcm = AudioService._ffmpeg_decode(audio_data, original_format, sample_format)
+            cache.put_bytes("pcm", key, pcm)
+        return pcm
+
+    @staticmethod
+    def convert_to_wav(audio_data: bytes, original_format: str) -> Tuple[bytes, float]:
+        pcm = AudioService._decode_cached(audio_data, original_format, "s16le")
+
+        duration = len(pcm) / (2 * TARGET_SAMPLE_RATE)
+
+        return pcm16_to_wav(pcm), duration
+
+    # 분석기로 바로 넘길 float32 파형으로 디코딩 (ffmpeg가 f32le를 직접 출력, 추가 변환 없음)
+    @staticmethod
+    def decode_audio(audio_data: bytes, original_format: str) -> DecodedAudio:
+        pcm = AudioService._decode_cached(audio_data, original_format, "f32le")
+
+        # ffmpeg 출력 버퍼를 복사 없이 그대로 사용
+        samples = np.frombuffer(pcm, dtype=np.float32)
+
+        return DecodedAudio(samples=samples, sample_rate=TARGET_SAMPLE_RATE)
+
+    # 저장된 16bit wav를 float32 파형으로 (PCM wav면 헤더만 읽고 바로 변환, 아니면 ffmpeg 디코딩)
+    @staticmethod
+    def wav_to_samples(wav_data: bytes) -> DecodedAudio:
+        parsed = parse_pcm_wav(wav_data)
+        if parsed and parsed[1] == 1 and parsed[2] == 2 and parsed[0] == TARGET_SAMPLE_RATE:
+            samples = np.frombuffer(parsed[3], dtype=np.int16).astype(np.float32) / 32768.0
+            return DecodedAudio(samples=samples, sample_rate=TARGET_SAMPLE_RATE)
+        return AudioService.decode_audio(wav_data, "wav")
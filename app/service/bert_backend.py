@@ -0,0 +1,388 @@
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from app.core.model_loader import MODEL_DIR, BERT_ARTIFACTS, BERT_ARTIFACT_VERSION, is_s3_enabled, download_model_from_s3, upload_model_to_s3
+
+# c_bert / i_bert 분류기 실행 방식
+# peft   : HuggingFace hub에서 base BERT + LoRA 어댑터 로드 (어댑터 matmul이 매 forward마다 추가됨)
+# merged : 빌드된 아티팩트 - LoRA를 base 가중치에 합친(merge_and_unload) fp32 BERT
+# int8   : merged + Linear 레이어 dynamic int8 양자화 (CPU 전용)
+# onnx   : merged를 export한 ONNX 그래프 (model_int8.onnx가 있으면 양자화본 사용)
+# auto   : 아티팩트가 있으면 CPU는 int8, GPU는 merged / 없으면 peft
+# shared : base BERT 한 벌에 c_bert / i_bert LoRA 어댑터를 같이 올리고 분류 head만 따로 둠 (워커당 BERT 메모리 절반)
+#
+# 아티팩트 빌드: python -m app.service.bert_backend build [c_bert|i_bert|all] [--onnx] [--upload]
+# MODEL_DIR/<이름>_<BERT_ARTIFACT_VERSION>/ 에 저장 (manifest.json에 파일 목록)
+BERT_BACKENDS = ("auto", "peft", "merged", "int8", "onnx", "shared")
+
+BASE_MODEL_NAME = "bert-base-multilingual-cased"
+
+# 빌드 대상 (어댑터, 라벨 수)
+BERT_MODELS = {
+    "c_bert": {"adapter": "taeeho/c_bert_lora", "num_labels": 4},
+    "i_bert": {"adapter": "taeeho/i_bert_lora", "num_labels": 8},
+}
+
+MANIFEST_FILE = "manifest.json"
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model_int8.onnx"
+
+
+def get_backend_name(backend: Optional[str] = None) -> str:
+    backend = (backend or os.getenv("BERT_BACKEND", "auto")).lower()
+    if backend not in BERT_BACKENDS:
+        raise ValueError(f"지원하지 않는 BERT_BACKEND: {backend} (가능: {', '.join(BERT_BACKENDS)})")
+    return backend
+
+
+# BERT 결과 캐시 키에 넣을 값 (실행 방식/아티팩트 버전이 바뀌면 다른 결과로 취급)
+def get_cache_tag() -> str:
+    return f"{get_backend_name()}:{BERT_ARTIFACT_VERSION}"
+
+
+def get_artifact_dir(name: str) -> Path:
+    return MODEL_DIR / BERT_ARTIFACTS[name]
+
+
+# 로컬에 없으면 S3에서 manifest -> 파일 순서로 받아옴
+def ensure_artifact(name: str) -> Optional[Path]:
+    artifact_dir = get_artifact_dir(name)
+    manifest_path = artifact_dir / MANIFEST_FILE
+
+    if not manifest_path.exists() and is_s3_enabled():
+        if download_model_from_s3(f"{BERT_ARTIFACTS[name]}/{MANIFEST_FILE}"):
+            manifest = json.loads(manifest_path.read_text())
+            for file_name in manifest["files"]:
+                if not download_model_from_s3(f"{BERT_ARTIFACTS[name]}/{file_name}"):
+                    manifest_path.unlink(missing_ok=True)  # 일부만 받은 상태로 쓰지 않도록
+                    return None
+
+    return artifact_dir if manifest_path.exists() else None
+
+
+# onnxruntime으로 실행하는 분류기 (transformers 모델처럼 model(**encoded).logits 형태로 호출)
+class OnnxBertClassifier:
+    def __init__(self, model_path: Path, intra_op_threads: int = 0, inter_op_threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # 0이면 onnxruntime 기본값 (물리 코어 수)
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def __call__(self, **encoded):
+        feeds = {k: v.detach().cpu().numpy().astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+        logits = self.session.run(["logits"], feeds)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def _load_peft(adapter: str, num_labels: int, local_files_only: bool):
+    from peft import PeftModel
+
+    tokenizer = AutoTokenizer.from_pretrained(adapter, local_files_only=local_files_only)
+    base = AutoModelForSequenceClassification.from_pretrained(
+        BASE_MODEL_NAME,
+        num_labels=num_labels,
+        problem_type="multi_label_classification",
+        local_files_only=local_files_only,
+    )
+    return tokenizer, PeftModel.from_pretrained(base, adapter, local_files_only=local_files_only)
+
+
+# base BERT 한 벌 + 어댑터별 LoRA 가중치 + 어댑터별 분류 head
+# - 어댑터 학습 시 같이 저장된 classifier(modules_to_save) 가중치는 따로 떼서 head(Linear)로 사용
+# - base 모델의 classifier는 Identity로 바꿔서 forward 결과가 pooled output이 되게 함
+# - LoRA가 encoder 가중치를 바꾸므로 어댑터가 다르면 encoder 출력도 다름
+#   -> 여러 어댑터를 한 번에 돌릴 때는 PEFT mixed-adapter 배치로 한 번의 forward에 같이 계산 (predict_both, warmup에서 사용)
+class SharedBertBackbone:
+    def __init__(self, device: torch.device, names: Optional[List[str]] = None, local_files_only: bool = False):
+        from peft import PeftConfig, PeftModel, load_peft_weights, set_peft_model_state_dict
+
+        names = names or list(BERT_MODELS)
+        base = AutoModelForSequenceClassification.from_pretrained(BASE_MODEL_NAME, local_files_only=local_files_only)
+        base.classifier = torch.nn.Identity()
+        hidden_size = base.config.hidden_size
+
+        self.tokenizer = AutoTokenizer.from_pretrained(BERT_MODELS[names[0]]["adapter"], local_files_only=local_files_only)
+        self.heads = torch.nn.ModuleDict()
+        self.model = None
+
+        for name in names:
+            spec = BERT_MODELS[name]
+            config = PeftConfig.from_pretrained(spec["adapter"], local_files_only=local_files_only)
+            # classifier는 head로 따로 관리 (라벨 수가 어댑터마다 다름)
+            config.task_type = None
+            config.modules_to_save = None
+            config.inference_mode = True
+
+            weights = load_peft_weights(spec["adapter"], local_files_only=local_files_only)
+            lora_weights = {k: v for k, v in weights.items() if "classifier" not in k}
+            head_weights = {k.rsplit(".", 1)[1]: v for k, v in weights.items() if "classifier" in k}
+            if set(head_weights) != {"weight", "bias"} or head_weights["weight"].shape[0] != spec["num_labels"]:
+                raise ValueError(f"{spec['adapter']}에서 분류 head 가중치를 찾을 수 없습니다.")
+
+            if self.model is None:
+                self.model = PeftModel(base, config, adapter_name=name)
+            else:
+                self.model.add_adapter(name, config)
+            set_peft_model_state_dict(self.model, lora_weights, adapter_name=name)
+
+            head = torch.nn.Linear(hidden_size, spec["num_labels"])
+            head.load_state_dict(head_weights)
+            self.heads[name] = head
+
+        self.model.to(device).eval()
+        self.heads.to(device).eval()
+        self.device = device
+        self.names = names
+        # 활성 어댑터는 모델 전역 상태 -> c_bert / i_bert 추론 스레드가 동시에 바꾸지 않도록
+        self.lock = threading.Lock()
+
+    # 한 어댑터로 forward (encoded는 device에 올라간 상태)
+    def logits(self, name: str, encoded) -> torch.Tensor:
+        with self.lock, torch.no_grad():
+            self.model.set_adapter(name)
+            pooled = self.model(**encoded).logits
+            return self.heads[name](pooled)
+
+    # 같은 문장들을 여러 어댑터로 한 번에 (배치를 어댑터 수만큼 이어 붙이고 행마다 어댑터 지정)
+    def predict_both(self, texts: List[str], names: Optional[List[str]] = None, max_len: int = 128) -> dict:
+        names = names or self.names
+        if not texts:
+            return {name: np.zeros((0, BERT_MODELS[name]["num_labels"]), dtype=np.float32) for name in names}
+
+        encoded = self.tokenizer(list(texts) * len(names), padding=True, truncation=True, max_length=max_len, return_tensors="pt")
+        encoded = {k: v.to(self.device) for k, v in encoded.items()}
+        adapter_names = [name for name in names for _ in texts]
+
+        with self.lock, torch.no_grad():
+            pooled = self.model(**encoded, adapter_names=adapter_names).logits
+
+        n = len(texts)
+        return {
+            name: torch.sigmoid(self.heads[name](pooled[i * n:(i + 1) * n])).cpu().numpy()
+            for i, name in enumerate(names)
+        }
+
+
+# InferenceService에서 일반 모델처럼 model(**encoded).logits로 호출하기 위한 어댑터별 view
+# backbone은 붙잡지 않고 forward마다 레지스트리에서 조회 (bert_shared의 last_used 갱신 -> 유휴 정리로 내려간 backbone을 들고 있다가 두 벌이 올라가지 않도록)
+class SharedBertHead:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, **encoded):
+        from app.core.model_registry import get_model
+        return SimpleNamespace(logits=get_model("bert_shared").logits(self.name, encoded))
+
+
+# (tokenizer, model, device, backend) 반환 - model은 device에 올라간 eval 상태
+def load_bert_classifier(name: str, adapter: str, num_labels: int, device: torch.device, backend: Optional[str] = None, local_files_only: bool = False) -> Tuple:
+    backend = get_backend_name(backend)
+
+    # 공유 backbone은 모델 레지스트리에 한 벌만 올림
+    if backend == "shared":
+        from app.core.model_registry import get_model
+        backbone = get_model("bert_shared")
+        return backbone.tokenizer, SharedBertHead(name), backbone.device, backend
+
+    artifact_dir = ensure_artifact(name) if backend != "peft" else None
+
+    if backend == "auto":
+        if artifact_dir is None:
+            backend = "peft"
+        else:
+            backend = "merged" if device.type == "cuda" else "int8"
+
+    if backend == "peft":
+        tokenizer, model = _load_peft(adapter, num_labels, local_files_only)
+        return tokenizer, model.to(device).eval(), device, backend
+
+    if artifact_dir is None:
+        raise FileNotFoundError(f"{get_artifact_dir(name)} 없음 - 'python -m app.service.bert_backend build {name}'로 먼저 생성하세요.")
+
+    # 아티팩트는 hub 조회 없이 로컬 파일만 사용
+    tokenizer = AutoTokenizer.from_pretrained(str(artifact_dir), local_files_only=True)
+
+    if backend == "onnx":
+        model_path = artifact_dir / ONNX_INT8_FILE
+        if not model_path.exists():
+            model_path = artifact_dir / ONNX_FILE
+        if not model_path.exists():
+            raise FileNotFoundError(f"{model_path} 없음 - 'build {name} --onnx'로 생성하세요.")
+        model = OnnxBertClassifier(
+            model_path,
+            intra_op_threads=int(os.getenv("ONNX_INTRA_OP_THREADS", "0")),
+            inter_op_threads=int(os.getenv("ONNX_INTER_OP_THREADS", "0")),
+        )
+        return tokenizer, model, torch.device("cpu"), backend
+
+    model = AutoModelForSequenceClassification.from_pretrained(str(artifact_dir), local_files_only=True).eval()
+
+    if backend == "int8":
+        # dynamic 양자화는 CPU 커널만 지원
+        device = torch.device("cpu")
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return tokenizer, model.to(device), device, backend
+
+
+# LoRA를 합친 모델을 ONNX로 export (batch/길이 dynamic axes) + onnxruntime dynamic int8 양자화본
+def _export_onnx(model, tokenizer, artifact_dir: Path, opset: int = 17) -> List[str]:
+    dummy = tokenizer(["안녕하세요.", "오늘 발표를 시작하겠습니다."], padding=True, return_tensors="pt")
+    # BertForSequenceClassification.forward 인자 순서대로 (tokenizer 출력 순서와 다름)
+    input_names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in dummy]
+    dynamic_axes = {k: {0: "batch", 1: "sequence"} for k in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    onnx_path = artifact_dir / ONNX_FILE
+    model.config.return_dict = False  # 출력이 logits 텐서 하나가 되도록
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[k] for k in input_names),
+            str(onnx_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    quantize_dynamic(str(onnx_path), str(artifact_dir / ONNX_INT8_FILE), weight_type=QuantType.QInt8)
+    return [ONNX_FILE, ONNX_INT8_FILE]
+
+
+def build_artifact(name: str, onnx: bool = False) -> Path:
+    from peft import PeftModel
+
+    spec = BERT_MODELS[name]
+    artifact_dir = get_artifact_dir(name)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    print(f"[{name}] LoRA merge 중... ({spec['adapter']} -> {artifact_dir})")
+
+    tokenizer = AutoTokenizer.from_pretrained(spec["adapter"])
+    base = AutoModelForSequenceClassification.from_pretrained(
+        BASE_MODEL_NAME,
+        num_labels=spec["num_labels"],
+        problem_type="multi_label_classification",
+    )
+    model = PeftModel.from_pretrained(base, spec["adapter"]).merge_and_unload().eval()
+
+    model.save_pretrained(str(artifact_dir))
+    tokenizer.save_pretrained(str(artifact_dir))
+
+    if onnx:
+        print(f"[{name}] ONNX export 중...")
+        _export_onnx(model, tokenizer, artifact_dir)
+
+    files = sorted(str(p.relative_to(artifact_dir)) for p in artifact_dir.rglob("*") if p.is_file() and p.name != MANIFEST_FILE)
+    manifest = {
+        "name": name,
+        "version": BERT_ARTIFACT_VERSION,
+        "adapter": spec["adapter"],
+        "base_model": BASE_MODEL_NAME,
+        "num_labels": spec["num_labels"],
+        "onnx": onnx,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": files,
+    }
+    (artifact_dir / MANIFEST_FILE).write_text(json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    size_mb = sum((artifact_dir / f).stat().st_size for f in files) / (1024 * 1024)
+    print(f"[{name}] 빌드 완료 ({len(files)}개 파일, {size_mb:.1f} MB)")
+    return artifact_dir
+
+
+# 매니페스트를 마지막에 올려서 다운로드 측이 덜 올라간 아티팩트를 받지 않도록
+def upload_artifact(name: str) -> bool:
+    artifact_dir = get_artifact_dir(name)
+    manifest_path = artifact_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        print(f"{artifact_dir} 없음 - 먼저 build 하세요.")
+        return False
+
+    files = json.loads(manifest_path.read_text())["files"] + [MANIFEST_FILE]
+    return all(upload_model_to_s3(f"{BERT_ARTIFACTS[name]}/{file_name}") for file_name in files)
+
+
+VERIFY_SENTENCES = [
+    "안녕하세요. 오늘 발표를 맡은 김철수입니다.",
+    "음 그러니까 어 제가 하고 싶은 말은요.",
+    "그건 좀 애매한 것 같아요 뭐 대충 그런 느낌이요.",
+    "저는 이 프로젝트에서 백엔드 개발을 담당했습니다.",
+    "아 진짜 존나 힘들었어요.",
+    "결론적으로 성능이 두 배 향상되었다.",
+]
+
+
+# peft 원본 대비 backend 결과 확률 차이 + 라벨(0.5 기준) 일치율 확인
+def verify_backend(name: str, backend: str, texts: Optional[List[str]] = None, max_diff: float = 0.05, min_agreement: float = 0.95) -> bool:
+    spec = BERT_MODELS[name]
+    texts = texts or VERIFY_SENTENCES
+    cpu = torch.device("cpu")
+
+    def run(selected: str) -> np.ndarray:
+        tokenizer, model, device, _ = load_bert_classifier(name, spec["adapter"], spec["num_labels"], cpu, backend=selected)
+        encoded = tokenizer(texts, padding=True, truncation=True, max_length=128, return_tensors="pt")
+        with torch.no_grad():
+            started = time.perf_counter()
+            logits = model(**{k: v.to(device) for k, v in encoded.items()}).logits
+            print(f"  {selected}: {(time.perf_counter() - started) * 1000:.1f} ms ({len(texts)}문장)")
+        return torch.sigmoid(logits).cpu().numpy()
+
+    reference = run("peft")
+    candidate = run(backend)
+
+    diff = float(np.abs(reference - candidate).max())
+    agreement = float(np.mean((reference >= 0.5) == (candidate >= 0.5)))
+    print(f"\n[{name}:{backend}] 최대 확률 차이: {diff:.4f}, 라벨 일치율: {agreement * 100:.1f}%")
+
+    passed = diff <= max_diff and agreement >= min_agreement
+    print("검증 통과" if passed else f"검증 실패 (기준: 차이 <= {max_diff}, 일치율 >= {min_agreement * 100:.0f}%)")
+    return passed
+
+
+# CLI 실행
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("사용법: python -m app.service.bert_backend [build|upload|verify] [c_bert|i_bert|all]")
+        print("")
+        print("  build <이름> [--onnx] [--upload]  - LoRA merge (+ ONNX/int8 export) 후 MODEL_DIR에 버전별 저장")
+        print("  upload <이름>                     - 빌드된 아티팩트를 S3에 업로드")
+        print("  verify <이름> [backend] [텍스트파일] - peft 원본 대비 backend(merged|int8|onnx) 결과 비교")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    names = list(BERT_MODELS) if sys.argv[2] == "all" else [sys.argv[2]]
+
+    if command == "build":
+        for model_name in names:
+            build_artifact(model_name, onnx="--onnx" in sys.argv)
+            if "--upload" in sys.argv:
+                upload_artifact(model_name)
+    elif command == "upload":
+        for model_name in names:
+            upload_artifact(model_name)
+    elif command == "verify":
+        backend = sys.argv[3] if len(sys.argv) > 3 else "int8"
+        texts = None
+        if len(sys.argv) > 4:
+            texts = [line.strip() for line in Path(sys.argv[4]).read_text().splitlines() if line.strip()]
+        sys.exit(0 if all(verify_backend(model_name, backend, texts) for model_name in names) else 1)
+    else:
+        print(f"알 수 없는 명령: {command}")
@@ -1,17 +1,25 @@
 from typing import Dict
+import json
 from app.service.c_bert_service import get_inference_service
 from app.service.llm_service import OpenAIService
 from app.service.script_parser import get_script_parser
 from app.core.settings import settings
+from app.core.inference_executor import run_inference
+from app.core.content_cache import get_content_cache
+from app.service.bert_backend import get_cache_tag
 
 
 class CAnalysisService:
 
     def __init__(self):
-        self.bert_service = get_inference_service()  # c_bert inference service 가져옴
         self.llm_service = self.get_llm_service()  # LLM_PROVIDER 보고 서비스 결정
         self.script_parser = get_script_parser()  # script parser 가져옴
 
+    # c_bert inference service (매번 레지스트리에서 조회 - 유휴 해제 후 재로드 대응)
+    @property
+    def bert_service(self):
+        return get_inference_service()
+
     def get_llm_service(self):
         provider = settings.llm_provider or "openai"
         if provider == "openai":
@@ -63,25 +71,33 @@ class CAnalysisService:
                 f"{target_speaker}를 찾을 수 없습니다"
             )
 
-        # 3. BERT 멀티 라벨 분류 (문장별 분석)
+        # 3. BERT 멀티 라벨 분류 (문장별 분석) - 이벤트 루프 밖에서 실행, 같은 문장 목록은 캐시 재사용
+        target_sentences = [sent for sent in sentences if sent["speaker_label"] == target_speaker]
+        texts = [sent["text"] for sent in target_sentences]
+
+        cache = get_content_cache()
+        cache_key = cache.make_key("bert", json.dumps(texts, ensure_ascii=False).encode("utf-8"), "c_bert", "taeeho/c_bert_lora", get_cache_tag())
+        sentence_labels = cache.get_json("bert", cache_key)
+
+        if sentence_labels is None:
+            # 문장 전체를 길이별 배치로 묶어서 한 번에 추론
+            sentence_labels = await run_inference("c_bert", self.bert_service.predict_labels_batch, texts)
+            cache.put_json("bert", cache_key, sentence_labels)
+
         bert_sentence_results = {}
         total_counts = {"slang": 0, "biased": 0, "curse": 0, "filler": 0}
 
-        for sent in sentences:
-            if sent["speaker_label"] == target_speaker:
-                # 문장별 예측
-                labels = self.bert_service.predict_labels(sent["text"])
-                
-                # 감지된 라벨 수집
-                detected = [k for k, v in labels.items() if v == 1]
-                
-                if detected:
-                    bert_sentence_results[sent["sentence_index"]] = detected
-                    
-                    # 카운트 집계
-                    for d in detected:
-                        if d in total_counts:
-                            total_counts[d] += 1
+        for sent, labels in zip(target_sentences, sentence_labels):
+            # 감지된 라벨 수집
+            detected = [k for k, v in labels.items() if v == 1]
+
+            if detected:
+                bert_sentence_results[sent["sentence_index"]] = detected
+
+                # 카운트 집계
+                for d in detected:
+                    if d in total_counts:
+                        total_counts[d] += 1
 
         # 전체 결과 (저장용)
         bert_result = total_counts.copy()
@@ -91,7 +107,6 @@ class CAnalysisService:
 
         # 4. LLM report 생성 (communication_prompts 사용)
         from app.prompts.communication_prompts import build_prompt, SYSTEM_MESSAGE
-        import json
 
         # sentences, stt_data, bert_result, bert_sentence_results 모두 전달
         prompt = build_prompt(sentences, stt_data, target_speaker, bert_result, bert_sentence_results)
@@ -1,114 +1,146 @@
+import os
 import torch
 import re
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from peft import PeftModel
-from typing import Optional
+from app.service.bert_backend import load_bert_classifier
+from typing import Optional, Dict, List
 
-# 베이스 모델을 먼저 로드하고 그 다음으로 어댑터 가중치를 얹어서 추론
+LABELS = ["slang", "biased", "curse", "filler"]
+
+CURSE_WORDS = ["존나", "씨발", "병신", "개새끼", "좆", "좆같"]
+# 부분 일치로도 잡을 단어들
+BIASED_SUBSTRING = ["장애인", "병신"]
+# 단어(어절) 단위로만 잡을 단어들 (오탐 방지: 애자일, 따뜻한 등)
+BIASED_EXACT = ["애자", "따"]
+FILLER_WORDS = ["음", "어", "어 음"]
+
+
+# 단어 목록을 긴 단어 우선 alternation 하나로 합침 (문장마다 단어별로 훑지 않고 한 번만 검색)
+def _alternation(words: List[str]) -> str:
+  return "|".join(map(re.escape, sorted(words, key=len, reverse=True)))
+
+
+# 룰 정규식은 모듈 로드 시 한 번만 컴파일
+CURSE_PATTERN = re.compile(_alternation(CURSE_WORDS))
+BIASED_SUBSTRING_PATTERN = re.compile(_alternation(BIASED_SUBSTRING))
+BIASED_EXACT_PATTERN = re.compile(r'(?<!\S)(' + _alternation(BIASED_EXACT) + r')(?=$|[ \.,!?]|은|는|이|가|을|를|의|도|로|고|만|에)')
+FILLER_PATTERN = re.compile(r'(?<!\S)(?:' + _alternation(FILLER_WORDS) + r')(?!\S)')
+
+
+def rule_curse(sentence: str) -> bool:
+  return CURSE_PATTERN.search(sentence.replace(" ", "")) is not None
+
+
+def rule_biased(sentence: str) -> bool:
+  # 1. Substring check
+  if BIASED_SUBSTRING_PATTERN.search(sentence.replace(" ", "")):
+    return True
+  # 2. Exact word check (Regex)
+  return BIASED_EXACT_PATTERN.search(sentence) is not None
+
+
+def rule_filler(sentence: str) -> bool:
+  # Use regex to match fillers as standalone words
+  return FILLER_PATTERN.search(sentence) is not None
+
+
+# 룰 기반 강제 적용 (오탐 방지) - 모델 확률에 덮어씀
+def apply_rules(text: str, result: Dict[str, float]) -> Dict[str, float]:
+  # 1. 욕설/비속어 (Curse & Slang)
+  if rule_curse(text):
+    result["curse"] = 1.0
+    result["slang"] = 0.0 # curse 라벨로 통합 관리
+  else:
+    result["curse"] = 0.0
+    result["slang"] = 0.0
+
+  # 2. 차별/비하 (Biased)
+  if rule_biased(text):
+    result["biased"] = 1.0
+  else:
+    result["biased"] = 0.0
+
+  # 3. 필러 (Filler)
+  if rule_filler(text):
+    result["filler"] = 1.0
+
+  return result
+
+
+# 한 번의 forward에 넣을 문장 수
+BERT_BATCH_SIZE = int(os.getenv("BERT_BATCH_SIZE", "16"))
+
+# 베이스 모델 + LoRA 어댑터 (또는 미리 merge해 둔 아티팩트)로 추론
 class InferenceService:
-  def __init__(self, max_len: int = 64, local_files_only: bool = False, device_mode: str = "auto"):
+  def __init__(self, max_len: int = 64, local_files_only: bool = False, device_mode: str = "auto", batch_size: int = BERT_BATCH_SIZE, backend: Optional[str] = None):
     self.model_name = "taeeho/c_bert_lora"
     self.base_model_name = "bert-base-multilingual-cased"
-    self.labels = ["slang", "biased", "curse", "filler"]
+    self.labels = LABELS
     self.max_len = max_len
+    self.batch_size = batch_size
     self.device = torch.device("cuda" if device_mode == "auto" and torch.cuda.is_available() else "cpu")
 
-    self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, local_files_only=local_files_only)
-    base = AutoModelForSequenceClassification.from_pretrained(
-      self.base_model_name,
+    # 빌드된 아티팩트(LoRA merge + int8/ONNX)가 있으면 로컬 파일로, 없으면 hub의 PEFT 모델로 로드
+    self.tokenizer, self.model, self.device, self.backend = load_bert_classifier(
+      "c_bert",
+      self.model_name,
       num_labels=len(self.labels),
-      problem_type="multi_label_classification",
+      device=self.device,
+      backend=backend,
       local_files_only=local_files_only,
     )
 
-    self.model = PeftModel.from_pretrained(base, self.model_name, local_files_only=local_files_only)
-    self.model.to(self.device)
-    self.model.eval()
-    
-    self.CURSE_WORDS = ["존나", "씨발", "병신", "개새끼", "좆", "좆같"]
-    # 부분 일치로도 잡을 단어들
-    self.BIASED_SUBSTRING = ["장애인", "병신"]
-    # 단어(어절) 단위로만 잡을 단어들 (오탐 방지: 애자일, 따뜻한 등)
-    self.BIASED_EXACT = ["애자", "따"]
-    self.FILLER_WORDS = ["음", "어", "어 음"]
-
   def tokenize(self, text: str):
-    encoded = self.tokenizer(text, return_tensors="pt", truncation=True, padding="max_length", max_length=self.max_len)
+    encoded = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=self.max_len)
     return {k: v.to(self.device) for k, v in encoded.items()}
 
   def rule_curse(self, sentence: str) -> bool:
-    s = sentence.replace(" ", "")
-    for w in self.CURSE_WORDS:
-      if w in s:
-        print(f"!!! 욕설 감지됨 (단어: {w}) - 원문: {sentence}")
-        return True
-    return False
+    return rule_curse(sentence)
 
   def rule_biased(self, sentence: str) -> bool:
-    # 1. Substring check
-    s = sentence.replace(" ", "")
-    for w in self.BIASED_SUBSTRING:
-      if w in s:
-        print(f"!!! 차별/비하 감지됨 (단어: {w}) - 원문: {sentence}")
-        return True
-        
-    # 2. Exact word check (Regex)
-    regex = r'(?<!\S)(' + '|'.join(map(re.escape, self.BIASED_EXACT)) + r')(?=$|[ \.,!?]|은|는|이|가|을|를|의|도|로|고|만|에)'
-    
-    match = re.search(regex, sentence)
-    if match:
-        print(f"!!! 차별/비하 감지됨 (단어: {match.group()}) - 원문: {sentence}")
-        return True
-    return False
+    return rule_biased(sentence)
 
   def rule_filler(self, sentence: str) -> bool:
-    # Use regex to match fillers as standalone words
-    regex = r'(?<!\S)(?:' + '|'.join(map(re.escape, self.FILLER_WORDS)) + r')(?!\S)'
-    if re.search(regex, sentence):
-      print(f"!!! 추임새 감지됨 - 원문: {sentence}")
-      return True
-    return False
+    return rule_filler(sentence)
+
+  def apply_rules(self, text: str, result: Dict[str, float]) -> Dict[str, float]:
+    return apply_rules(text, result)
 
   def predict_probs(self, text: str):
-    encoded = self.tokenize(text)
-    with torch.no_grad():
-      outputs = self.model(**encoded)
-      probs = torch.sigmoid(outputs.logits[0]).cpu().numpy()
-    
-    result = {label: float(p) for label, p in zip(self.labels, probs)}
-    
-    # 룰 기반 강제 적용 (오탐 방지)
-    
-    # 1. 욕설/비속어 (Curse & Slang)
-    if self.rule_curse(text):
-      result["curse"] = 1.0
-      result["slang"] = 0.0 # curse 라벨로 통합 관리
-    else:
-      result["curse"] = 0.0
-      result["slang"] = 0.0
-
-    # 2. 차별/비하 (Biased)
-    if self.rule_biased(text):
-      result["biased"] = 1.0
-    else:
-      result["biased"] = 0.0
-      
-    # 3. 필러 (Filler)
-    if self.rule_filler(text):
-      result["filler"] = 1.0
-      
-    return result
+    return self.predict_probs_batch([text])[0]
+
+  # 여러 문장을 한 번에 추론 (토큰 길이순으로 묶고 배치 안의 최대 길이까지만 padding)
+  def predict_probs_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict[str, float]]:
+    if not texts:
+      return []
+    batch_size = batch_size or self.batch_size
+
+    features = self.tokenizer(list(texts), truncation=True, max_length=self.max_len)
+    features = [{k: v[i] for k, v in features.items()} for i in range(len(texts))]
+    order = sorted(range(len(texts)), key=lambda i: len(features[i]["input_ids"]))
+
+    results: List[Optional[Dict[str, float]]] = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+      bucket = order[start:start + batch_size]
+      encoded = self.tokenizer.pad([features[i] for i in bucket], padding="longest", return_tensors="pt")
+      encoded = {k: v.to(self.device) for k, v in encoded.items()}
+      with torch.no_grad():
+        outputs = self.model(**encoded)
+        probs = torch.sigmoid(outputs.logits).cpu().numpy()
+      for i, row in zip(bucket, probs):
+        results[i] = self.apply_rules(texts[i], {label: float(p) for label, p in zip(self.labels, row)})
+    return results
 
   def predict_labels(self, text: str, threshold: float = 0.5):
-    probs = self.predict_probs(text)
-    return {label: int(score >= threshold) for label, score in probs.items()}
+    return self.predict_labels_batch([text], threshold)[0]
 
+  def predict_labels_batch(self, texts: List[str], threshold: float = 0.5, batch_size: Optional[int] = None):
+    return [
+      {label: int(score >= threshold) for label, score in probs.items()}
+      for probs in self.predict_probs_batch(texts, batch_size)
+    ]
 
-# 싱글턴으로 모델을 한번만 로드하고 재사용
-inference_service: Optional[InferenceService] = None
 
+# 모델 레지스트리에서 한 번만 로드하고 재사용 (모델 서버 사용 시 원격 프록시)
 def get_inference_service():
-  global inference_service
-  if inference_service is None:
-    inference_service = InferenceService()
-  return inference_service
\ No newline at end of file
+  from app.core.model_registry import get_model
+  return get_model("c_bert")
@@ -1,7 +1,7 @@
+import os
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from peft import PeftModel
-from typing import Optional, Dict
+from app.service.bert_backend import load_bert_classifier
+from typing import Optional, Dict, List
 
 LABEL_COLS = ["slang", "biased", "curse", "filler", "formality_inconsistency", "disfluency_repetition", "vague", "ending_da"]
 
@@ -17,71 +17,91 @@ LABEL_THRESHOLDS: Dict[str, float] = {
 }
 
 
+# 라벨별 임계값 적용 (threshold를 주면 모든 라벨에 같은 값 사용)
+def apply_thresholds(probs: Dict[str, float], threshold: Optional[float] = None, global_threshold: float = 0.5):
+  results = {}
+  for label in LABEL_COLS:
+    p = probs[label]
+    if threshold is not None:
+      th = threshold
+    else:
+      th = LABEL_THRESHOLDS.get(label, global_threshold)
+    results[label] = {
+      "score": p,
+      "label": int(p >= th),
+    }
+  return results
+
+
+# 한 번의 forward에 넣을 문장 수
+BERT_BATCH_SIZE = int(os.getenv("BERT_BATCH_SIZE", "16"))
+
+
 class InferenceService:
-  def __init__(self, max_len: int = 128, threshold: float = 0.5, local_files_only: bool = False, device_mode: str = "auto"):
+  def __init__(self, max_len: int = 128, threshold: float = 0.5, local_files_only: bool = False, device_mode: str = "auto", batch_size: int = BERT_BATCH_SIZE, backend: Optional[str] = None):
     self.model_name = "taeeho/i_bert_lora"
     self.base_model_name = "bert-base-multilingual-cased"
     self.labels = LABEL_COLS
     self.label_thresholds = LABEL_THRESHOLDS
     self.max_len = max_len
     self.global_threshold = threshold
+    self.batch_size = batch_size
     self.device = torch.device("cuda" if device_mode == "auto" and torch.cuda.is_available() else "cpu")
 
-    self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, local_files_only=local_files_only)
-
-    # base BERT
-    base_model = AutoModelForSequenceClassification.from_pretrained(
-      self.base_model_name,
-      num_labels=len(self.labels),
-      problem_type="multi_label_classification",
-      local_files_only=local_files_only,
-    )
-
-    # LoRA 어댑터 로드
-    self.model = PeftModel.from_pretrained(
-      base_model,
+    # 빌드된 아티팩트(LoRA merge + int8/ONNX)가 있으면 로컬 파일로, 없으면 hub의 PEFT 모델로 로드
+    self.tokenizer, self.model, self.device, self.backend = load_bert_classifier(
+      "i_bert",
       self.model_name,
+      num_labels=len(self.labels),
+      device=self.device,
+      backend=backend,
       local_files_only=local_files_only,
     )
-    self.model.to(self.device)
-    self.model.eval()
 
 
   def tokenize(self, text: str):
-    encoded = self.tokenizer(text, return_tensors="pt", truncation=True, padding="max_length", max_length=self.max_len)
+    encoded = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=self.max_len)
     return {k: v.to(self.device) for k, v in encoded.items()}
 
 
   def predict_probs(self, text: str) -> Dict[str, float]:
-    encoded = self.tokenize(text)
-    with torch.no_grad():
-      outputs = self.model(**encoded)
-      logits = outputs.logits[0]
-      probs = torch.sigmoid(logits).cpu().numpy()
-    return {label: float(p) for label, p in zip(self.labels, probs)}
+    return self.predict_probs_batch([text])[0]
 
-  def predict_labels(self, text: str, threshold: Optional[float] = None):
-    probs = self.predict_probs(text)
-    use_global_th = threshold if threshold is not None else None
-    results = {}
-    for label in self.labels:
-      p = probs[label]
-      if use_global_th is not None:
-        th = use_global_th
-      else:
-        th = self.label_thresholds.get(label, self.global_threshold)
-      results[label] = {
-        "score": p,
-        "label": int(p >= th),
-      }
+  # 여러 문장을 한 번에 추론
+  # max_length까지 채우지 않고 배치 안에서 가장 긴 문장 길이로만 padding (dynamic padding)
+  # 토큰 길이순으로 정렬해서 비슷한 길이끼리 묶음 -> 짧은 문장이 긴 문장 길이만큼 padding되지 않도록
+  def predict_probs_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict[str, float]]:
+    if not texts:
+      return []
+    batch_size = batch_size or self.batch_size
+
+    features = self.tokenizer(list(texts), truncation=True, max_length=self.max_len)
+    features = [{k: v[i] for k, v in features.items()} for i in range(len(texts))]
+    order = sorted(range(len(texts)), key=lambda i: len(features[i]["input_ids"]))
+
+    results: List[Optional[Dict[str, float]]] = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+      bucket = order[start:start + batch_size]
+      encoded = self.tokenizer.pad([features[i] for i in bucket], padding="longest", return_tensors="pt")
+      encoded = {k: v.to(self.device) for k, v in encoded.items()}
+      with torch.no_grad():
+        outputs = self.model(**encoded)
+        probs = torch.sigmoid(outputs.logits).cpu().numpy()
+      for i, row in zip(bucket, probs):
+        results[i] = {label: float(p) for label, p in zip(self.labels, row)}
     return results
 
+  def _apply_thresholds(self, probs: Dict[str, float], threshold: Optional[float] = None):
+    return apply_thresholds(probs, threshold, self.global_threshold)
+
+  def predict_labels(self, text: str, threshold: Optional[float] = None):
+    return self._apply_thresholds(self.predict_probs(text), threshold)
+
+  def predict_labels_batch(self, texts: List[str], threshold: Optional[float] = None, batch_size: Optional[int] = None):
+    return [self._apply_thresholds(probs, threshold) for probs in self.predict_probs_batch(texts, batch_size)]
 
-# 싱글턴으로 한 번만 모델을 로드하고 이후로는 같은 인스턴스를 재사용하기 위한 헬퍼
-focal_inference_service: Optional[InferenceService] = None
 
+# 모델 레지스트리에서 한 번만 로드하고 이후로는 같은 인스턴스를 재사용 (모델 서버 사용 시 원격 프록시)
 def get_inference_service() -> InferenceService:
-  global focal_inference_service
-  if focal_inference_service is None:
-    focal_inference_service = InferenceService()
-  return focal_inference_service
\ No newline at end of file
+  from app.core.model_registry import get_model
+  return get_model("i_bert")
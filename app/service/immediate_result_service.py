@@ -1,7 +1,9 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.schemas.interview import ImmediateResultResponse, QuestionDetailEvaluation, SimilarAnswerHint, I_Report
-from app.infra.chroma_db import collection
+from app.infra.chroma_db import full_doc_id
+from app.infra.vector_store import get_vector_store
+from app.core.inference_executor import run_inference
 from app.database.crud import interview as crud
 from app.service.copy_builder import build_similar_answer_hint_message
 
@@ -78,7 +80,7 @@ async def get_immediate_result(i_id:int, db:AsyncSession)->ImmediateResultRespon
     )
 
 
-# 유사 답변 힌트 찾기 (ChromaDB, 3회 이상일 때만)
+# 유사 답변 힌트 찾기 (벡터 저장소, 3회 이상일 때만)
 async def find_similar_answer_hint(
     db:AsyncSession,
     user_id:int,
@@ -100,11 +102,17 @@ async def find_similar_answer_hint(
     # 현재 인터뷰의 첫 번째 답변으로 유사도 검색
     current_answer=current_answers[0]
 
-    # ChromaDB에서 현재 답변의 임베딩 가져오기
-    current_doc_id=f"user_{user_id}_answer_{current_answer.i_answer_id}_full"
+    # 벡터 저장소에서 현재 답변의 임베딩 가져오기
+    current_doc_id=full_doc_id(user_id, current_answer.i_answer_id)
+
+    # 벡터 저장소 조회는 추론 스레드 풀에서 (이벤트 루프 블로킹 방지)
+    store=get_vector_store()
 
     try:
-        current_data=collection.get(
+        current_data=await run_inference(
+            "vector_store",
+            store.get_full_answers,
+            user_id,
             ids=[current_doc_id],
             include=["embeddings"]
         )
@@ -115,16 +123,13 @@ async def find_similar_answer_hint(
         current_embedding=current_data["embeddings"][0]
 
         # 유사한 과거 답변 검색
-        similar_results=collection.query(
-            query_embeddings=[current_embedding],
+        similar_results=await run_inference(
+            "vector_store",
+            store.query_full_answers,
+            user_id,
+            current_embedding,
             n_results=5,  # 상위 5개 가져와서 현재 세션 제외
-            where={
-                "$and": [
-                    {"user_id": user_id},
-                    {"type": "user_answer_full"},
-                    {"language": current_interview.language or "ko"}
-                ]
-            }
+            filters={"language": current_interview.language or "ko"}
         )
 
         # 현재 인터뷰 세션 제외하고 가장 유사한 답변 찾기
@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.inference_executor import run_inference
+from app.service.audio_service import AudioService
+from app.service.job_queue import job_handler, PermanentJobError
+
+# 백그라운드 작업 핸들러 (워커 프로세스에서 import되어 등록됨)
+# 기존 동기 엔드포인트와 같은 로직을 그대로 호출해서 결과/DB 저장 형식을 맞춤
+
+
+def _remove_spooled_audio(payload: Dict[str, Any]) -> None:
+    audio_path = payload.get("audio_path")
+    if audio_path and os.path.exists(audio_path):
+        os.remove(audio_path)
+
+
+# 발표 음성 분석 (POST /presentations/{pr_id}/analyze/jobs)
+@job_handler("presentation_analyze", on_final_failure=_remove_spooled_audio)
+async def presentation_analyze(db: AsyncSession, payload: Dict[str, Any]):
+    from app.service.presentation_analysis_service import get_presentation_analysis_service
+
+    audio_path = Path(payload["audio_path"])
+    if not audio_path.exists():
+        raise PermanentJobError(f"업로드 파일을 찾을 수 없습니다: {audio_path}")
+
+    decoded = await run_inference("audio", AudioService.decode_audio, audio_path.read_bytes(), payload["file_extension"])
+
+    service = get_presentation_analysis_service()
+    result = await service.analyze_and_save(
+        db=db,
+        pr_id=payload["pr_id"],
+        v_f_id=payload["v_f_id"],
+        audio=decoded,
+        estimated_syllables=payload.get("estimated_syllables"),
+    )
+
+    _remove_spooled_audio(payload)
+    return result
+
+
+# 대화 STT + 분석 (POST /communication/{c_id}/jobs)
+@job_handler("communication_analyze")
+async def communication_analyze(db: AsyncSession, payload: Dict[str, Any]):
+    from app.routers.communication import process_stt, analyze_communication
+
+    c_id = payload["c_id"]
+    target_speaker = payload.get("target_speaker", "1")
+
+    # 두 단계 모두 기존 결과를 지우고 다시 저장하므로 재시도해도 중복이 생기지 않음
+    await process_stt(c_id=c_id, db=db)
+
+    result = await analyze_communication(c_id=c_id, target_speaker=target_speaker, db=db)
+    return {"c_id": c_id, "c_result_id": result.c_result_id}
+
+
+# 면접 종합 분석 (POST /interview/{i_id}/analyze_full/jobs)
+@job_handler("interview_analyze_full")
+async def interview_analyze_full(db: AsyncSession, payload: Dict[str, Any]):
+    from app.routers.interview import analyze_interview_full
+
+    return await analyze_interview_full(i_id=payload["i_id"], db=db)
@@ -0,0 +1,78 @@
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.crud import analysis_job as crud
+from app.database.models.analysis_job import AnalysisJob
+
+# MySQL(analysis_jobs) 기반 백그라운드 작업 큐
+# API는 작업만 등록하고 바로 job_id를 반환, 무거운 분석은 별도 워커 프로세스가 처리
+# 상태 조회: GET /jobs/{job_id}
+# 워커 실행: python -m app.service.job_worker
+
+JOB_SPOOL_DIR = Path(os.getenv("JOB_SPOOL_DIR", "/tmp/steach_jobs"))  # 업로드 원본 임시 보관 (API/워커가 같은 디스크를 써야 함)
+
+JobHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[Any]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+JOB_FAILURE_HOOKS: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+
+
+# 재시도해도 결과가 같은 실패 (입력 오류 등) - 바로 failed 처리
+class PermanentJobError(Exception):
+    pass
+
+
+# 작업 핸들러 등록 (on_final_failure: 최종 실패 시 정리 작업)
+def job_handler(job_type: str, on_final_failure: Optional[Callable[[Dict[str, Any]], None]] = None):
+    def decorator(fn: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = fn
+        if on_final_failure:
+            JOB_FAILURE_HOOKS[job_type] = on_final_failure
+        return fn
+    return decorator
+
+
+async def enqueue_job(db: AsyncSession, job_type: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None, max_attempts: Optional[int] = None) -> AnalysisJob:
+    if max_attempts is None:
+        max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    if idempotency_key:
+        idempotency_key = f"{job_type}:{idempotency_key}"
+    return await crud.create_job(db, job_type, payload, idempotency_key=idempotency_key, max_attempts=max_attempts)
+
+
+async def find_job_by_idempotency_key(db: AsyncSession, job_type: str, idempotency_key: Optional[str]) -> Optional[AnalysisJob]:
+    if not idempotency_key:
+        return None
+    return await crud.get_job_by_idempotency_key(db, f"{job_type}:{idempotency_key}")
+
+
+# 업로드 바이트를 워커가 읽을 수 있도록 임시 파일로 저장
+def spool_upload(data: bytes, suffix: str) -> str:
+    JOB_SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    path = JOB_SPOOL_DIR / f"{uuid.uuid4().hex}{suffix}"
+    path.write_bytes(data)
+    return str(path)
+
+
+def job_to_dict(job: AnalysisJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.job_id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# 작업 등록 직후 응답 (202)
+def job_accepted_response(job: AnalysisJob) -> Dict[str, Any]:
+    return {"job_id": job.job_id, "status": job.status, "status_url": f"/jobs/{job.job_id}"}
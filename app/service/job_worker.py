@@ -0,0 +1,144 @@
+import asyncio
+import os
+import socket
+import traceback
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+from app.database.crud import analysis_job as crud
+from app.database.models.analysis_job import AnalysisJob
+from app.service.job_queue import JOB_HANDLERS, JOB_FAILURE_HOOKS, PermanentJobError
+
+# analysis_jobs 테이블을 폴링해서 작업을 처리하는 워커 프로세스
+# 실행: python -m app.service.job_worker (JOB_WORKER_CONCURRENCY개 작업을 동시에 처리)
+
+
+def _retry_delay(attempts: int) -> float:
+    base = float(os.getenv("JOB_RETRY_BASE_SEC", "10"))
+    cap = float(os.getenv("JOB_RETRY_MAX_SEC", "600"))
+    return min(cap, base * (2 ** max(0, attempts - 1)))
+
+
+def _is_permanent(error: Exception) -> bool:
+    if isinstance(error, PermanentJobError):
+        return True
+    # 라우터 함수를 그대로 호출하는 핸들러: 4xx는 입력 문제이므로 재시도하지 않음
+    return isinstance(error, HTTPException) and error.status_code < 500
+
+
+# 작업이 도는 동안 주기적으로 locked_at 갱신 (오래 걸리는 작업을 다른 워커가 죽은 작업으로 보고 다시 가져가지 않도록)
+# 잠금을 잃으면(다른 워커가 이미 가져감) 이 워커의 실행을 취소
+async def _heartbeat(job: AnalysisJob, worker_id: str, session_factory, interval: float, task: asyncio.Task) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                still_locked = await crud.touch_job(db, job.job_id, worker_id)
+        except Exception as e:
+            print(f"[JobWorker] {job.job_id} heartbeat 실패: {e}")
+            continue
+        if not still_locked:
+            print(f"[JobWorker] {job.job_type} {job.job_id} 잠금을 잃어 실행 취소 ({worker_id})")
+            task.cancel()
+            return
+
+
+async def _run_job(job: AnalysisJob, worker_id: str, session_factory, heartbeat_interval: float) -> None:
+    handler = JOB_HANDLERS.get(job.job_type)
+    payload = job.payload or {}
+    heartbeat: Optional[asyncio.Task] = None
+
+    try:
+        if handler is None:
+            raise PermanentJobError(f"등록되지 않은 작업 유형: {job.job_type}")
+
+        async def run_handler():
+            async with session_factory() as db:
+                return await handler(db, payload)
+
+        task = asyncio.create_task(run_handler())
+        heartbeat = asyncio.create_task(_heartbeat(job, worker_id, session_factory, heartbeat_interval, task))
+        try:
+            result = await task
+        finally:
+            heartbeat.cancel()
+
+        async with session_factory() as db:
+            marked = await crud.mark_job_succeeded(db, job.job_id, worker_id, jsonable_encoder(result))
+        if marked:
+            print(f"[JobWorker] {job.job_type} {job.job_id} 완료 (시도 {job.attempts}회)")
+        else:
+            print(f"[JobWorker] {job.job_type} {job.job_id} 완료했지만 잠금을 잃어 결과를 저장하지 않음")
+
+    except asyncio.CancelledError:
+        # heartbeat가 스스로 끝났다 = 잠금을 잃어 취소한 것 (상태는 새로 가져간 워커가 기록), 그 외(종료 등)는 그대로 전파
+        if heartbeat is None or not heartbeat.done() or heartbeat.cancelled():
+            raise
+
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        error = f"{type(e).__name__}: {detail}"
+        retry = not _is_permanent(e) and job.attempts < job.max_attempts
+        delay = _retry_delay(job.attempts) if retry else None
+
+        if retry:
+            print(f"[JobWorker] {job.job_type} {job.job_id} 실패 - {delay:.0f}초 후 재시도 ({job.attempts}/{job.max_attempts}): {error}")
+        else:
+            print(f"[JobWorker] {job.job_type} {job.job_id} 최종 실패: {error}")
+            traceback.print_exc()
+
+        async with session_factory() as db:
+            marked = await crud.mark_job_failed(db, job.job_id, worker_id, error, retry_delay_sec=delay)
+        if not marked:
+            print(f"[JobWorker] {job.job_type} {job.job_id} 잠금을 잃어 실패 상태를 저장하지 않음")
+            return
+
+        if not retry and job.job_type in JOB_FAILURE_HOOKS:
+            try:
+                JOB_FAILURE_HOOKS[job.job_type](payload)
+            except Exception as hook_error:
+                print(f"[JobWorker] 실패 정리 작업 오류: {hook_error}")
+
+
+async def _worker_loop(worker_id: str, session_factory, poll_interval: float, lock_timeout: int) -> None:
+    # 잠금 시간 초과의 1/3마다 갱신 (한두 번 놓쳐도 다른 워커가 가져가지 않도록)
+    heartbeat_interval = float(os.getenv("JOB_HEARTBEAT_SEC", str(max(1.0, lock_timeout / 3))))
+
+    while True:
+        try:
+            async with session_factory() as db:
+                job = await crud.claim_next_job(db, worker_id, lock_timeout)
+        except Exception as e:
+            print(f"[JobWorker] 작업 조회 실패: {e}")
+            job = None
+
+        if job is None:
+            await asyncio.sleep(poll_interval)
+            continue
+
+        await _run_job(job, worker_id, session_factory, heartbeat_interval)
+
+
+async def run_worker(concurrency: Optional[int] = None) -> None:
+    from app.database.database import AsyncSessionLocal
+    from app.service import job_handlers  # noqa: F401 (핸들러 등록)
+
+    concurrency = concurrency or int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+    poll_interval = float(os.getenv("JOB_POLL_INTERVAL_SEC", "1"))
+    # running 상태로 이 시간 이상 남은 작업은 워커가 죽은 것으로 보고 다시 가져감
+    lock_timeout = int(os.getenv("JOB_LOCK_TIMEOUT_SEC", "1800"))
+
+    worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"[JobWorker] 시작 ({worker_prefix}, 동시 처리 {concurrency}개, 핸들러: {sorted(JOB_HANDLERS)})")
+
+    await asyncio.gather(*[
+        _worker_loop(f"{worker_prefix}:{i}", AsyncSessionLocal, poll_interval, lock_timeout)
+        for i in range(concurrency)
+    ])
+
+
+# CLI 실행
+if __name__ == "__main__":
+    asyncio.run(run_worker())
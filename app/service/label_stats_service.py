@@ -0,0 +1,174 @@
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.models.interview import Interview, InterviewAnswer
+from app.database.models.user_label_stat import UserLabelStat
+from app.database.crud import user_label_stat as crud
+from app.core.heavy_hitters import SpaceSaving
+from app.core.inference_executor import run_inference
+from app.infra.chroma_db import full_doc_id, sentence_doc_id
+from app.infra.vector_store import get_vector_store
+
+# 사용자별 면접 라벨 집계 (user_label_stats)
+# - 답변 분석 때 그 답변의 기여분만 더함 (재분석이면 이전 labels_json 기여분을 먼저 뺌)
+# - 약점 카드는 이 집계만 읽음 (사용자 문장 수와 무관하게 일정한 시간)
+# - 집계가 없는 사용자(도입 전 데이터)는 i_answers.labels_json으로 한 번 다시 계산
+
+TOP_SENTENCE_LIMIT = int(os.getenv("WEAKNESS_TOP_SENTENCE_LIMIT", "50"))  # 라벨별 Space-Saving 카운터 수
+
+
+# 답변 1건의 labels_json 기여분을 집계에 반영 (sign=1 더하기, -1 빼기)
+def _apply_answer(
+    stats: Dict[str, UserLabelStat],
+    labels_json: Dict[str, Any],
+    sign: int,
+    user_id: int,
+    answer_id: int,
+    session_id: int,
+    created_at: float,
+    scores: Optional[Dict[str, float]] = None,
+) -> None:
+    scores = scores if scores is not None else (labels_json.get("overall_scores") or {})
+    for label, score in scores.items():
+        if label in stats and score is not None:
+            stats[label].score_sum += sign * float(score)
+            stats[label].score_count += sign
+
+    tops = {label: SpaceSaving(TOP_SENTENCE_LIMIT, stat.top_sentences) for label, stat in stats.items()}
+
+    for idx, sent in enumerate(labels_json.get("sentences") or []):
+        text = str(sent.get("text") or "").strip()
+        if not text:
+            continue
+        for label, flag in (sent.get("labels") or {}).items():
+            if not flag or label not in stats:
+                continue
+            stat = stats[label]
+            stat.occurrence_count = max(0, stat.occurrence_count + sign)
+            if sign > 0:
+                tops[label].add(text, int(created_at), answer_id, session_id)
+                stat.last_answer_id = answer_id
+                stat.last_sentence_id = sentence_doc_id(user_id, answer_id, idx)
+            else:
+                tops[label].remove(text)
+
+    # JSON 컬럼은 새 dict를 할당해야 변경이 감지됨
+    for label, stat in stats.items():
+        stat.top_sentences = tops[label].to_json()
+
+
+def _labels_of(labels_json: Optional[Dict[str, Any]]) -> List[str]:
+    if not labels_json:
+        return []
+    labels = set((labels_json.get("overall_labels") or {}).keys()) | set((labels_json.get("overall_scores") or {}).keys())
+    for sent in labels_json.get("sentences") or []:
+        labels |= set((sent.get("labels") or {}).keys())
+    return sorted(labels)
+
+
+# i_process_answer에서 호출 - 커밋은 호출한 쪽에서 (답변 labels_json 저장과 같은 트랜잭션)
+async def apply_answer_label_stats(
+    db: AsyncSession,
+    answer: InterviewAnswer,
+    user_id: int,
+    new_labels: Dict[str, Any],
+    previous_labels: Optional[Dict[str, Any]] = None,
+) -> None:
+    # 집계가 없거나 반영 안 된 예전 답변이 있으면 이 답변까지 포함해서 처음부터 다시 계산 (증분만 더하면 이전 기록이 빠짐)
+    if await _needs_rebuild(db, user_id, exclude_answer_id=answer.i_answer_id):
+        await db.flush()
+        await rebuild_user_label_stats(db, user_id, commit=False)
+        return
+
+    created_at = answer.created_at.timestamp() if answer.created_at else 0.0
+    labels = sorted(set(_labels_of(new_labels)) | set(_labels_of(previous_labels)))
+    stats = await crud.lock_user_label_stats(db, user_id, labels)
+
+    if previous_labels:
+        _apply_answer(stats, previous_labels, -1, user_id, answer.i_answer_id, answer.i_id, created_at)
+    _apply_answer(stats, new_labels, 1, user_id, answer.i_answer_id, answer.i_id, created_at)
+    answer.stats_applied_at = datetime.now()
+
+
+# 도입 전에 분석된 답변은 labels_json에 점수가 없으므로 Chroma 전체 문서 메타데이터에서 가져옴 (id로 조회)
+def _legacy_scores(user_id: int, answer_ids: List[int], labels: List[str]) -> Dict[int, Dict[str, float]]:
+    ids = [full_doc_id(user_id, answer_id) for answer_id in answer_ids]
+    if not ids:
+        return {}
+    try:
+        result = get_vector_store().get_full_answers(user_id, ids=ids, include=["metadatas"])
+    except Exception as e:
+        print(f"[LabelStats] Chroma 점수 조회 실패: {e}")
+        return {}
+
+    scores: Dict[int, Dict[str, float]] = {}
+    for meta in result.get("metadatas") or []:
+        answer_id = meta.get("answer_id")
+        scores[answer_id] = {label: float(meta[f"{label}_score"]) for label in labels if f"{label}_score" in meta}
+    return scores
+
+
+# 집계 행이 없거나, 분석은 끝났는데 집계에 반영되지 않은 답변(도입 전 분석)이 있는지
+async def _needs_rebuild(db: AsyncSession, user_id: int, exclude_answer_id: Optional[int] = None) -> bool:
+    if not await crud.list_user_label_stats(db, user_id):
+        has_answers = await db.execute(
+            select(InterviewAnswer.i_answer_id)
+            .join(Interview, Interview.i_id == InterviewAnswer.i_id)
+            .where(Interview.user_id == user_id, InterviewAnswer.labels_json.isnot(None), InterviewAnswer.i_answer_id != (exclude_answer_id or 0))
+            .limit(1)
+        )
+        return has_answers.first() is not None
+
+    unapplied = await db.execute(
+        select(InterviewAnswer.i_answer_id)
+        .join(Interview, Interview.i_id == InterviewAnswer.i_id)
+        .where(
+            Interview.user_id == user_id,
+            InterviewAnswer.labels_json.isnot(None),
+            InterviewAnswer.stats_applied_at.is_(None),
+            InterviewAnswer.i_answer_id != (exclude_answer_id or 0),
+        )
+        .limit(1)
+    )
+    return unapplied.first() is not None
+
+
+# 사용자의 집계를 i_answers.labels_json에서 처음부터 다시 계산 (commit=False면 호출한 쪽 트랜잭션에서 커밋)
+async def rebuild_user_label_stats(db: AsyncSession, user_id: int, commit: bool = True) -> List[UserLabelStat]:
+    result = await db.execute(
+        select(InterviewAnswer)
+        .join(Interview, Interview.i_id == InterviewAnswer.i_id)
+        .where(Interview.user_id == user_id, InterviewAnswer.labels_json.isnot(None))
+        .order_by(InterviewAnswer.created_at)
+    )
+    answers = list(result.scalars().all())
+
+    await crud.delete_user_label_stats(db, user_id)
+    if not answers:
+        if commit:
+            await db.commit()
+        return []
+
+    labels = sorted({label for answer in answers for label in _labels_of(answer.labels_json)})
+    legacy = await run_inference("vector_store", _legacy_scores, user_id, [a.i_answer_id for a in answers if "overall_scores" not in a.labels_json], labels)
+    stats = await crud.lock_user_label_stats(db, user_id, labels)
+
+    now = datetime.now()
+    for answer in answers:
+        created_at = answer.created_at.timestamp() if answer.created_at else 0.0
+        scores = None if "overall_scores" in answer.labels_json else legacy.get(answer.i_answer_id, {})
+        _apply_answer(stats, answer.labels_json, 1, user_id, answer.i_answer_id, answer.i_id, created_at, scores=scores)
+        answer.stats_applied_at = now
+
+    if commit:
+        await db.commit()
+    print(f"[LabelStats] user {user_id} 집계 재계산 ({len(answers)}개 답변)")
+    return await crud.list_user_label_stats(db, user_id)
+
+
+async def get_user_label_stats(db: AsyncSession, user_id: int) -> List[UserLabelStat]:
+    if await _needs_rebuild(db, user_id):
+        return await rebuild_user_label_stats(db, user_id)
+    return await crud.list_user_label_stats(db, user_id)
@@ -0,0 +1,377 @@
+import inspect
+import os
+import sys
+import time
+import queue
+import threading
+import traceback
+from multiprocessing.connection import Listener, Client
+from typing import Dict, List, Optional, Tuple
+
+# 로컬 모델 서버
+# uvicorn 워커마다 wav2vec2 / BERT / Whisper / SentenceTransformer를 따로 올리지 않고
+# 모델을 한 프로세스에서만 보유하고, 웹 워커는 로컬 소켓으로 요청을 보냄
+#
+# MODEL_SERVER_ADDRESS 예시: /tmp/steach_model_server.sock (unix socket) 또는 127.0.0.1:8765
+# 서버 실행: python -m app.service.model_server
+
+# 서버 프로세스 안에서는 원격 프록시 대신 실제 모델 사용
+# `python -m`으로 실행하면 이 파일이 __main__과 app.service.model_server 두 모듈로 올라가므로
+# 모듈 변수 대신 환경변수로 표시 (프로세스 전체에서 같은 값)
+_SERVING_ENV = "MODEL_SERVER_SERVING"
+
+
+def _get_address():
+    value = os.getenv("MODEL_SERVER_ADDRESS", "")
+    if not value:
+        return None
+    if not value.startswith("/") and ":" in value:
+        host, port = value.rsplit(":", 1)
+        return (host, int(port))
+    return value
+
+
+def _get_authkey() -> bytes:
+    return os.getenv("MODEL_SERVER_AUTHKEY", "steach-model-server").encode()
+
+
+def _is_serving() -> bool:
+    return os.getenv(_SERVING_ENV) == "1"
+
+
+def is_model_server_enabled() -> bool:
+    return not _is_serving() and _get_address() is not None
+
+
+# ---------- 서버 측 모델 로더 ----------
+
+# 모델 로드/캐시/warmup은 모델 레지스트리가 담당 ("whisper:base"처럼 변형은 ':' 뒤에)
+def _load_model(name: str):
+    from app.core.model_registry import get_model_registry
+    base, _, variant = name.partition(":")
+    return get_model_registry().get(base, variant or None, warmup=True, local=True)
+
+
+# 같은 메서드에 대한 요청을 묶어서 한 번에 처리할 수 있는 경우 (단일 텍스트 인자 -> 배치 메서드)
+BATCH_METHODS = {
+    ("c_bert", "predict_labels"): "predict_labels_batch",
+    ("i_bert", "predict_labels"): "predict_labels_batch",
+}
+
+
+# 프록시가 처음 한 번 받아 가는 모델 정보 (public 메서드 이름 + 단순 값 속성)
+# 값 속성은 이 시점의 스냅샷 - engine / backend / sample_rate처럼 로드 후 바뀌지 않는 값용
+def _describe(model) -> Dict:
+    methods = [
+        name for name in dir(type(model))
+        if not name.startswith("_") and callable(inspect.getattr_static(model, name, None))
+    ]
+    values = {}
+    for name, value in getattr(model, "__dict__", {}).items():
+        if name.startswith("_"):
+            continue
+        if isinstance(value, (str, int, float, bool, type(None))):
+            values[name] = value
+        elif callable(value):
+            methods.append(name)
+    return {"methods": methods, "values": values}
+
+
+class _Request:
+    def __init__(self, model: str, attr: str, args, kwargs, reply):
+        self.model = model
+        self.attr = attr
+        self.args = args
+        self.kwargs = kwargs
+        self.reply = reply
+
+
+class ModelServer:
+    def __init__(self, address, authkey: bytes, max_batch: int = 32, batch_wait_ms: float = 5.0):
+        self.address = address
+        self.authkey = authkey
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait_ms / 1000.0
+
+        self.loaded: set = set()
+        self.queues: Dict[str, "queue.Queue[_Request]"] = {}
+        self.lock = threading.Lock()
+
+    # 모델별 전용 스레드 1개 - 같은 모델의 추론은 순서대로, 다른 모델끼리는 동시에 실행
+    def _get_queue(self, name: str) -> "queue.Queue[_Request]":
+        with self.lock:
+            if name not in self.queues:
+                self.queues[name] = queue.Queue()
+                threading.Thread(target=self._model_worker, args=(name,), daemon=True).start()
+            return self.queues[name]
+
+    # 레지스트리에서 매번 조회 (유휴 해제된 모델은 다음 요청 때 다시 로드)
+    def _get_model(self, name: str):
+        model = _load_model(name)
+        self.loaded.add(name)
+        return model
+
+    def preload(self, names: List[str]):
+        for name in names:
+            try:
+                self._get_queue(name).put(_Request(name, None, None, None, lambda *_: None))
+            except Exception as e:
+                print(f"[ModelServer] '{name}' 사전 로드 실패: {e}")
+
+    def _collect_batch(self, first: _Request, q: "queue.Queue[_Request]") -> Tuple[List[_Request], List[_Request]]:
+        batch = [first]
+        leftover: List[_Request] = []
+        deadline = time.perf_counter() + self.batch_wait
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                req = q.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if req.attr == first.attr and req.args is not None and len(req.args) == 1 and req.kwargs == first.kwargs:
+                batch.append(req)
+            else:
+                leftover.append(req)
+
+        return batch, leftover
+
+    def _model_worker(self, name: str):
+        q = self.queues[name]
+        pending: List[_Request] = []
+
+        while True:
+            req = pending.pop(0) if pending else q.get()
+
+            try:
+                model = self._get_model(name)
+            except Exception as e:
+                req.reply("error", f"모델 로드 실패 ({name}): {e}")
+                continue
+
+            # 사전 로드용 빈 요청
+            if req.attr is None:
+                req.reply("ok", None)
+                continue
+
+            batch_method = BATCH_METHODS.get((name, req.attr))
+            if batch_method and hasattr(model, batch_method) and req.args is not None and len(req.args) == 1:
+                batch, leftover = self._collect_batch(req, q)
+                pending.extend(leftover)
+                try:
+                    results = getattr(model, batch_method)([r.args[0] for r in batch], **(req.kwargs or {}))
+                    for r, result in zip(batch, results):
+                        r.reply("ok", result)
+                except Exception:
+                    error = traceback.format_exc()
+                    for r in batch:
+                        r.reply("error", error)
+                continue
+
+            try:
+                value = getattr(model, req.attr)
+                if req.args is None:
+                    # 속성 조회: 메서드면 표시만 하고 값은 그대로 반환
+                    req.reply("method" if callable(value) else "ok", None if callable(value) else value)
+                else:
+                    req.reply("ok", value(*req.args, **(req.kwargs or {})))
+            except Exception:
+                req.reply("error", traceback.format_exc())
+
+    def _handle_connection(self, conn):
+        send_lock = threading.Lock()
+
+        def make_reply(request_id):
+            def reply(status, value):
+                with send_lock:
+                    try:
+                        conn.send((request_id, status, value))
+                    except Exception as e:
+                        print(f"[ModelServer] 응답 전송 실패: {e}")
+            return reply
+
+        try:
+            while True:
+                try:
+                    request_id, model, attr, args, kwargs = conn.recv()
+                except EOFError:
+                    break
+
+                if model == "__ping__":
+                    make_reply(request_id)("ok", sorted(self.loaded))
+                    continue
+
+                # 메서드/속성 목록은 추론 대기열을 거치지 않고 바로 응답 (추론이 도는 동안 프록시 생성이 막히지 않도록)
+                if attr == "__describe__":
+                    try:
+                        make_reply(request_id)("ok", _describe(self._get_model(model)))
+                    except Exception as e:
+                        make_reply(request_id)("error", f"모델 로드 실패 ({model}): {e}")
+                    continue
+
+                self._get_queue(model).put(_Request(model, attr, args, kwargs, make_reply(request_id)))
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+
+        listener = Listener(self.address, authkey=self.authkey)
+        print(f"[ModelServer] 대기 중: {self.address}")
+
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                print(f"[ModelServer] 연결 수락 실패: {e}")
+                continue
+            threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+
+# ---------- 웹 워커 측 클라이언트 ----------
+
+class _ModelServerClient:
+    def __init__(self, address, authkey: bytes, timeout: float):
+        self.address = address
+        self.authkey = authkey
+        self.timeout = timeout
+        self.pool: "queue.LifoQueue" = queue.LifoQueue()
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def _next_id(self) -> int:
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+    # 연결 하나당 요청 하나씩 (executor 스레드마다 다른 연결을 쓰도록 풀로 관리)
+    def request(self, model: str, attr: Optional[str], args=None, kwargs=None):
+        try:
+            conn = self.pool.get_nowait()
+        except queue.Empty:
+            conn = Client(self.address, authkey=self.authkey)
+
+        request_id = self._next_id()
+        try:
+            conn.send((request_id, model, attr, args, kwargs))
+            if not conn.poll(self.timeout):
+                raise TimeoutError(f"모델 서버 응답 시간 초과 ({model}.{attr})")
+            _, status, value = conn.recv()
+        except Exception:
+            conn.close()
+            raise
+
+        self.pool.put(conn)
+
+        if status == "error":
+            raise RuntimeError(f"모델 서버 오류 ({model}.{attr}): {value}")
+        return status, value
+
+
+_client: Optional[_ModelServerClient] = None
+
+
+def _get_client() -> _ModelServerClient:
+    global _client
+    if _client is None:
+        _client = _ModelServerClient(
+            _get_address(),
+            _get_authkey(),
+            timeout=float(os.getenv("MODEL_SERVER_TIMEOUT", "600")),
+        )
+    return _client
+
+
+# 로컬 모델과 같은 인터페이스로 쓰는 원격 프록시 (메서드 호출/속성 조회를 모델 서버로 전달)
+# 메서드/속성 목록은 처음 한 번만 받아 둠 - 이후 속성 조회는 모델 서버 왕복 없음
+class RemoteModel:
+    def __init__(self, name: str):
+        self._name = name
+        self._methods = set()
+        self._values: Optional[Dict] = None
+
+    def _call(self, attr: str, *args, **kwargs):
+        _, value = _get_client().request(self._name, attr, args, kwargs)
+        return value
+
+    def _describe(self):
+        if self._values is None:
+            _, table = _get_client().request(self._name, "__describe__")
+            self._methods.update(table["methods"])
+            self._values = table["values"]
+
+    def __getattr__(self, attr: str):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+
+        if attr not in self._methods:
+            self._describe()
+            if attr in self._values:
+                return self._values[attr]
+
+        if attr not in self._methods:
+            # 목록에 없는 속성 (복잡한 객체 등)은 기존처럼 모델 대기열을 거쳐 조회
+            status, value = _get_client().request(self._name, attr)
+            if status != "method":
+                return value
+            self._methods.add(attr)
+
+        return lambda *args, **kwargs: self._call(attr, *args, **kwargs)
+
+
+_remote_models: Dict[str, RemoteModel] = {}
+
+
+def get_remote_model(name: str) -> RemoteModel:
+    if name not in _remote_models:
+        _remote_models[name] = RemoteModel(name)
+    return _remote_models[name]
+
+
+def ping() -> List[str]:
+    _, loaded = _get_client().request("__ping__", None)
+    return loaded
+
+
+def serve():
+    os.environ[_SERVING_ENV] = "1"
+
+    address = _get_address()
+    if address is None:
+        print("MODEL_SERVER_ADDRESS가 설정되지 않았습니다.")
+        sys.exit(1)
+
+    server = ModelServer(
+        address,
+        _get_authkey(),
+        max_batch=int(os.getenv("MODEL_SERVER_MAX_BATCH", "32")),
+        batch_wait_ms=float(os.getenv("MODEL_SERVER_BATCH_WAIT_MS", "5")),
+    )
+
+    # 기본으로 음성 분석기는 미리 로드 (나머지는 첫 요청 시 로드)
+    preload = [name.strip() for name in os.getenv("MODEL_SERVER_PRELOAD", "analyzer").split(",") if name.strip()]
+    server.preload(preload)
+
+    from app.core.model_registry import get_model_registry
+    get_model_registry().start_idle_evictor()
+    server.serve_forever()
+
+
+# CLI 실행
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "serve"
+
+    if command == "serve":
+        serve()
+    elif command == "ping":
+        try:
+            print(f"모델 서버 응답 OK (로드된 모델: {ping()})")
+        except Exception as e:
+            print(f"모델 서버 연결 실패: {e}")
+            sys.exit(1)
+    else:
+        print("사용법: python -m app.service.model_server [serve|ping]")
+        sys.exit(1)
@@ -2,6 +2,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict
 from ..database.crud.presentation import PresentationCRUD
 from .voice_analyzer import get_analyzer
+from .audio_service import DecodedAudio
+from ..core.inference_executor import run_inference
 from .presentation_scorer import PresentationScorer
 from .presentation_feedback_service import PresentationFeedbackService
 
@@ -9,14 +11,18 @@ from .presentation_feedback_service import PresentationFeedbackService
 class PresentationAnalysisService:
 
     def __init__(self):
-        self.analyzer = get_analyzer() # 분석 값 불러오기
         self.scorer = PresentationScorer() # 점수화 값 불러오기
         self.feedback_service = PresentationFeedbackService() # 피드백 불러오기
 
+    # 분석 모델은 매번 레지스트리에서 조회 (유휴 해제 후 재로드 대응)
+    @property
+    def analyzer(self):
+        return get_analyzer()
+
     # 음성을 분석 -> 점수화 -> 피드백 생성 -> DB에 모두 저장
-    async def analyze_and_save(self, db: AsyncSession, pr_id: int, v_f_id: int, audio_path: str, estimated_syllables: int = None) -> Dict:
-        # 음성 분석
-        analysis_result = self.analyzer.analyze(audio_path=audio_path, estimated_syllables=estimated_syllables)
+    async def analyze_and_save(self, db: AsyncSession, pr_id: int, v_f_id: int, audio: DecodedAudio, estimated_syllables: int = None) -> Dict:
+        # 음성 분석 (디코딩된 파형 그대로 사용)
+        analysis_result = await run_inference("wav2vec", self.analyzer.analyze_waveform, audio.samples, audio.sample_rate, estimated_syllables=estimated_syllables)
 
         if "error" in analysis_result:
             raise ValueError(f"Analysis failed: {analysis_result['error']}")
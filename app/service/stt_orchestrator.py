@@ -0,0 +1,109 @@
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import librosa
+import numpy as np
+
+# 긴 녹음 STT 분할/병합
+# 1) VoiceAnalyzer와 같은 librosa.effects.split(top_db=30)로 무음 구간을 찾고 무음 중간에서 자름
+# 2) 각 조각은 앞뒤로 STT_CHUNK_OVERLAP_SEC만큼 겹치게 인식 (경계에서 단어가 잘리지 않도록)
+# 3) 겹친 구간의 같은 단어로 조각 간 화자 번호를 맞추고, 경계 기준으로 단어를 한 번씩만 남김
+# 결과는 ScriptParser가 쓰는 {"results":[{"alternatives":[{"transcript", "words"}]}]} 형식 그대로
+
+STT_CHUNK_TARGET_SEC = float(os.getenv("STT_CHUNK_TARGET_SEC", "30"))   # 목표 조각 길이
+STT_CHUNK_OVERLAP_SEC = float(os.getenv("STT_CHUNK_OVERLAP_SEC", "1.5")) # 조각 앞뒤 겹침
+SILENCE_TOP_DB = 30
+
+
+# 조각 경계 계산 (초 단위 [(start, end), ...], 겹침 제외한 본 구간)
+def plan_chunks(samples: np.ndarray, sr: int, max_chunk_sec: float, target_chunk_sec: float = STT_CHUNK_TARGET_SEC) -> List[Tuple[float, float]]:
+    duration = len(samples) / sr
+    if duration <= max_chunk_sec:
+        return [(0.0, duration)]
+
+    # 무음 구간 중간 지점을 자를 후보로 사용
+    intervals = librosa.effects.split(samples, top_db=SILENCE_TOP_DB)
+    candidates = [((intervals[i][1] + intervals[i + 1][0]) / 2) / sr for i in range(len(intervals) - 1)]
+
+    # 겹침까지 포함해도 동기 인식 한도를 넘지 않도록
+    max_core = max_chunk_sec - 2 * STT_CHUNK_OVERLAP_SEC
+    target = min(target_chunk_sec, max_core)
+    min_core = target / 2
+
+    chunks = []
+    start = 0.0
+    while duration - start > max_core:
+        window = [c for c in candidates if start + min_core <= c <= start + max_core]
+        if window:
+            # 목표 길이에 가장 가까운 무음 지점
+            cut = min(window, key=lambda c: abs(c - (start + target)))
+        else:
+            # 긴 연속 발화: 최대 길이에서 강제로 자름 (겹침 구간으로 보정)
+            cut = start + max_core
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, duration))
+
+    return chunks
+
+
+def _parse_time(value: str) -> float:
+    return float(value.rstrip("s")) if value else 0.0
+
+
+def _speaker_mapping(previous: List[Dict[str, Any]], current: List[Dict[str, Any]], overlap: Tuple[float, float]) -> Dict[str, str]:
+    # 겹친 구간에서 같은 단어가 비슷한 시각에 나오면 같은 화자로 보고 다수결로 매핑
+    lo, hi = overlap
+    prev_words = [w for w in previous if lo <= _parse_time(w["startTime"]) <= hi]
+    votes: Dict[str, Counter] = {}
+
+    for word in current:
+        start = _parse_time(word["startTime"])
+        if not lo <= start <= hi:
+            continue
+        for prev in prev_words:
+            if prev["word"] == word["word"] and abs(_parse_time(prev["startTime"]) - start) < 0.3:
+                votes.setdefault(word["speakerLabel"], Counter())[prev["speakerLabel"]] += 1
+                break
+
+    return {label: counter.most_common(1)[0][0] for label, counter in votes.items()}
+
+
+# 조각별 STT 결과를 하나로 합침
+# chunk_results[i]: i번째 조각의 results (타임스탬프는 이미 전체 녹음 기준)
+def stitch_chunks(chunk_results: List[List[Dict[str, Any]]], chunks: List[Tuple[float, float]], overlap_sec: float = STT_CHUNK_OVERLAP_SEC) -> Dict[str, Any]:
+    merged: List[Dict[str, Any]] = []
+    previous_words: Optional[List[Dict[str, Any]]] = None
+
+    for i, (results, (core_start, core_end)) in enumerate(zip(chunk_results, chunks)):
+        words = [w for res in results for alt in res.get("alternatives", [])[:1] for w in alt.get("words", [])]
+
+        # 앞 조각과 화자 번호 맞추기 (매핑되지 않은 번호는 그대로)
+        if previous_words is not None:
+            mapping = _speaker_mapping(previous_words, words, (core_start - overlap_sec, core_start + overlap_sec))
+            for word in words:
+                word["speakerLabel"] = mapping.get(word["speakerLabel"], word["speakerLabel"])
+        previous_words = words
+
+        # 경계 기준으로 본 구간에서 시작한 단어만 남김 (첫 조각은 0부터, 마지막 조각은 끝까지)
+        lo = core_start if i > 0 else float("-inf")
+        hi = core_end if i < len(chunks) - 1 else float("inf")
+
+        for res in results:
+            alternatives = res.get("alternatives", [])
+            if not alternatives:
+                continue
+            alt = alternatives[0]
+            all_words = alt.get("words", [])
+            kept = [w for w in all_words if lo <= _parse_time(w["startTime"]) < hi]
+            if not kept and all_words:
+                continue
+
+            transcript = alt.get("transcript", "")
+            if len(kept) != len(all_words):
+                transcript = " ".join(w["word"] for w in kept)
+
+            merged.append({"alternatives": [{"transcript": transcript, "words": kept}]})
+
+    return {"results": merged}
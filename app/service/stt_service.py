@@ -1,31 +1,139 @@
 from google.cloud import speech_v2
 from google.cloud.speech_v2 import types
-from typing import Dict, Any
-import json
+from google.cloud.speech_v2.services.speech.transports import SpeechGrpcAsyncIOTransport
+from google.api_core import exceptions as google_exceptions
+from google.api_core import retry as retries
+from typing import Dict, Any, List, Optional
+import asyncio
+import grpc
+import os
+import weakref
+from app.core.content_cache import get_content_cache
+from app.core.inference_executor import run_inference
+from app.service.audio_service import AudioService, parse_pcm_wav, pcm16_to_wav
+from app.service.stt_orchestrator import plan_chunks, stitch_chunks, STT_CHUNK_OVERLAP_SEC
 
 location = "us"  # chirp_3와 long 모델 같이 사용 가능한 리전
-client = speech_v2.SpeechClient(client_options={"api_endpoint": f"{location}-speech.googleapis.com"})
+
+# 로컬 가짜 recognizer / 에뮬레이터로 돌릴 때 STT_API_ENDPOINT로 엔드포인트 변경
+STT_API_ENDPOINT = os.getenv("STT_API_ENDPOINT", f"{location}-speech.googleapis.com")
+STT_INSECURE = os.getenv("STT_INSECURE", "0") == "1"  # 로컬 가짜 recognizer용 평문 gRPC 채널 (TLS/인증 없음, 운영 금지)
+STT_TIMEOUT_SEC = float(os.getenv("STT_TIMEOUT_SEC", "120"))  # 요청 1건 deadline (재시도 포함)
+# 동기 Recognize는 오디오 60초까지 - 넘으면 무음 경계에서 나눠서 인식 (겹침 포함 조각 최대 길이)
+STT_SYNC_LIMIT_SEC = float(os.getenv("STT_SYNC_LIMIT_SEC", "55"))
+STT_MAX_CONCURRENCY = int(os.getenv("STT_MAX_CONCURRENCY", "4"))  # 긴 음성 조각 동시 요청 수 (bounded semaphore)
+
+# 일시적인 오류만 재시도 (지수 backoff)
+STT_RETRY = retries.AsyncRetry(
+    initial=1.0,
+    maximum=10.0,
+    multiplier=2.0,
+    timeout=STT_TIMEOUT_SEC,
+    predicate=retries.if_exception_type(
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+        google_exceptions.TooManyRequests,
+    ),
+)
+
+# grpc aio 채널은 이벤트 루프에 묶이므로 루프별로 클라이언트 하나씩 재사용 (job worker 등 루프가 다른 프로세스 대비)
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, speech_v2.SpeechAsyncClient]" = weakref.WeakKeyDictionary()
+
+
+# 실행 중인 이벤트 루프 안에서 호출 (grpc aio 채널이 현재 루프에 묶임)
+def create_async_client(endpoint: Optional[str] = None, insecure: Optional[bool] = None) -> speech_v2.SpeechAsyncClient:
+    endpoint = endpoint or STT_API_ENDPOINT
+    insecure = STT_INSECURE if insecure is None else insecure
+    if insecure:
+        transport = SpeechGrpcAsyncIOTransport(channel=grpc.aio.insecure_channel(endpoint))
+        return speech_v2.SpeechAsyncClient(transport=transport)
+    return speech_v2.SpeechAsyncClient(client_options={"api_endpoint": endpoint})
+
+
+def get_async_client() -> speech_v2.SpeechAsyncClient:
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        _clients[loop] = create_async_client()
+    return _clients[loop]
+
+
+def _format_time(seconds: float) -> str:
+    return f"{seconds:.3f}s"
+
 
 class STTService:
 
-    def __init__(self, project_id: str):
+    def __init__(self, project_id: str, client: Optional[speech_v2.SpeechAsyncClient] = None):
         self.project_id = project_id
-        self.client = client
+        self._client = client  # 지정하지 않으면 루프별 공용 클라이언트 사용
+
+    @property
+    def client(self) -> speech_v2.SpeechAsyncClient:
+        return self._client or get_async_client()
 
-    # chirp 모델 (화자분리)
+    # chirp 모델 (화자분리) - 같은 음성은 캐시된 STT 결과 재사용 (유료 호출 절약)
     async def transcribe_chirp(self, wav_data: bytes) -> Dict[str, Any]:
+        cache = get_content_cache()
+        key = cache.make_key("stt", wav_data, "google", "chirp_3", "ko-KR", location)
+
+        cached = cache.get_json("stt", key)
+        if cached is not None:
+            return cached
+
+        result = await self._transcribe_chirp(wav_data)
+        cache.put_json("stt", key, result)
+        return result
+
+    async def _transcribe_chirp(self, wav_data: bytes) -> Dict[str, Any]:
+        parsed = parse_pcm_wav(wav_data)
+
+        # 동기 인식 한도 이내거나 PCM wav가 아니면 한 번에 요청
+        if parsed is None:
+            return {"results": await self._recognize(wav_data)}
+
+        sample_rate, channels, sample_width, pcm = parsed
+        frame_bytes = channels * sample_width
+        duration = len(pcm) / (sample_rate * frame_bytes)
+
+        if duration <= STT_SYNC_LIMIT_SEC or sample_width != 2:
+            return {"results": await self._recognize(wav_data)}
+
+        # 긴 음성: 무음 경계에서 나눠(앞뒤 겹침 포함) 동시에 인식한 뒤 타임스탬프/화자 번호를 맞춰 합침
+        def plan() -> List:
+            samples = AudioService.wav_to_samples(wav_data)
+            return plan_chunks(samples.samples, samples.sample_rate, STT_SYNC_LIMIT_SEC)
+
+        chunks = await run_inference("audio", plan)
+        bytes_per_sec = sample_rate * frame_bytes
+        semaphore = asyncio.Semaphore(STT_MAX_CONCURRENCY)
+
+        async def recognize_chunk(core_start: float, core_end: float) -> List[Dict[str, Any]]:
+            start = max(0, int((core_start - STT_CHUNK_OVERLAP_SEC) * sample_rate)) * frame_bytes
+            end = min(len(pcm), int((core_end + STT_CHUNK_OVERLAP_SEC) * sample_rate) * frame_bytes)
+            chunk_wav = pcm16_to_wav(pcm[start:end], sample_rate, channels)
+            async with semaphore:
+                return await self._recognize(chunk_wav, offset_sec=start / bytes_per_sec)
+
+        print(f"[STT] {duration:.1f}초 음성을 {len(chunks)}개 조각으로 나눠서 인식")
+        chunk_results = await asyncio.gather(*[recognize_chunk(core_start, core_end) for core_start, core_end in chunks])
+
+        return stitch_chunks(chunk_results, chunks)
+
+    # 동기 Recognize 1회 (비동기 클라이언트, deadline + 재시도)
+    async def _recognize(self, wav_data: bytes, offset_sec: float = 0.0) -> List[Dict[str, Any]]:
 
         # 모델 설정
         config = types.RecognitionConfig(
-            auto_decoding_config=types.AutoDetectDecodingConfig(), 
-            language_codes=["ko-KR"],  
-            model="chirp_3", 
+            auto_decoding_config=types.AutoDetectDecodingConfig(),
+            language_codes=["ko-KR"],
+            model="chirp_3",
             features=types.RecognitionFeatures(
                 enable_word_time_offsets=True,
                 diarization_config=types.SpeakerDiarizationConfig(
-                    min_speaker_count=2,   
-                    max_speaker_count=3, 
-                )                
+                    min_speaker_count=2,
+                    max_speaker_count=3,
+                )
             ),
         )
 
@@ -33,34 +141,31 @@ class STTService:
         request = speech_v2.RecognizeRequest(
             recognizer=f"projects/{self.project_id}/locations/{location}/recognizers/chirp",
             config=config,
-            content=wav_data,  
+            content=wav_data,
         )
 
-        # Google STT API 호출
-        response = self.client.recognize(request=request)
+        # Google STT API 호출 (이벤트 루프를 막지 않음)
+        response = await self.client.recognize(request=request, retry=STT_RETRY, timeout=STT_TIMEOUT_SEC)
 
-        # 결과 포맷 초기화
-        result = {
-            "results": [],
-        }
+        results = []
 
         # 응답 데이터 변환
         for res in response.results:
             if res.alternatives:
                 alt = res.alternatives[0]
-                result["results"].append({
+                results.append({
                     "alternatives": [{
                         "transcript": alt.transcript,  # 변환된 텍스트 (문장 단위)
                         "words": [
                             {
-                                "word": word.word,  
+                                "word": word.word,
                                 "speakerLabel": str(word.speaker_label) if hasattr(word, 'speaker_label') else "1",  # 화자 번호 없으면 1로
-                                "startTime": f"{word.start_offset.seconds}.{word.start_offset.microseconds // 1000:03d}s",
-                                "endTime": f"{word.end_offset.seconds}.{word.end_offset.microseconds // 1000:03d}s"
+                                "startTime": _format_time(offset_sec + word.start_offset.total_seconds()),
+                                "endTime": _format_time(offset_sec + word.end_offset.total_seconds())
                                 }
                             for word in alt.words
                         ]
                     }]
                 })
 
-        return result
\ No newline at end of file
+        return results
@@ -0,0 +1,124 @@
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.database.models.interview import Interview, InterviewAnswer
+from app.infra.embeddings import get_embeddings
+from app.infra.vector_store import get_vector_store
+from app.service.answer_analysis_service import build_answer_documents
+
+# 벡터 저장소를 MySQL(i_answers)에서 다시 만들기
+# - 분석이 끝난 답변(labels_json 있음)의 transcript + 문장을 다시 임베딩해서 저장 (같은 문장은 임베딩 캐시 사용)
+# - 답변 id 순서로 넣으므로 어느 노드에서 돌려도 같은 결과 (컨테이너마다 다른 로컬 인덱스를 맞출 때)
+# - 전체 재생성이 끝까지 성공하면 저장소에 완료 시각을 남김 (중간에 실패한 인덱스는 --if-incomplete로 다시 만듦)
+#
+# 사용법: python -m app.service.vector_rebuild [--reset] [--user USER_ID] [--if-incomplete]
+
+REBUILD_PAGE_SIZE = 200
+
+
+# labels_json에는 라벨(0/1)과 점수가 따로 저장되어 있으므로 BERT 결과 형식({label: {"score", "label"}})으로 되돌림
+def _overall_raw_labels(labels_json: Dict[str, Any]) -> Dict[str, Any]:
+    scores = labels_json.get("overall_scores") or {}
+    raw: Dict[str, Any] = {}
+    for label, flag in (labels_json.get("overall_labels") or {}).items():
+        raw[label] = {"label": flag}
+        if label in scores:
+            raw[label]["score"] = scores[label]
+    return raw
+
+
+def _label_counts(labels_json: Dict[str, Any]) -> Dict[str, int]:
+    if labels_json.get("label_counts") is not None:
+        return labels_json["label_counts"]
+    counts: Dict[str, int] = {}
+    for sent in labels_json.get("sentences") or []:
+        for label, flag in (sent.get("labels") or {}).items():
+            counts[label] = counts.get(label, 0) + int(bool(flag))
+    return counts
+
+
+async def rebuild_vector_store(user_id: Optional[int] = None, reset: bool = False, page_size: int = REBUILD_PAGE_SIZE) -> int:
+    from app.database.database import AsyncSessionLocal
+
+    store = get_vector_store()
+    if reset:
+        if user_id is None:
+            store.reset()
+        else:
+            store.delete_user_documents(user_id)
+    # 전체 재생성은 끝날 때까지 미완료로 표시 (중간에 실패하면 다음 시작 때 다시 만들도록)
+    if user_id is None:
+        store.set_rebuilt_at(0)
+
+    last_answer_id = 0
+    total = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            query = (
+                select(InterviewAnswer, Interview.user_id, Interview.language)
+                .join(Interview, Interview.i_id == InterviewAnswer.i_id)
+                .where(InterviewAnswer.labels_json.isnot(None), InterviewAnswer.i_answer_id > last_answer_id)
+                .order_by(InterviewAnswer.i_answer_id)
+                .limit(page_size)
+            )
+            if user_id is not None:
+                query = query.where(Interview.user_id == user_id)
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+            last_answer_id = rows[-1][0].i_answer_id
+
+            # 페이지 안의 모든 답변 문서를 한 번에 임베딩
+            built = []
+            texts: List[str] = []
+            for answer, answer_user_id, language in rows:
+                labels_json = answer.labels_json
+                sentences = labels_json.get("sentences") or []
+                text = answer.transcript or " ".join(s.get("text", "") for s in sentences)
+                ids, docs, metas = build_answer_documents(
+                    answer.i_answer_id, answer.i_id, answer.q_order or 0, answer_user_id, text, sentences,
+                    _label_counts(labels_json), _overall_raw_labels(labels_json),
+                    stt_metrics=answer.stt_metrics_json,
+                    created_at=answer.created_at.timestamp() if answer.created_at else None,
+                    language=language or "ko",
+                )
+                built.append((answer_user_id, answer.i_answer_id, ids, docs, metas, len(texts)))
+                texts.extend(docs)
+
+            embeddings = get_embeddings(texts)
+            for answer_user_id, answer_id, ids, docs, metas, start in built:
+                store.upsert_answer(answer_user_id, answer_id, ids, docs, metas, embeddings[start:start + len(docs)])
+
+            total += len(rows)
+            print(f"[VectorRebuild] {total}개 답변 저장 (마지막 답변 id {last_answer_id})")
+
+    store.flush()
+    if user_id is None:
+        store.set_rebuilt_at(int(time.time()))
+    print(f"[VectorRebuild] 완료 - {total}개 답변 ({store.backend})")
+    return total
+
+
+# CLI 실행
+if __name__ == "__main__":
+    if "--help" in sys.argv or "-h" in sys.argv:
+        print("사용법: python -m app.service.vector_rebuild [--reset] [--user USER_ID]")
+        print("")
+        print("  --reset         저장소를 비우고 다시 만듦 (--user와 같이 쓰면 그 사용자 문서만 삭제)")
+        print("  --user USER_ID  한 사용자의 답변만 다시 저장")
+        print("  --if-incomplete 전체 재생성 완료 기록이 있으면 아무것도 하지 않음 (없으면 --reset으로 처음부터)")
+        sys.exit(0)
+
+    if "--if-incomplete" in sys.argv:
+        rebuilt_at = get_vector_store().rebuilt_at()
+        if rebuilt_at:
+            print(f"[VectorRebuild] 완료 기록 있음 ({time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(rebuilt_at))}) - 건너뜀")
+            sys.exit(0)
+        sys.argv.append("--reset")
+
+    target_user = int(sys.argv[sys.argv.index("--user") + 1]) if "--user" in sys.argv else None
+    asyncio.run(rebuild_vector_store(user_id=target_user, reset="--reset" in sys.argv))
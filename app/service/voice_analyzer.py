@@ -1,22 +1,30 @@
 import pickle
 import torch
-import torchaudio
 import librosa
 import numpy as np
 from pathlib import Path
 from typing import Dict, Optional
 import warnings
+import os
 
 from app.core.model_loader import MODEL_DIR
+from app.core.content_cache import get_content_cache
+from app.service.wav2vec_backend import load_wav2vec_encoder, get_backend_name
 
 warnings.filterwarnings('ignore')
 
 class VoiceAnalyzer:
-    def __init__(self, model_dir: str = "app/ml_models"):
+    def __init__(self, model_dir: str = "app/ml_models", backend: Optional[str] = None):
 
         self.model_dir = Path(model_dir)
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
+        # wav2vec2 인코더 실행 방식 (torch, torch_int8, onnx) - 기본값은 WAV2VEC_BACKEND 환경변수
+        self.backend = get_backend_name(backend)
+
+        # wav2vec2 청크 배치 크기 (1이면 기존처럼 청크 하나씩 처리)
+        self.batch_size = int(os.getenv("WAV2VEC_BATCH_SIZE", "4"))
+
         # 모델 로드
         self._load_models()
 
@@ -38,12 +46,11 @@ class VoiceAnalyzer:
                 self.idx_to_emotion = label_mapping['idx_to_emotion']
                 self.emotion_to_idx = label_mapping['emotion_to_idx']
 
-            # Wav2Vec2 모델 로드
-            print("Wav2Vec2 모델 로드 중...")
-            bundle = torchaudio.pipelines.WAV2VEC2_XLSR_300M
-            self.wav2vec_model = bundle.get_model().to(self.device)
-            self.wav2vec_model.eval()
-            self.sample_rate = bundle.sample_rate
+            # Wav2Vec2 모델 로드 (int8/onnx 백엔드는 CPU에서 실행)
+            print(f"Wav2Vec2 모델 로드 중... (backend: {self.backend})")
+            self.wav2vec_model = load_wav2vec_encoder(self.backend, self.device, self.model_dir)
+            self.device = self.wav2vec_model.device
+            self.sample_rate = self.wav2vec_model.sample_rate
 
             print(f"  감정 클래스: {list(self.idx_to_emotion.values())}")
 
@@ -54,42 +61,67 @@ class VoiceAnalyzer:
     def extract_wav2vec_features(self, audio_path: str, chunk_sec: int = 30) -> Optional[np.ndarray]:
         try:
             waveform_np, sr = librosa.load(audio_path, sr=16000, mono=True)
+            return self._wav2vec_features(waveform_np, sr, chunk_sec=chunk_sec)
+
+        except Exception as e:
+            print(f"Wav2Vec2 특징 추출 오류: {e}")
+            return None
 
-            chunk_size = chunk_sec * sr  # 청크당 샘플 수 (기본 30초)
-            total_samples = len(waveform_np)
+    # 이미 디코딩된 파형에서 청크별 wav2vec2 특징 평균 계산
+    # 같은 길이의 청크를 batch_size개씩 묶어서 한 번에 forward (짧은 마지막 청크는 패딩 + 길이 마스크)
+    def _wav2vec_features(self, waveform_np: np.ndarray, sr: int, chunk_sec: int = 30, batch_size: Optional[int] = None) -> Optional[np.ndarray]:
+        chunk_size = chunk_sec * sr  # 청크당 샘플 수 (기본 30초)
+        total_samples = len(waveform_np)
+        batch_size = max(1, batch_size or self.batch_size)
 
-            chunk_features = []
+        # 너무 짧은 청크 무시 (0.5초 미만)
+        chunks = [waveform_np[start:min(start + chunk_size, total_samples)] for start in range(0, total_samples, chunk_size)]
+        chunks = [chunk for chunk in chunks if len(chunk) >= sr * 0.5]
+
+        if not chunks:
+            return None
 
-            for start in range(0, total_samples, chunk_size):
-                end = min(start + chunk_size, total_samples)
-                chunk = waveform_np[start:end]
+        chunk_features = []
 
-                # 너무 짧은 청크 무시 (0.5초 미만)
-                if len(chunk) < sr * 0.5:
-                    continue
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+            chunk_lengths = [len(chunk) for chunk in batch]
+            max_len = max(chunk_lengths)
 
-                waveform = torch.from_numpy(chunk).float().unsqueeze(0).to(self.device)
+            if len(batch) == 1:
+                # from_numpy는 버퍼를 복사하지 않으므로 청크마다 새 배열이 생기지 않음
+                waveform = torch.from_numpy(batch[0]).unsqueeze(0).to(self.device)
+            else:
+                padded = np.zeros((len(batch), max_len), dtype=np.float32)
+                for j, chunk in enumerate(batch):
+                    padded[j, :len(chunk)] = chunk
+                waveform = torch.from_numpy(padded).to(self.device)
 
-                with torch.no_grad():
-                    features, _ = self.wav2vec_model(waveform)
+            # 패딩이 있을 때만 길이를 넘겨서 attention mask 적용
+            lengths = None
+            if min(chunk_lengths) != max_len:
+                lengths = torch.tensor(chunk_lengths, device=self.device)
 
-                chunk_mean = features.mean(dim=1).squeeze().cpu().numpy()
-                chunk_features.append(chunk_mean)
+            with torch.no_grad():
+                features, out_lengths = self.wav2vec_model(waveform, lengths)
 
-                # 메모리 명시적 해제
-                del waveform, features
-                if self.device.type == 'cuda':
-                    torch.cuda.empty_cache()
+            if out_lengths is None:
+                chunk_means = features.mean(dim=1)
+            else:
+                # 패딩 프레임을 제외한 청크별 평균 (청크 하나씩 돌렸을 때의 mean과 동일)
+                valid = torch.arange(features.shape[1], device=features.device)[None, :] < out_lengths[:, None]
+                valid = valid.unsqueeze(-1).to(features.dtype)
+                chunk_means = (features * valid).sum(dim=1) / valid.sum(dim=1).clamp(min=1.0)
 
-            if not chunk_features:
-                return None
+            chunk_features.extend(chunk_means.cpu().numpy())
 
-            # 청크별 feature 평균 → 전체 특징 벡터
-            return np.mean(chunk_features, axis=0)
+            # 메모리 명시적 해제
+            del waveform, features
+            if self.device.type == 'cuda':
+                torch.cuda.empty_cache()
 
-        except Exception as e:
-            print(f"Wav2Vec2 특징 추출 오류: {e}")
-            return None
+        # 청크별 feature 평균 → 전체 특징 벡터
+        return np.mean(chunk_features, axis=0)
 
     # # 청크화 이전
     # def extract_wav2vec_features(self, audio_path: str) -> Optional[np.ndarray]:
@@ -188,35 +220,73 @@ class VoiceAnalyzer:
     #         return {}
 
     # 청크화
-    def analyze(self, audio_path: str, estimated_syllables: Optional[int] = None) -> Dict:
+    def analyze(self, audio_path: str, estimated_syllables: Optional[int] = None, pitch_method: str = "piptrack") -> Dict:
         try:
             # 오디오를 로드
             waveform_np, sr = librosa.load(audio_path, sr=16000, mono=True)
-            duration = len(waveform_np) / sr
+        except Exception as e:
+            print(f"분석 오류: {e}")
+            return {"error": str(e)}
 
-            # Wav2Vec2 청크 특징 추출
-            chunk_sec = 30
-            chunk_size = chunk_sec * sr
-            total_samples = len(waveform_np)
-            chunk_features = []
+        return self.analyze_waveform(waveform_np, sr, estimated_syllables=estimated_syllables, pitch_method=pitch_method)
 
-            for start in range(0, total_samples, chunk_size):
-                end = min(start + chunk_size, total_samples)
-                chunk = waveform_np[start:end]
+    # 프레임별 피치 값 (유성음 프레임만)
+    # piptrack: 프레임마다 magnitude가 가장 큰 bin의 피치를 한 번의 argmax/take_along_axis로 선택
+    # pyin/yin: librosa의 기본 주파수 추정 사용 (pyin은 더 정확하지만 느림)
+    def _pitch_values(self, waveform_np: np.ndarray, sr: int, method: str = "piptrack") -> np.ndarray:
+        fmin, fmax = 50, 400
 
-                if len(chunk) < sr * 0.5:
-                    continue
+        if method == "piptrack":
+            pitches, magnitudes = librosa.piptrack(y=waveform_np, sr=sr, fmin=fmin, fmax=fmax)
+            best_bins = magnitudes.argmax(axis=0)[np.newaxis, :]
+            frame_pitches = np.take_along_axis(pitches, best_bins, axis=0)[0]
+            return frame_pitches[frame_pitches > 0]
 
-                waveform = torch.from_numpy(chunk).float().unsqueeze(0).to(self.device)
-                with torch.no_grad():
-                    features, _ = self.wav2vec_model(waveform)
-                chunk_features.append(features.mean(dim=1).squeeze().cpu().numpy())
-                del waveform, features
+        if method == "pyin":
+            f0, voiced_flag, _ = librosa.pyin(waveform_np, sr=sr, fmin=fmin, fmax=fmax)
+            return f0[voiced_flag & ~np.isnan(f0)]
 
-            if not chunk_features:
-                return {"error": "특징 추출 실패"}
+        if method == "yin":
+            # yin은 무성음 판별이 없으므로 탐색 범위 경계에 붙은 값(추정 실패)은 제외
+            f0 = librosa.yin(waveform_np, sr=sr, fmin=fmin, fmax=fmax)
+            return f0[(f0 > fmin) & (f0 < fmax)]
+
+        raise ValueError(f"지원하지 않는 pitch_method: {method}")
+
+    # 디코딩된 파형을 바로 분석 (AudioService.decode_audio 결과를 임시 파일 없이 전달)
+    # 같은 파형 + 같은 옵션이면 디스크 캐시 결과를 반환 (재업로드 / 작업 재시도)
+    def analyze_waveform(self, waveform_np: np.ndarray, sr: int, estimated_syllables: Optional[int] = None, pitch_method: str = "piptrack") -> Dict:
+        waveform_np = np.ascontiguousarray(waveform_np, dtype=np.float32)
+
+        cache = get_content_cache()
+        key = cache.make_key("voice_analysis", memoryview(waveform_np).cast("B"), sr, estimated_syllables, pitch_method, self.backend)
+
+        cached = cache.get_json("voice_analysis", key)
+        if cached is not None:
+            return cached
+
+        result = self._analyze_waveform(waveform_np, sr, estimated_syllables, pitch_method)
+        if "error" not in result:
+            cache.put_json("voice_analysis", key, result)
+        return result
 
-            wav2vec_features = np.mean(chunk_features, axis=0)
+    def _analyze_waveform(self, waveform_np: np.ndarray, sr: int, estimated_syllables: Optional[int] = None, pitch_method: str = "piptrack") -> Dict:
+        try:
+            # 한 번만 float32 / 16kHz mono로 맞추고 아래 모든 특징 추출에서 같은 버퍼 사용
+            waveform_np = np.ascontiguousarray(waveform_np, dtype=np.float32)
+            if waveform_np.ndim > 1:
+                waveform_np = librosa.to_mono(waveform_np)
+            if sr != self.sample_rate:
+                waveform_np = librosa.resample(waveform_np, orig_sr=sr, target_sr=self.sample_rate)
+                sr = self.sample_rate
+
+            duration = len(waveform_np) / sr
+
+            # Wav2Vec2 청크 특징 추출
+            wav2vec_features = self._wav2vec_features(waveform_np, sr)
+
+            if wav2vec_features is None:
+                return {"error": "특징 추출 실패"}
 
             # 감정 예측
             features_scaled = self.scaler.transform([wav2vec_features])
@@ -245,9 +315,7 @@ class VoiceAnalyzer:
             avg_volume_db = librosa.amplitude_to_db(np.array([np.mean(rms)]))[0]
             max_volume_db = librosa.amplitude_to_db(np.array([np.max(rms)]))[0]
 
-            pitches, magnitudes = librosa.piptrack(y=waveform_np, sr=sr, fmin=50, fmax=400)
-            pitch_values = [pitches[magnitudes[:, t].argmax(), t] for t in range(pitches.shape[1])
-                            if pitches[magnitudes[:, t].argmax(), t] > 0]
+            pitch_values = self._pitch_values(waveform_np, sr, method=pitch_method)
 
             intervals = librosa.effects.split(waveform_np, top_db=30)
             total_speech_time = sum((end - start) / sr for start, end in intervals)
@@ -273,9 +341,9 @@ class VoiceAnalyzer:
                 'silence_ratio': float(silence_ratio),
                 'avg_volume_db': float(avg_volume_db),
                 'max_volume_db': float(max_volume_db),
-                'avg_pitch': float(np.mean(pitch_values)) if pitch_values else 0.0,
-                'pitch_std': float(np.std(pitch_values)) if pitch_values else 0.0,
-                'pitch_range': float(np.max(pitch_values) - np.min(pitch_values)) if pitch_values else 0.0,
+                'avg_pitch': float(np.mean(pitch_values)) if pitch_values.size else 0.0,
+                'pitch_std': float(np.std(pitch_values)) if pitch_values.size else 0.0,
+                'pitch_range': float(np.ptp(pitch_values)) if pitch_values.size else 0.0,
                 'speech_rate_total': float(speech_rate_total),
                 'speech_rate_actual': float(speech_rate_actual),
                 'num_segments': int(num_segments),
@@ -363,10 +431,7 @@ class VoiceAnalyzer:
     #         traceback.print_exc()
     #         return {"error": str(e)}
 
-_analyzer_instance = None
-
+# 모델 레지스트리에서 한 번만 로드해서 재사용 (모델 서버 사용 시 원격 프록시)
 def get_analyzer() -> VoiceAnalyzer:
-    global _analyzer_instance
-    if _analyzer_instance is None:
-        _analyzer_instance = VoiceAnalyzer(model_dir=str(MODEL_DIR))
-    return _analyzer_instance
\ No newline at end of file
+    from app.core.model_registry import get_model
+    return get_model("analyzer")
@@ -0,0 +1,197 @@
+import os
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import torch
+import torchaudio
+
+from app.core.model_loader import MODEL_DIR, is_s3_enabled, download_model_from_s3
+
+# wav2vec2 인코더 실행 방식
+# torch      : 기존 fp32 eager PyTorch
+# torch_int8 : Linear 레이어 dynamic int8 양자화 (CPU 전용)
+# onnx       : export한 ONNX 그래프를 onnxruntime으로 실행
+WAV2VEC_BACKENDS = ("torch", "torch_int8", "onnx")
+
+ONNX_MODEL_FILE = "wav2vec2_xlsr_300m.onnx"
+
+
+# torchaudio XLSR-300M (fp32 또는 dynamic int8)
+class TorchWav2VecEncoder:
+    def __init__(self, device: torch.device, quantize: bool = False):
+        bundle = torchaudio.pipelines.WAV2VEC2_XLSR_300M
+        model = bundle.get_model()
+
+        if quantize:
+            # dynamic 양자화는 CPU 커널만 지원
+            device = torch.device("cpu")
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        self.model = model.to(device)
+        self.model.eval()
+        self.device = device
+        self.sample_rate = bundle.sample_rate
+
+    def __call__(self, waveforms: torch.Tensor, lengths: Optional[torch.Tensor] = None) -> Tuple[torch.Tensor, Optional[torch.Tensor]]:
+        return self.model(waveforms, lengths)
+
+
+# onnxruntime으로 실행하는 XLSR-300M
+class OnnxWav2VecEncoder:
+    def __init__(self, model_path: Path, intra_op_threads: int = 0, inter_op_threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # 0이면 onnxruntime 기본값 (물리 코어 수)
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.device = torch.device("cpu")
+        self.sample_rate = torchaudio.pipelines.WAV2VEC2_XLSR_300M.sample_rate
+
+    def __call__(self, waveforms: torch.Tensor, lengths: Optional[torch.Tensor] = None) -> Tuple[torch.Tensor, Optional[torch.Tensor]]:
+        if lengths is None:
+            lengths = torch.full((waveforms.shape[0],), waveforms.shape[1], dtype=torch.int64)
+
+        features, out_lengths = self.session.run(
+            None,
+            {
+                "waveforms": waveforms.detach().cpu().numpy().astype(np.float32, copy=False),
+                "lengths": lengths.detach().cpu().numpy().astype(np.int64),
+            },
+        )
+        return torch.from_numpy(features), torch.from_numpy(out_lengths)
+
+
+def get_backend_name(backend: Optional[str] = None) -> str:
+    backend = (backend or os.getenv("WAV2VEC_BACKEND", "torch")).lower()
+    if backend not in WAV2VEC_BACKENDS:
+        raise ValueError(f"지원하지 않는 WAV2VEC_BACKEND: {backend} (가능: {', '.join(WAV2VEC_BACKENDS)})")
+    return backend
+
+
+def load_wav2vec_encoder(backend: Optional[str], device: torch.device, model_dir: Path = MODEL_DIR):
+    backend = get_backend_name(backend)
+
+    if backend == "torch":
+        return TorchWav2VecEncoder(device)
+
+    if backend == "torch_int8":
+        return TorchWav2VecEncoder(device, quantize=True)
+
+    model_path = Path(model_dir) / ONNX_MODEL_FILE
+    if not model_path.exists() and is_s3_enabled():
+        download_model_from_s3(ONNX_MODEL_FILE)
+    if not model_path.exists():
+        raise FileNotFoundError(f"{model_path} 없음 - 'python -m app.service.wav2vec_backend export'로 먼저 생성하세요.")
+
+    return OnnxWav2VecEncoder(
+        model_path,
+        intra_op_threads=int(os.getenv("ONNX_INTRA_OP_THREADS", "0")),
+        inter_op_threads=int(os.getenv("ONNX_INTER_OP_THREADS", "0")),
+    )
+
+
+# XLSR-300M을 ONNX로 export (batch/길이 dynamic axes)
+def export_onnx(output_path: Path = MODEL_DIR / ONNX_MODEL_FILE, opset: int = 17) -> Path:
+    bundle = torchaudio.pipelines.WAV2VEC2_XLSR_300M
+    model = bundle.get_model().eval()
+
+    dummy_waveforms = torch.zeros(2, bundle.sample_rate * 2)
+    dummy_lengths = torch.tensor([bundle.sample_rate * 2, bundle.sample_rate], dtype=torch.int64)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    print(f"ONNX export 중... ({output_path})")
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy_waveforms, dummy_lengths),
+            str(output_path),
+            input_names=["waveforms", "lengths"],
+            output_names=["features", "out_lengths"],
+            dynamic_axes={
+                "waveforms": {0: "batch", 1: "samples"},
+                "lengths": {0: "batch"},
+                "features": {0: "batch", 1: "frames"},
+                "out_lengths": {0: "batch"},
+            },
+            opset_version=opset,
+        )
+
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    print(f"export 완료 ({size_mb:.1f} MB)")
+    return output_path
+
+
+# held-out 폴더의 음성으로 torch fp32 기준 대비 임베딩 코사인 유사도 + 감정 분류 일치율 확인
+def verify_backend(audio_dir: Path, backend: str, min_cosine: float = 0.99, min_agreement: float = 0.95) -> bool:
+    from app.service.audio_service import AudioService
+    from app.service.voice_analyzer import VoiceAnalyzer
+
+    audio_files = sorted(p for p in Path(audio_dir).iterdir() if p.suffix.lower() in {".wav", ".mp3", ".m4a", ".ogg", ".flac", ".aac", ".webm"})
+    if not audio_files:
+        print(f"{audio_dir}에 음성 파일이 없습니다.")
+        return False
+
+    reference = VoiceAnalyzer(model_dir=str(MODEL_DIR), backend="torch")
+    candidate = VoiceAnalyzer(model_dir=str(MODEL_DIR), backend=backend)
+
+    cosines = []
+    agreements = []
+
+    for path in audio_files:
+        decoded = AudioService.decode_audio(path.read_bytes(), path.suffix)
+
+        ref_features = reference._wav2vec_features(decoded.samples, decoded.sample_rate)
+        cand_features = candidate._wav2vec_features(decoded.samples, decoded.sample_rate)
+        if ref_features is None or cand_features is None:
+            print(f"  {path.name}: 특징 추출 실패 (스킵)")
+            continue
+
+        cosine = float(np.dot(ref_features, cand_features) / (np.linalg.norm(ref_features) * np.linalg.norm(cand_features) + 1e-12))
+
+        ref_pred = reference.emotion_model.predict(reference.scaler.transform([ref_features]))[0]
+        cand_pred = candidate.emotion_model.predict(candidate.scaler.transform([cand_features]))[0]
+
+        cosines.append(cosine)
+        agreements.append(ref_pred == cand_pred)
+        print(f"  {path.name}: cosine={cosine:.5f}, 감정 {reference.idx_to_emotion[ref_pred]} / {candidate.idx_to_emotion[cand_pred]}")
+
+    if not cosines:
+        return False
+
+    mean_cosine = float(np.mean(cosines))
+    agreement = float(np.mean(agreements))
+    print(f"\n[{backend}] 평균 cosine: {mean_cosine:.5f} (최소 {min(cosines):.5f}), 감정 일치율: {agreement * 100:.1f}% ({len(cosines)}개 파일)")
+
+    passed = mean_cosine >= min_cosine and agreement >= min_agreement
+    print("검증 통과" if passed else f"검증 실패 (기준: cosine >= {min_cosine}, 일치율 >= {min_agreement * 100:.0f}%)")
+    return passed
+
+
+# CLI 실행
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("사용법: python -m app.service.wav2vec_backend [export|verify]")
+        print("")
+        print("  export                      - XLSR-300M을 ONNX로 export (MODEL_DIR)")
+        print("  verify <폴더> [backend]     - torch fp32 대비 backend(torch_int8|onnx) 결과 비교")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "export":
+        export_onnx()
+    elif command == "verify":
+        if len(sys.argv) < 3:
+            print("검증할 음성 폴더를 지정하세요.")
+            sys.exit(1)
+        backend = sys.argv[3] if len(sys.argv) > 3 else "onnx"
+        sys.exit(0 if verify_backend(Path(sys.argv[2]), backend) else 1)
+    else:
+        print(f"알 수 없는 명령: {command}")
@@ -1,52 +1,36 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.schemas.interview import WeaknessCardResponse, WeaknessDetail, EvidenceSentence, SimilarAnswerLink
 from app.database.crud import interview as crud
-from app.infra.chroma_db import collection
-from app.service.evidence_builder import build_evidence_sentences, build_similar_answer_links, extract_chroma_sentences
+from app.infra.vector_store import get_vector_store
+from app.core.inference_executor import run_inference, InferenceQueueFullError
+from app.service.evidence_builder import build_similar_answer_links
+from app.service.label_stats_service import get_user_label_stats, TOP_SENTENCE_LIMIT
+from app.core.heavy_hitters import SpaceSaving
 from app.service.copy_builder import build_improvement_guide, build_weakness_summary, get_label_display_name
 
-def _top_sentences_by_frequency(sentences: List[Dict[str, Any]], limit: int = 3) -> List[EvidenceSentence]:
-    # 텍스트가 비어있는 문장은 제외
-    valid = [s for s in sentences if str(s.get("text", "")).strip()]
-    if not valid:
+# 집계에 저장된 Space-Saving 카운터에서 자주 나온 문장 TOP N
+def _top_sentences_by_frequency(top_sentences: Dict[str, List[Any]], limit: int = 3) -> List[EvidenceSentence]:
+    if not top_sentences:
         return []
-    # 텍스트별 빈도 계산
-    freq_map: Dict[str, Dict[str, Any]] = {}
-    for s in valid:
-        text = s.get("text", "").strip()
-        freq_map.setdefault(text, {"count": 0, "latest": 0, "sample": s})
-        freq_map[text]["count"] += 1
-        freq_map[text]["latest"] = max(freq_map[text]["latest"], s.get("created_at", 0) or 0)
-    # 빈도 우선, 최신순 정렬
-    top_texts = sorted(
-        freq_map.items(),
-        key=lambda x: (x[1]["count"] * -1, -x[1]["latest"])
-    )[:limit]
-    top_sentences: List[EvidenceSentence] = []
-    for text, meta in top_texts:
-        sample = meta["sample"]
-        top_sentences.append(
+    top_sentences_list: List[EvidenceSentence] = []
+    for text, count, answer_id, session_id in SpaceSaving(TOP_SENTENCE_LIMIT, top_sentences).top(limit):
+        top_sentences_list.append(
             EvidenceSentence(
-                text=f"{text} (총 {meta['count']}회)",
-                answer_id=sample.get("answer_id", 0),
-                session_id=sample.get("session_id", 0)
+                text=f"{text} (총 {count}회)",
+                answer_id=answer_id or 0,
+                session_id=session_id or 0
             )
         )
-    return top_sentences
+    return top_sentences_list
 
-def _build_trend_text(sentences: List[Dict[str, Any]]) -> str:
-    if not sentences:
+# 발생 순서대로 앞/뒤 절반을 비교 (발생 횟수만으로 결정됨)
+def _build_trend_text(occurrence_count: int) -> str:
+    if occurrence_count <= 0:
         return ""
-    with_timestamp=[s for s in sentences if s.get("created_at")]
-    if not with_timestamp:
-        return ""
-    sorted_s=sorted(with_timestamp, key=lambda x: x.get("created_at", 0))
-    mid=max(1, len(sorted_s)//2)
-    earlier=sorted_s[:mid]
-    recent=sorted_s[mid:]
-    earlier_cnt=len(earlier)
-    recent_cnt=len(recent)
+    mid=max(1, occurrence_count//2)
+    earlier_cnt=mid
+    recent_cnt=occurrence_count-mid
     if earlier_cnt==0 and recent_cnt>0:
         return "최근에 새로 발생하기 시작했습니다."
     change=recent_cnt - earlier_cnt
@@ -87,116 +71,50 @@ async def get_weakness_analysis(db:AsyncSession, user_id:int)->WeaknessCardRespo
         )
 
     try:
-        # ChromaDB에서 사용자의 문장 조회 (언어 필터 제거해 None/ko-KR 등 모든 데이터 포함)
-        results=collection.get(
-            where={
-                "$and":[
-                    {"user_id":user_id},
-                    {"type":"user_answer_sentence"},
-                ]
-            },
-            include=["metadatas", "documents"]
-        )
-
-        ids = results.get("ids")
-        metas = results.get("metadatas")
-        if ids is None:
-            ids=[]
-        if metas is None:
-            metas=[]
-        if len(ids)==0 or len(metas)==0:
-            return WeaknessCardResponse(
-                total_interviews=total_interviews,
-                has_enough_data=True,
-                top_weaknesses=[],
-                summary="분석할 문장을 찾지 못했습니다. 다음 면접 이후 다시 시도해주세요."
-            )
-        
-        # ChromaDB 결과를 표준 포맷으로 변환
-        all_sentences=extract_chroma_sentences(results)
-
-        # created_at으로 정렬
-        sorted_sentences=sorted(all_sentences, key=lambda x:x.get("created_at", 0))
-
-        # 라벨별 문장 수집
-        label_data:Dict[str, List[Dict[str, Any]]]={}
-
-
-        for sent in sorted_sentences:
-            idx=all_sentences.index(sent)
-            if idx >= len(metas):
-                continue
-            meta=metas[idx]
-
-            for key, value in meta.items():
-                if not key.endswith("_label"):
-                    continue
-
-                # value가 배열/numpy 타입인 경우 첫 원소만 사용
-                if hasattr(value, "tolist"):
-                    value=value.tolist()
-                if isinstance(value, (list, tuple)) and len(value)>0:
-                    value=value[0]
-
-                try:
-                    is_positive = float(value)==1
-                except Exception:
-                    is_positive = False
-
-                if is_positive:
-                    label_name=key.replace("_label", "")
-
-                    if label_name not in label_data:
-                        label_data[label_name]=[]
-                    
-                    label_data[label_name].append(sent)
-
+        # 답변 분석 때마다 갱신되는 사용자별 라벨 집계 조회 (Chroma 전체 조회 없음)
+        stats=await get_user_label_stats(db, user_id)
 
         # 라벨별 발생 횟수로 정렬하여 TOP 3 선택
-        label_counts={label:len(sentences) for label, sentences in label_data.items()}
-        if len(label_counts)==0:
+        positive=[stat for stat in stats if stat.occurrence_count>0]
+        if len(positive)==0:
             return WeaknessCardResponse(
                 total_interviews=total_interviews,
                 has_enough_data=True,
                 top_weaknesses=[],
                 summary="분석할 문장을 찾지 못했습니다. 다음 면접 이후 다시 시도해주세요."
             )
-        top_3_labels=sorted(label_counts.items(), key=lambda x:x[1], reverse=True)[:3]
+        top_3_stats=sorted(positive, key=lambda x:x.occurrence_count, reverse=True)[:3]
 
 
         # 각 약점에 대한 상세 정보 생성
         top_weaknesses:List[WeaknessDetail]=[]
 
-        for label_name, count in top_3_labels:
-            sentences=label_data[label_name]
-
+        for stat in top_3_stats:
             # 가장 많이 나온 문장 TOP3
-            evidence_sentences=_top_sentences_by_frequency(sentences, limit=3)
+            evidence_sentences=_top_sentences_by_frequency(stat.top_sentences or {}, limit=3)
 
             similar_answers=await find_similar_answers_for_label(
                 user_id=user_id,
-                label_name=label_name,
-                limit=2
+                label_name=stat.label,
+                limit=2,
+                query_sentence_id=stat.last_sentence_id
             )
 
-            avg_score=await calculate_label_avg_score(user_id, label_name)
+            avg_score=stat.score_sum/stat.score_count if stat.score_count>0 else 0.0
 
             top_weaknesses.append(WeaknessDetail(
-                label_name=label_name,
-                label_display_name=get_label_display_name(label_name),
+                label_name=stat.label,
+                label_display_name=get_label_display_name(stat.label),
                 avg_score=round(avg_score, 2),
-                occurrence_count=count,
+                occurrence_count=stat.occurrence_count,
                 evidence_sentences=evidence_sentences,
                 similar_answers=similar_answers,
-                improvement_guide=build_improvement_guide(label_name)
+                improvement_guide=build_improvement_guide(stat.label)
             ))
 
         # 요약 문장 생성
         # 최고 약점에 대한 추세 설명 추가
-        top_label_name=top_weaknesses[0].label_name if top_weaknesses else ""
-        top_trend=""
-        if top_label_name and top_label_name in label_data:
-            top_trend=_build_trend_text(label_data[top_label_name])
+        top_trend=_build_trend_text(top_3_stats[0].occurrence_count) if top_3_stats else ""
 
         summary=build_weakness_summary(top_weaknesses, total_interviews, top_trend=top_trend)
 
@@ -206,6 +124,9 @@ async def get_weakness_analysis(db:AsyncSession, user_id:int)->WeaknessCardRespo
             top_weaknesses=top_weaknesses,
             summary=summary
         )
+    except InferenceQueueFullError:
+        # 과부하는 오류 카드 대신 503으로 (다시 시도하면 정상 결과를 받을 수 있음)
+        raise
     except Exception as e:
         # 오류가 나더라도 충분한 인터뷰 횟수가 있으면 최소 메시지라도 보여줌
         return WeaknessCardResponse(
@@ -220,20 +141,31 @@ async def get_weakness_analysis(db:AsyncSession, user_id:int)->WeaknessCardRespo
 async def find_similar_answers_for_label(
     user_id:int,
     label_name:str,
-    limit:int=2
+    limit:int=2,
+    query_sentence_id:Optional[str]=None
 )->List[SimilarAnswerLink]:
+    # 벡터 저장소 조회는 추론 스레드 풀에서 (이벤트 루프 블로킹 방지)
+    return await run_inference("vector_store", _find_similar_answers_for_label, user_id, label_name, limit, query_sentence_id)
+
+
+def _find_similar_answers_for_label(user_id:int, label_name:str, limit:int, query_sentence_id:Optional[str])->List[SimilarAnswerLink]:
+    store=get_vector_store()
+
+    # 집계에 저장된 최근 문장 id로 바로 조회 (없거나 지워졌으면 라벨 필터 조회)
+    label_sentences={}
+    if query_sentence_id:
+        label_sentences=store.get_sentences(user_id, ids=[query_sentence_id], include=["embeddings"])
+
+    embeddings = label_sentences.get("embeddings")
+    if embeddings is not None and len(embeddings)>0:
+        return _query_similar_full_answers(user_id, embeddings[0], limit)
 
     # 해당 라벨이 있는 문장들 조회
-    label_sentences=collection.get(
-        where={
-            "$and":[
-                {"user_id":user_id},
-                {"type":"user_answer_sentence"},
-                {f"{label_name}_label":1}
-            ]
-        },
-        include=["metadatas", "embeddings", "documents"],
-        limit=5
+    label_sentences=store.get_sentences(
+        user_id,
+        filters={f"{label_name}_label":1},
+        include=["embeddings"],
+        limit=1
     )
 
     embeddings = label_sentences.get("embeddings")
@@ -242,18 +174,11 @@ async def find_similar_answers_for_label(
     if len(embeddings)==0:
         return []
 
-    query_embedding=embeddings[0]
+    return _query_similar_full_answers(user_id, embeddings[0], limit)
 
-    similar_results=collection.query(
-        query_embeddings=[query_embedding],
-        n_results=limit+5,
-        where={
-            "$and":[
-                {"user_id":user_id},
-                {"type":"user_answer_full"}
-            ]
-        }
-    )
+
+def _query_similar_full_answers(user_id:int, query_embedding, limit:int)->List[SimilarAnswerLink]:
+    similar_results=get_vector_store().query_full_answers(user_id, query_embedding, n_results=limit+5)
 
     return build_similar_answer_links(
         similar_results,
@@ -261,33 +186,3 @@ async def find_similar_answers_for_label(
         limit=limit,
         similarity_threshold=0.5
     )
-
-
-# 라벨의 평균 스코어 계산
-async def calculate_label_avg_score(user_id: int, label_name: str) -> float:
-
-    results=collection.get(
-        where={
-            "$and":[
-                {"user_id":user_id},
-                {"type":"user_answer_full"}
-            ]
-        },
-        include=["metadatas"]
-    )
-
-    scores:List[float]=[]
-
-    metas = results.get("metadatas")
-    if metas is None:
-        metas=[]
-
-    for meta in metas:
-        score_key=f"{label_name}_score"
-        if score_key in meta:
-            scores.append(float(meta[score_key]))
-
-    if not scores:
-        return 0.0
-
-    return sum(scores)/len(scores)
@@ -0,0 +1,130 @@
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Whisper 실행 엔진
+# openai : openai-whisper (PyTorch fp32)
+# faster : faster-whisper / CTranslate2 (CPU int8 양자화, 내장 VAD)
+#
+# 두 엔진 모두 transcribe() 결과를 같은 segment 형식으로 반환
+# [{"text": str, "words": [{"word", "start", "end", "probability"}]}]
+# 엔진 객체의 engine 속성 = 실제로 로드된 엔진 이름 (faster 요청이어도 대체되면 "openai")
+# 로드하지 않고 알아야 할 때(캐시 키 등)는 resolve_engine_name() - load_whisper_engine과 같은 대체 규칙
+WHISPER_ENGINES = ("openai", "faster")
+
+
+class OpenAIWhisperEngine:
+    def __init__(self, model_name: str):
+        import whisper
+
+        self.model = whisper.load_model(model_name)
+        self.engine = "openai"
+        self.model_name = model_name
+
+    def transcribe(self, samples: np.ndarray, language: str = "en") -> List[Dict[str, Any]]:
+        result = self.model.transcribe(
+            samples,
+            language=language,
+            word_timestamps=True,
+            verbose=False,
+        )
+
+        return [
+            {
+                "text": segment.get("text", ""),
+                "words": [
+                    {
+                        "word": word.get("word", ""),
+                        "start": word.get("start", 0),
+                        "end": word.get("end", 0),
+                        "probability": word.get("probability", 0.9),
+                    }
+                    for word in segment.get("words") or []
+                ],
+            }
+            for segment in result.get("segments") or []
+        ]
+
+
+class FasterWhisperEngine:
+    def __init__(self, model_name: str, device: str = "cpu", compute_type: str = "int8", cpu_threads: int = 0, vad_filter: bool = True):
+        from faster_whisper import WhisperModel
+
+        # cpu_threads=0이면 CTranslate2 기본값
+        self.model = WhisperModel(model_name, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+        self.vad_filter = vad_filter
+        self.engine = "faster"
+        self.model_name = model_name
+
+    def transcribe(self, samples: np.ndarray, language: str = "en") -> List[Dict[str, Any]]:
+        # 무음 구간은 VAD로 건너뛰고, 단어 타임스탬프는 원래 오디오 기준으로 복원됨
+        segments, _ = self.model.transcribe(
+            samples,
+            language=language,
+            word_timestamps=True,
+            vad_filter=self.vad_filter,
+            vad_parameters={"min_silence_duration_ms": 500},
+            beam_size=int(os.getenv("WHISPER_BEAM_SIZE", "5")),
+        )
+
+        # segments는 generator - 순회할 때 실제 디코딩 수행
+        return [
+            {
+                "text": segment.text,
+                "words": [
+                    {"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+                    for word in segment.words or []
+                ],
+            }
+            for segment in segments
+        ]
+
+
+def get_engine_name(engine: Optional[str] = None) -> str:
+    engine = (engine or os.getenv("WHISPER_ENGINE", "faster")).lower()
+    if engine not in WHISPER_ENGINES:
+        raise ValueError(f"지원하지 않는 WHISPER_ENGINE: {engine} (가능: {', '.join(WHISPER_ENGINES)})")
+    return engine
+
+
+# faster-whisper import 가능 여부 (프로세스당 한 번만 확인)
+@lru_cache(maxsize=1)
+def _faster_whisper_available() -> bool:
+    try:
+        import faster_whisper  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# faster-whisper를 쓸 수 없으면 openai-whisper로 실행
+def resolve_engine_name(engine: Optional[str] = None) -> str:
+    engine = get_engine_name(engine)
+    if engine == "faster" and not _faster_whisper_available():
+        return "openai"
+    return engine
+
+
+def get_model_name(model_name: Optional[str] = None) -> str:
+    return model_name or os.getenv("WHISPER_MODEL", "base")
+
+
+def load_whisper_engine(engine: Optional[str] = None, model_name: Optional[str] = None):
+    requested = get_engine_name(engine)
+    engine = resolve_engine_name(requested)
+    model_name = get_model_name(model_name)
+
+    if engine == "faster":
+        return FasterWhisperEngine(
+            model_name,
+            device=os.getenv("WHISPER_DEVICE", "cpu"),
+            compute_type=os.getenv("WHISPER_COMPUTE_TYPE", "int8"),
+            cpu_threads=int(os.getenv("WHISPER_CPU_THREADS", "0")),
+            vad_filter=os.getenv("WHISPER_VAD", "1") == "1",
+        )
+
+    if requested == "faster":
+        print("[Whisper] faster-whisper가 설치되지 않아 openai-whisper로 실행합니다.")
+    return OpenAIWhisperEngine(model_name)
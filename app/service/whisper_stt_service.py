@@ -1,46 +1,51 @@
-import whisper
-import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from app.core.inference_executor import run_inference
+from app.core.content_cache import get_content_cache
+from app.service.whisper_backend import get_model_name, resolve_engine_name
 
 
 
-whisper_model=None
-
-def get_whisper_model(model_name:str="base"):
-    global whisper_model
-    if whisper_model is None:
-        print(f"[Whisper] 모델 '{model_name}' 로딩중...")
-        whisper_model=whisper.load_model(model_name)
-        print(f"[Whisper] 모델 로드 완료!")
-    return whisper_model
+# WHISPER_ENGINE(openai|faster) / WHISPER_MODEL(base, small, ...)로 엔진과 모델 크기 선택
+# 모델 크기별로 레지스트리에 따로 보관 (모델 서버 사용 시 원격 프록시)
+def get_whisper_model(model_name:Optional[str]=None):
+    from app.core.model_registry import get_model
+    return get_model("whisper", get_model_name(model_name))
 
 
 class WhisperSTTService:
-    def __init__(self, model_name:str="base"):
-        self.model=get_whisper_model(model_name)
-
-    # 영어 음성을 텍스트로 변환
+    def __init__(self, model_name:Optional[str]=None):
+        self.model_name=get_model_name(model_name)
+        self.model=get_whisper_model(self.model_name)
+        # 캐시 키에는 실제로 실행될 엔진 사용 (faster-whisper가 없으면 openai로 대체되므로 WHISPER_ENGINE 값과 다를 수 있음)
+        # 모델 객체(원격 프록시일 수 있음)를 건드리지 않고 로컬에서 계산 - 이벤트 루프에서 생성되므로
+        self.engine=resolve_engine_name()
+
+    # wav 디코딩 + whisper 추론 (블로킹 - executor에서 실행)
+    def _transcribe(self, wav_data:bytes)->List[Dict[str, Any]]:
+        from app.service.audio_service import AudioService
+        samples=AudioService.wav_to_samples(wav_data).samples
+
+        # whisper 실행 (엔진과 무관하게 같은 segment 형식)
+        return self.model.transcribe(samples, language="en")
+
+    # 영어 음성을 텍스트로 변환 (같은 음성은 캐시된 결과 재사용)
     async def transcribe_english(self, wav_data:bytes)->Dict[str, Any]:
-        import io
-        from pydub import AudioSegment
-        audio=AudioSegment.from_file(io.BytesIO(wav_data), format="wav")
-        samples=np.array(audio.get_array_of_samples()).astype(np.float32)/32768.0
-
-        # whisper 실행
-        result=self.model.transcribe(
-            samples,
-            language="en",
-            word_timestamps=True,
-            verbose=False,
-        )
+        cache=get_content_cache()
+        key=cache.make_key("stt", wav_data, "whisper", self.engine, self.model_name, "en")
+
+        cached=cache.get_json("stt", key)
+        if cached is not None:
+            return cached
+
+        segments=await run_inference("whisper", self._transcribe, wav_data)
 
         # Google STT 형식 변환
         formatted_result={
             "results":[]
         }
 
-        if result.get("segments"):
-            for segment in result["segments"]:
+        if segments:
+            for segment in segments:
                 word_list=[]
 
                 if segment.get("words"):
@@ -59,6 +64,7 @@ class WhisperSTTService:
                     }]
                 })
 
+        cache.put_json("stt", key, formatted_result)
         return formatted_result
     
 
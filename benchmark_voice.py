@@ -2,10 +2,11 @@ import time
 import tracemalloc
 import statistics
 import sys
-import tempfile
 import json
 import os
 os.environ["PATH"] = r"C:\ffmpeg\bin" + os.pathsep + os.environ.get("PATH", "")
+# 디코딩/분석 결과 캐시를 끄고 측정 (이전 실행이나 앞 반복의 캐시 적중 시간이 섞이지 않도록)
+os.environ["CONTENT_CACHE_ENABLED"] = "0"
 
 from pydub import AudioSegment
 AudioSegment.converter = r"C:\ffmpeg\bin\ffmpeg.exe"
@@ -21,24 +22,24 @@ AUDIO_FILE = "테스트용 강연 파일 6분.mp3"
 REPEAT = 3 # 반복 횟수(평균값 계산을 위해)
 
 
-def measure_single_run(wav_path: str) -> dict:
+def measure_single_run(decoded) -> dict:
     analyzer = get_analyzer()
 
     tracemalloc.start()
     timings = {}
 
     t0 = time.perf_counter()
-    wav2vec_features = analyzer.extract_wav2vec_features(wav_path)
+    wav2vec_features = analyzer._wav2vec_features(decoded.samples, decoded.sample_rate)
     timings["wav2vec_sec"] = time.perf_counter() - t0
 
     t0 = time.perf_counter()
-    speech_features = analyzer.analyze_speech_features(wav_path)
-    timings["librosa_sec"] = time.perf_counter() - t0
-
-    t0 = time.perf_counter()
-    result = analyzer.analyze(wav_path)
+    # 캐시를 거치지 않는 내부 분석 함수 호출 (반복 측정이 캐시 적중 시간이 되지 않도록)
+    result = analyzer._analyze_waveform(decoded.samples, decoded.sample_rate)
     timings["total_sec"] = time.perf_counter() - t0
 
+    # 전체 분석 시간에서 wav2vec 시간을 뺀 나머지 = librosa 음향 특징 추출
+    timings["librosa_sec"] = max(timings["total_sec"] - timings["wav2vec_sec"], 0.0)
+
     _, peak_memory = tracemalloc.get_traced_memory()
     tracemalloc.stop()
     timings["peak_memory_mb"] = peak_memory / 1024 / 1024
@@ -51,38 +52,34 @@ def run_benchmark(label: str, audio_path: str, repeat: int = REPEAT):
     print(f"파일: {audio_path}")
     print(f"반복 횟수: {repeat}회")
 
-    # 음성파일 컨버터(wav로 변환한 후 진행)
-    print("\n[전처리] m4a → wav 변환 중...")
+    # 음성파일 디코딩 (임시 wav 파일 없이 16kHz float32 파형으로 바로 변환)
+    print("\n[전처리] 16kHz mono 파형으로 디코딩 중...")
     ext = os.path.splitext(audio_path)[1]
     with open(audio_path, "rb") as f:
         audio_data = f.read()
-    wav_data, duration = AudioService.convert_to_wav(audio_data, ext)
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        tmp.write(wav_data)
-        temp_wav_path = tmp.name
+    t0 = time.perf_counter()
+    decoded = AudioService.decode_audio(audio_data, ext)
+    decode_sec = time.perf_counter() - t0
 
-    print(f"  변환 완료 - 길이: {duration:.1f}초 ({duration/60:.1f}분)")
-    print(f"  임시 WAV: {temp_wav_path}")
+    print(f"  디코딩 완료 - 길이: {decoded.duration:.1f}초 ({decoded.duration/60:.1f}분), {decode_sec:.2f}초 소요")
 
     all_results = []
 
-    try:
-        for i in range(repeat):
-            print(f"\n[{i + 1}/{repeat}] 측정 중 입니다...", end=" ", flush=True)
-            result = measure_single_run(temp_wav_path)
-            all_results.append(result)
-            print(f"완료 ({result['total_sec']:.2f}초)")
-
-        print(f"\n결과 요약")
-        for key in ["wav2vec_sec", "librosa_sec", "total_sec", "peak_memory_mb"]:
-            values = [r[key] for r in all_results]
-            unit = "MB" if "memory" in key else "초"
-            print(f"  {key:<20}: 평균 {statistics.mean(values):.2f}{unit} / "
-                  f"최소 {min(values):.2f}{unit} / "
-                  f"최대 {max(values):.2f}{unit}")
-    finally:
-        os.unlink(temp_wav_path)  # 임시 파일 정리
+    for i in range(repeat):
+        print(f"\n[{i + 1}/{repeat}] 측정 중 입니다...", end=" ", flush=True)
+        result = measure_single_run(decoded)
+        result["decode_sec"] = decode_sec
+        all_results.append(result)
+        print(f"완료 ({result['total_sec']:.2f}초)")
+
+    print(f"\n결과 요약")
+    for key in ["decode_sec", "wav2vec_sec", "librosa_sec", "total_sec", "peak_memory_mb"]:
+        values = [r[key] for r in all_results]
+        unit = "MB" if "memory" in key else "초"
+        print(f"  {key:<20}: 평균 {statistics.mean(values):.2f}{unit} / "
+              f"최소 {min(values):.2f}{unit} / "
+              f"최대 {max(values):.2f}{unit}")
 
     return all_results
 
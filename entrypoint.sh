@@ -46,7 +46,7 @@ try:
         # alembic_version 설정
         conn.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL, PRIMARY KEY (version_num))"))
         conn.execute(text("DELETE FROM alembic_version"))
-        conn.execute(text("INSERT INTO alembic_version VALUES ('7c9a4e8f4dcb')"))
+        conn.execute(text("INSERT INTO alembic_version VALUES ('2b7e4c9d8a15')"))
         
         # 컴럼 추가 (이미 있으면 무시)
         for col in ['curse', 'filler', 'biased', 'slang']:
@@ -57,6 +57,23 @@ try:
                 if "Duplicate column" in str(e):
                     print(f"ℹ️  {col} 컴럼 이미 존재")
         
+        # c_voice_files 저장 포맷 컬럼 (analysis_jobs 테이블은 앱 시작 시 create_tables로 생성)
+        for col, col_type in [('stored_format', 'VARCHAR(10)'), ('sample_rate', 'INTEGER'), ('channels', 'INTEGER'), ('sample_width', 'INTEGER')]:
+            try:
+                conn.execute(text(f"ALTER TABLE c_voice_files ADD COLUMN {col} {col_type} NULL"))
+                print(f"✅ {col} 컬럼 추가")
+            except Exception as e:
+                if "Duplicate column" in str(e):
+                    print(f"ℹ️  {col} 컬럼 이미 존재")
+
+        # 약점 집계 반영 시각 (user_label_stats 테이블은 앱 시작 시 create_tables로 생성)
+        try:
+            conn.execute(text("ALTER TABLE i_answers ADD COLUMN stats_applied_at DATETIME NULL"))
+            print("✅ stats_applied_at 컬럼 추가")
+        except Exception as e:
+            if "Duplicate column" in str(e):
+                print("ℹ️  stats_applied_at 컬럼 이미 존재")
+
         conn.commit()
         print("✅ 데이터베이스 스키마 업데이트 완료")
 except Exception as e:
@@ -64,6 +81,47 @@ except Exception as e:
 PYEOF
 }
 
+VECTOR_STORE_BACKEND=${VECTOR_STORE_BACKEND:-chroma}
+if [ "$VECTOR_STORE_BACKEND" = "hnsw" ]; then
+    # 전체 재생성 완료 기록이 없으면 (새 컨테이너, 이전 재생성이 중간에 실패) MySQL에서 처음부터 다시 만듦
+    echo "🧭 벡터 인덱스 확인 중..."
+    python3 -m app.service.vector_rebuild --if-incomplete || echo "⚠️  벡터 인덱스 재생성 실패 - 다음 시작 때 다시 시도"
+else
+    # 벡터 DB 단일 컬렉션 → 전체/문장 x 사용자 버킷 컬렉션 (한 번만 복사 - 완료 표시가 있으면 바로 끝남)
+    # 원본 삭제(--drop-legacy)는 stats로 확인한 뒤 운영자가 직접 실행 - user_id 없는 문서도 같이 지워지므로 자동으로 하지 않음
+    echo "🧭 ChromaDB 컬렉션 마이그레이션 확인 중..."
+    python3 -m app.infra.chroma_db migrate || echo "⚠️  ChromaDB 마이그레이션 실패 - 기존 컬렉션 유지"
+fi
+
+# 모델 서버 (MODEL_SERVER_ADDRESS 설정 시) - 모델은 이 프로세스 하나만 보유하고 uvicorn 워커는 소켓으로 요청
+if [ -n "$MODEL_SERVER_ADDRESS" ]; then
+    echo "🧠 모델 서버 시작 ($MODEL_SERVER_ADDRESS)..."
+    python3 -m app.service.model_server serve &
+
+    MODEL_SERVER_READY=0
+    for i in $(seq 1 300); do
+        if python3 -m app.service.model_server ping > /dev/null 2>&1; then
+            echo "✅ 모델 서버 준비 완료"
+            MODEL_SERVER_READY=1
+            break
+        fi
+        sleep 1
+    done
+
+    # 모델 서버 없이 웹 서버를 띄우면 모든 분석 요청이 실패하므로 컨테이너를 종료 (재시작 정책에 맡김)
+    if [ "$MODEL_SERVER_READY" != "1" ]; then
+        echo "❌ 모델 서버가 300초 안에 응답하지 않음 - 종료"
+        exit 1
+    fi
+fi
+
+# 백그라운드 분석 작업 워커 (JOB_WORKERS=0이면 실행 안 함)
+JOB_WORKERS=${JOB_WORKERS:-1}
+for i in $(seq 1 "$JOB_WORKERS"); do
+    echo "🛠️  작업 워커 $i 시작..."
+    python3 -m app.service.job_worker &
+done
+
 echo "🚀 FastAPI 서버 시작..."
 
 # Uvicorn 실행
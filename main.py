@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from app.routers import voice_analysis, user, interview, jobs, image, presentation, communication, community, minigame
 from contextlib import asynccontextmanager
 from app.database.database import create_tables
+from app.core.inference_executor import InferenceQueueFullError, get_inference_stats
+from app.core.model_registry import get_model_registry
+from app.core.embedding_cache import get_embedding_cache
+from app.infra.vector_store import get_vector_store
 import os
 
 
@@ -70,14 +75,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"모델 파일 확인 실패: {e}")
 
-    # 음성 분석기 로드
+    # MODEL_PRELOAD 모델 사전 로드 + warmup (모델 서버 사용 시 워커에서는 로드하지 않음)
     try:
-        from app.service.voice_analyzer import get_analyzer
-        analyzer = get_analyzer()
-        print("음성 분석 모델 로드 완료")
+        from app.service.model_server import is_model_server_enabled
+        if is_model_server_enabled():
+            print(f"모델 서버 사용: {os.getenv('MODEL_SERVER_ADDRESS')}")
+        else:
+            from app.core.model_registry import preload_models
+            preload_models()
+            print("모델 사전 로드 완료")
     except Exception as e:
         print(f"모델 로드 실패: {e}")
 
+    # 벡터 DB 연결 + 임베딩 모델 warmup (VECTOR_STORE_WARMUP=1일 때만 - 기본은 첫 사용 시 연결)
+    try:
+        from app.infra.vector_store import should_warmup_vector_store, warmup_vector_store
+        if should_warmup_vector_store():
+            warmup_vector_store()
+            print("벡터 DB warmup 완료")
+    except Exception as e:
+        print(f"벡터 DB warmup 실패: {e}")
+
     print("")
     yield
     print("\n서버 종료")
@@ -103,6 +121,12 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# 추론 대기열이 가득 찬 경우 500 대신 503으로 응답
+@app.exception_handler(InferenceQueueFullError)
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFullError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
 app.include_router(communication.router)
 app.include_router(community.router)
 app.include_router(image.router)
@@ -130,4 +154,16 @@ async def root():
 # 서버 정상 작동 여부 확인 (AWS에 배포 작동 확인용)
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+# 모델별 추론 대기열/실행 현황
+@app.get("/health/inference")
+async def inference_health():
+    return {"status": "ok", "executors": get_inference_stats()}
+
+
+# 로드된 모델별 로드 시간 / 메모리 / 사용 현황
+@app.get("/health/models")
+async def models_health():
+    return {"status": "ok", "models": get_model_registry().stats(), "embedding_cache": get_embedding_cache().stats(), "vector_store": get_vector_store().stats()}
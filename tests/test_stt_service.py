@@ -0,0 +1,149 @@
+import asyncio
+import io
+import time
+import wave
+
+import grpc
+import numpy as np
+import pytest
+from google.api_core import exceptions as google_exceptions
+from google.cloud.speech_v2 import types
+
+from app.service import stt_service
+from app.service.stt_service import STTService, create_async_client
+
+# 로컬 가짜 Speech 서버(평문 gRPC)로 STTService의 deadline / 재시도 / 긴 음성 분할 경로 확인
+# 실제 Google STT는 호출하지 않음 (STT_INSECURE 채널 사용)
+
+SAMPLE_RATE = 16000
+
+
+class FakeSpeech:
+    def __init__(self, fail_first: int = 0, delay_sec: float = 0.0):
+        self.fail_first = fail_first
+        self.delay_sec = delay_sec
+        self.requests = []
+
+    # 요청 오디오 길이의 가운데에 단어 하나를 돌려줌 (조각 기준 시각)
+    async def recognize(self, request, context):
+        self.requests.append(request)
+        if len(self.requests) <= self.fail_first:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "일시 오류")
+        if self.delay_sec:
+            await asyncio.sleep(self.delay_sec)
+
+        with wave.open(io.BytesIO(request.content)) as wav:
+            duration = wav.getnframes() / wav.getframerate()
+        middle = duration / 2
+        word = types.WordInfo(
+            word=f"w{len(self.requests)}",
+            start_offset={"seconds": int(middle), "nanos": int((middle % 1) * 1e9)},
+            end_offset={"seconds": int(middle) + 1},
+            speaker_label="1",
+        )
+        return types.RecognizeResponse(results=[
+            types.SpeechRecognitionResult(alternatives=[types.SpeechRecognitionAlternative(transcript=word.word, words=[word])])
+        ])
+
+
+async def _start_server(fake: FakeSpeech):
+    server = grpc.aio.server()
+    handler = grpc.method_handlers_generic_handler("google.cloud.speech.v2.Speech", {
+        "Recognize": grpc.unary_unary_rpc_method_handler(
+            fake.recognize,
+            request_deserializer=types.RecognizeRequest.deserialize,
+            response_serializer=types.RecognizeResponse.serialize,
+        ),
+    })
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+# 말소리 대신 1초 tone + 0.5초 무음 반복 (무음 경계에서 자를 수 있도록)
+def _make_wav(duration_sec: float) -> bytes:
+    t = np.arange(int(SAMPLE_RATE * duration_sec)) / SAMPLE_RATE
+    samples = 0.5 * np.sin(2 * np.pi * 220 * t)
+    samples[(t % 1.5) >= 1.0] = 0.0
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((samples * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def _words(result):
+    return [w for res in result["results"] for w in res["alternatives"][0]["words"]]
+
+
+def test_retries_transient_error_through_insecure_endpoint(monkeypatch):
+    async def run():
+        fake = FakeSpeech(fail_first=1)
+        server, endpoint = await _start_server(fake)
+        # 환경변수 경로 (STT_API_ENDPOINT + STT_INSECURE) 그대로 사용
+        monkeypatch.setattr(stt_service, "STT_API_ENDPOINT", endpoint)
+        monkeypatch.setattr(stt_service, "STT_INSECURE", True)
+        monkeypatch.setattr(stt_service, "STT_RETRY", stt_service.STT_RETRY.with_delay(initial=0.05, maximum=0.1))
+        try:
+            return fake, await STTService("test-project")._transcribe_chirp(_make_wav(3))
+        finally:
+            await server.stop(None)
+
+    fake, result = asyncio.run(run())
+
+    assert len(fake.requests) == 2
+    assert fake.requests[0].recognizer == "projects/test-project/locations/us/recognizers/chirp"
+    assert [w["word"] for w in _words(result)] == ["w2"]
+
+
+def test_deadline_stops_slow_recognizer(monkeypatch):
+    async def run():
+        fake = FakeSpeech(delay_sec=5)
+        server, endpoint = await _start_server(fake)
+        monkeypatch.setattr(stt_service, "STT_TIMEOUT_SEC", 0.3)
+        monkeypatch.setattr(stt_service, "STT_RETRY", stt_service.STT_RETRY.with_delay(initial=0.05, maximum=0.1).with_timeout(0.8))
+        service = STTService("test-project", client=create_async_client(endpoint, insecure=True))
+        started = time.perf_counter()
+        try:
+            with pytest.raises((google_exceptions.DeadlineExceeded, google_exceptions.RetryError)):
+                await service._transcribe_chirp(_make_wav(3))
+            return fake, time.perf_counter() - started
+        finally:
+            await server.stop(None)
+
+    fake, elapsed = asyncio.run(run())
+
+    # 재시도 대상이지만 전체 deadline 안에서 끝나야 함
+    assert len(fake.requests) >= 1
+    assert elapsed < 3
+
+
+def test_long_audio_is_chunked_and_stitched(monkeypatch):
+    async def run():
+        fake = FakeSpeech()
+        server, endpoint = await _start_server(fake)
+        monkeypatch.setattr(stt_service, "STT_SYNC_LIMIT_SEC", 10.0)
+        monkeypatch.setattr(stt_service, "STT_MAX_CONCURRENCY", 2)
+        service = STTService("test-project", client=create_async_client(endpoint, insecure=True))
+        try:
+            return fake, await service._transcribe_chirp(_make_wav(30))
+        finally:
+            await server.stop(None)
+
+    fake, result = asyncio.run(run())
+
+    assert len(fake.requests) > 1
+    # 조각 길이가 동기 인식 한도를 넘지 않음
+    for request in fake.requests:
+        with wave.open(io.BytesIO(request.content)) as wav:
+            assert wav.getnframes() / wav.getframerate() <= 10.0 + 1e-6
+
+    # 조각마다 단어 하나, 전체 녹음 기준 시각으로 순서대로 합쳐짐
+    words = _words(result)
+    assert len(words) == len(fake.requests)
+    starts = [float(w["startTime"].rstrip("s")) for w in words]
+    assert starts == sorted(starts)
+    assert starts[-1] > 10.0